@@ -0,0 +1,64 @@
+"""名前履歴のファイル形式ごとの保存・読み込み時間を計測するベンチマーク．
+
+CSV, JSON Lines, npz形式について，履歴の保存・読み込み時間とファイルサイズを計測する．
+また，分析用にnpz形式のファイルを配列のまま読み込む (numpy.load) 時間も計測する．
+
+実行例
+$ python benchmarks/bench_history_formats.py
+$ python benchmarks/bench_history_formats.py 100000
+"""
+# pylint: disable=C0103
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import synthetic  # pylint: disable=C0413
+from seimei.seimei_history import SeimeiHistory  # pylint: disable=C0413
+
+SIZE = 100000
+FORMATS = ('csv', 'jsonl', 'npz')
+
+def main():
+    """ベンチマークを実行する．
+    """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        src_path = os.path.join(tmp_dir, 'src.csv')
+        synthetic.write_history_csv(src_path, size)
+        history = SeimeiHistory(src_path)
+
+        print('|形式|保存 [ms]|読み込み [ms]|1行あたり [us]|サイズ [KB]|')
+        for fmt in FORMATS:
+            filepath = os.path.join(tmp_dir, 'name.{}'.format(fmt))
+
+            # CSV形式は既存のファイルにのみ保存する
+            open(filepath, 'w', encoding='utf-8').close()
+
+            start = time.perf_counter()
+            history.save(filepath)
+            save_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            SeimeiHistory(filepath)
+            load_elapsed = time.perf_counter() - start
+
+            print('|{:5}|{:9.1f}|{:13.1f}|{:14.2f}|{:11.0f}|'.format(
+                fmt, save_elapsed*1000, load_elapsed*1000, load_elapsed/size*1e6,
+                os.path.getsize(filepath)/1024))
+
+        start = time.perf_counter()
+        with np.load(os.path.join(tmp_dir, 'name.npz')) as arrays:
+            arrays = {key: arrays[key] for key in arrays.files}
+
+        elapsed = time.perf_counter() - start
+        print('|numpy.load|-|{:13.1f}|{:14.2f}|-|'.format(elapsed*1000, elapsed/size*1e6))
+
+if __name__ == '__main__':
+    main()
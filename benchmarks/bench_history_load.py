@@ -0,0 +1,39 @@
+"""名前履歴ファイルの読み込み時間を計測するベンチマーク．
+
+行数を倍々に増やした名前履歴ファイルを作成して読み込み時間を計測し，
+1行あたりの時間がほぼ一定 (読み込みが行数に比例) であることを確認する．
+
+実行例
+$ python benchmarks/bench_history_load.py
+"""
+# pylint: disable=C0103
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import synthetic  # pylint: disable=C0413
+from seimei.seimei_history import SeimeiHistory  # pylint: disable=C0413
+
+SIZES = (1000, 2000, 4000, 8000, 16000, 32000)
+
+def main():
+    """ベンチマークを実行する．
+    """
+    print('|行数|読み込み [ms]|1行あたり [us]|')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in SIZES:
+            filepath = os.path.join(tmp_dir, 'name{}.csv'.format(size))
+            synthetic.write_history_csv(filepath, size)
+
+            start = time.perf_counter()
+            SeimeiHistory(filepath)
+            elapsed = time.perf_counter() - start
+
+            print('|{:6d}|{:12.2f}|{:14.2f}|'.format(size, elapsed*1000, elapsed/size*1e6))
+
+if __name__ == '__main__':
+    main()
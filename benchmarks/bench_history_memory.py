@@ -0,0 +1,70 @@
+"""名前履歴のメモリ使用量を計測するベンチマーク．
+
+名前情報を辞書のまま保持した場合と，名前履歴 (列ごとに保持) の場合について，
+項目数ごとのメモリ使用量をtracemallocで計測する．
+
+実行例
+$ python benchmarks/bench_history_memory.py
+$ python benchmarks/bench_history_memory.py 100000
+"""
+# pylint: disable=C0103
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import synthetic  # pylint: disable=C0413
+from seimei.seimei_history import SeimeiHistory  # pylint: disable=C0413
+
+SIZE = 10**6
+
+def measure(create):
+    """オブジェクトの作成で増えたメモリ使用量を返す．
+
+    Args:
+        create: オブジェクトを作成する関数
+
+    Returns:
+        メモリ使用量 (バイト)
+    """
+    gc.collect()
+    tracemalloc.start()
+    obj = create()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+def create_history(size):
+    """名前履歴を作成する．
+
+    Args:
+        size: 項目数
+
+    Returns:
+        名前履歴
+    """
+    history = SeimeiHistory()
+    for item in synthetic.items(size):
+        history.add(item)
+
+    return history
+
+def main():
+    """ベンチマークを実行する．
+    """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+
+    size_items = measure(lambda: list(synthetic.items(size)))
+    size_history = measure(lambda: create_history(size))
+
+    print('|保持方法|メモリ [MB]|1項目あたり [B]|')
+    print('|名前情報のリスト|{:.1f}|{:.0f}|'.format(size_items/2**20, size_items/size))
+    print('|名前履歴 (列ごと)|{:.1f}|{:.0f}|'.format(size_history/2**20, size_history/size))
+
+if __name__ == '__main__':
+    main()
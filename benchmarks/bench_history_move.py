@@ -0,0 +1,50 @@
+"""名前履歴の項目の移動時間を計測するベンチマーク．
+
+項目数を倍々に増やした名前履歴で，複数選択した項目の上下移動と，
+先頭から末尾への移動にかかる時間を計測し，
+1回あたりの時間が項目数に対してほぼ対数的にしか増えないことを確認する．
+
+実行例
+$ python benchmarks/bench_history_move.py
+"""
+# pylint: disable=C0103
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import synthetic  # pylint: disable=C0413
+
+SIZES = (1000, 4000, 16000, 64000)
+REPEAT = 200
+SELECT = 10
+
+def main():
+    """ベンチマークを実行する．
+    """
+    rng = random.Random(0)
+    print('|項目数|上下移動 (10項目) [us]|先頭から末尾へ移動 [us]|')
+    for size in SIZES:
+        history = synthetic.history(size)
+
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            indices = rng.sample(range(1, size - 1), SELECT)
+            history.move_up(*indices)
+            history.move_down(*indices)
+
+        elapsed_updown = (time.perf_counter() - start) / (2*REPEAT)
+
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            history.move(0, size)
+
+        elapsed_move = (time.perf_counter() - start) / REPEAT
+
+        print('|{:6d}|{:22.1f}|{:23.1f}|'.format(size, elapsed_updown*1e6, elapsed_move*1e6))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""姓名の一括登録の時間を計測し，名の表記によらず同じ名前情報が登録されることを確かめるベンチマーク．
+
+合成データの姓名を，名の表記 (NFC, NFD, 半角カタカナ) ごとにSeimeiSession.import_namesで登録し，
+登録にかかった時間を計測する．
+登録後の履歴の姓名と五格が，NFCの全角の姓名から求めたものと一致するかを調べる．
+画数は合成データ上の画数をあらかじめ登録しておき，MJ文字情報APIはスタブサーバに向ける．
+読み飛ばした姓名があるか，スタブサーバに問い合わせたか，履歴が一致しない表記がある場合は，
+終了コード1で終了する．
+
+実行例
+$ python benchmarks/bench_import.py
+$ python benchmarks/bench_import.py 100000
+"""
+# pylint: disable=C0103
+
+import os
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from seimei.kakusuu import kana_table  # pylint: disable=C0413
+from seimei.seimei_session import SeimeiSession  # pylint: disable=C0413
+from mji_stub import MJIStub  # pylint: disable=C0413
+from synthetic import halfwidth, item, names, stroke_count  # pylint: disable=C0413
+
+SIZE = 10000
+
+# 表記の名前と，名の表記を変える関数
+NOTATIONS = (('NFC', lambda given: given),
+             ('NFD', lambda given: unicodedata.normalize('NFD', given)),
+             ('半角カタカナ', halfwidth))
+
+def import_names(seimei_names, expected):
+    """空の履歴に姓名を一括登録する．
+
+    画数の辞書には，NFCの全角の姓名に含まれる漢字の画数だけを登録しておく．
+
+    Args:
+        seimei_names: 「(姓, 名)」の形式の姓名のリスト
+        expected: NFCの全角の姓名のリスト
+
+    Returns:
+        登録後の履歴
+        読み込んだ姓名の数，追加した姓名の数，読み飛ばした姓名の数
+        スタブサーバへのリクエスト数
+        実行時間 (秒)
+    """
+    session = SeimeiSession()
+    kana = kana_table()
+    session.kakusuu.update({char: stroke_count(char)
+                            for family, given in expected for char in family + given
+                            if char not in kana})
+
+    with MJIStub() as stub:
+        start = time.perf_counter()
+        counts = session.import_names(seimei_names, max_workers=1)
+        elapsed = time.perf_counter() - start
+
+    return session.history, counts, stub.num_requests, elapsed
+
+def main():
+    """ベンチマークを実行する．
+    """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    expected_names = list(names(size))
+    cases = [(notation, [(family, convert(given)) for family, given in expected_names],
+              expected_names)
+             for notation, convert in NOTATIONS]
+    cases.append(('ｻﾄｳ ﾀﾛｳ', [('ｻﾄｳ', 'ﾀﾛｳ')], [('サトウ', 'タロウ')]))
+    failed = False
+
+    print('|表記|件数|表記を変えた件数|時間 [ms]|件/秒|追加|読み飛ばし|API問い合わせ|結果|')
+    for notation, seimei_names, expected in cases:
+        history, (num_read, num_added, num_skipped), num_requests, elapsed = \
+            import_names(seimei_names, expected)
+
+        expected_items = [item(family, given) for family, given in expected]
+        passed = num_added == len(expected) and num_skipped == 0 and num_requests == 0 and \
+            [(name.family, name.given, name.gokaku_dict) for name in history] == \
+            [(name.family, name.given, name.gokaku_dict) for name in expected_items]
+        failed = failed or not passed
+        print('|{}|{}|{}|{:.1f}|{:.0f}|{}|{}|{}|{}|'.format(
+            notation, num_read, sum(name != val for name, val in zip(seimei_names, expected)),
+            elapsed*1000, num_read / elapsed if elapsed > 0 else 0, num_added, num_skipped,
+            num_requests, 'PASS' if passed else 'FAIL'))
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""画数保存ファイルの読み込み時間を計測するベンチマーク．
+
+1万・6万・10万文字の画数保存ファイルを作成し，
+CSVの解析による読み込みと，スナップショットからの読み込みの時間を比較する．
+
+実行例
+$ python benchmarks/bench_kakusuu_load.py
+"""
+# pylint: disable=C0103
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import synthetic  # pylint: disable=C0413
+from seimei.kakusuu import Kakusuu  # pylint: disable=C0413
+
+SIZES = (10000, 60000, 100000)
+REPEAT = 5
+
+def measure(func):
+    """関数の実行時間の最小値を返す．
+
+    Args:
+        func: 計測する関数
+
+    Returns:
+        実行時間 (秒)
+    """
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+def main():
+    """ベンチマークを実行する．
+    """
+    print('|文字数|CSV解析 [ms]|スナップショット [ms]|')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in SIZES:
+            filepath = os.path.join(tmp_dir, 'kakusuu{}.csv'.format(size))
+            synthetic.write_kakusuu_csv(filepath, size)
+
+            csv_time = measure(lambda filepath=filepath: Kakusuu.read_csv(filepath))
+
+            Kakusuu(filepath)
+            snapshot_time = measure(lambda filepath=filepath: Kakusuu(filepath))
+
+            print('|{:6d}|{:12.2f}|{:20.2f}|'.format(size, csv_time*1000, snapshot_time*1000))
+
+if __name__ == '__main__':
+    main()
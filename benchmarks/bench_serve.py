@@ -0,0 +1,177 @@
+"""サーバの応答時間を計測し，登録した姓名が履歴ファイルに保存されることを確かめるベンチマーク．
+
+履歴の形式ごとに，一時ディレクトリに設定ファイルと画数保存ファイルを用意して
+「seimei.py --serve」を別プロセスで起動し，/scoreで姓名を1件ずつ登録して応答時間を計測する．
+姓名の半分は姓と名を分けて，残りは「姓 名」の形式で指定する．
+SIGTERMでサーバを終了させた後に履歴ファイルを読み込み，登録した姓名がすべて
+登録した順に保存されているかを調べる．
+応答がエラーだったか，保存されていない姓名がある形式がある場合は，終了コード1で終了する．
+
+実行例
+$ python benchmarks/bench_serve.py
+$ python benchmarks/bench_serve.py 1000
+"""
+# pylint: disable=C0103
+
+import http.client
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from seimei.kakusuu import kana_table  # pylint: disable=C0413
+from seimei.seimei_history import SeimeiHistory  # pylint: disable=C0413
+from synthetic import names, stroke_count  # pylint: disable=C0413
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'seimei.py')
+SIZE = 200
+
+# 履歴ファイルの拡張子
+FORMATS = ('csv', 'db')
+
+def prepare(tmp_dir, ext, seimei_names):
+    """一時ディレクトリに設定ファイルと画数保存ファイルを作成する．
+
+    画数保存ファイルには姓名に含まれるすべての漢字を書き込み，
+    登録時にネットワーク接続しないようにする．
+
+    Args:
+        tmp_dir: 一時ディレクトリのパス
+        ext: 履歴ファイルの拡張子
+        seimei_names: 「(姓, 名)」の形式の姓名のリスト
+
+    Returns:
+        履歴ファイルのパス
+    """
+    history_path = os.path.join(tmp_dir, 'name.' + ext)
+    with open(os.path.join(tmp_dir, 'config.ini'), 'w', encoding='utf-8') as f:
+        f.write('[Paths]\n')
+        f.write('seimei_history = {}\n'.format(history_path))
+        f.write('kakusuu_dict = {}\n'.format(os.path.join(tmp_dir, 'kakusuu.csv')))
+
+    kana = kana_table()
+    chars = dict.fromkeys(char for family, given in seimei_names for char in family + given
+                          if char not in kana)
+    with open(os.path.join(tmp_dir, 'kakusuu.csv'), 'w', encoding='utf-8') as f:
+        for char in chars:
+            f.write('{},{}\n'.format(char, stroke_count(char)))
+
+    return history_path
+
+def free_port():
+    """空いているポート番号を返す．
+
+    Returns:
+        ポート番号
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def register(port, seimei_names):
+    """/scoreで姓名を1件ずつ登録する．
+
+    Args:
+        port: サーバのポート番号
+        seimei_names: 「(姓, 名)」の形式の姓名のリスト
+
+    Returns:
+        各リクエストの応答時間 (秒) のリスト
+        エラーの応答のリスト
+    """
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    elapsed = []
+    errors = []
+    try:
+        for idx, (family, given) in enumerate(seimei_names):
+            # 半分の姓名は「姓 名」の形式で指定する
+            params = {'family': family, 'given': given} if idx % 2 == 0 else \
+                {'family': '{} {}'.format(family, given)}
+            path = '/score?' + urllib.parse.urlencode(params)
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                body = response.read()
+
+            except (http.client.HTTPException, OSError) as e:
+                # 応答せずに切断された場合は，以降の姓名を登録しない
+                errors.append('{} {}: {!r}'.format(family, given, e))
+                break
+
+            elapsed.append(time.perf_counter() - start)
+
+            if response.status != 200:
+                errors.append('{} {}: {}'.format(family, given, body.decode('utf-8')))
+
+    finally:
+        conn.close()
+
+    return elapsed, errors
+
+def serve(tmp_dir, port, seimei_names):
+    """サーバを起動して姓名を登録し，SIGTERMで終了させる．
+
+    Args:
+        tmp_dir: 作業ディレクトリのパス
+        port: 待ち受けるポート番号
+        seimei_names: 「(姓, 名)」の形式の姓名のリスト
+
+    Returns:
+        各リクエストの応答時間 (秒) のリスト
+        エラーの応答のリスト
+    """
+    proc = subprocess.Popen([sys.executable, SCRIPT, '--serve', '--port', str(port)],
+                            cwd=tmp_dir, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    try:
+        # 待ち受けを始めると1行出力する
+        if not proc.stdout.readline():
+            raise RuntimeError(proc.stderr.read().strip())
+
+        return register(port, seimei_names)
+
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        _, stderr = proc.communicate()
+        if 'ERROR' in stderr:
+            print(stderr.strip(), file=sys.stderr)
+
+def main():
+    """ベンチマークを実行する．
+    """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    seimei_names = list(names(size))
+    failed = False
+
+    print('|履歴の形式|件数|中央値 [ms]|最大 [ms]|エラー|保存された件数|結果|')
+    for ext in FORMATS:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            history_path = prepare(tmp_dir, ext, seimei_names)
+            elapsed, errors = serve(tmp_dir, free_port(), seimei_names)
+
+            history = SeimeiHistory(history_path)
+            saved = [(item.family, item.given) for item in history]
+            del history
+
+            elapsed = elapsed or [0.0]
+            passed = not errors and saved == seimei_names
+            failed = failed or not passed
+            print('|{}|{}|{:.2f}|{:.2f}|{}|{}|{}|'.format(
+                ext, len(seimei_names), statistics.median(elapsed)*1000, max(elapsed)*1000,
+                len(errors), len(saved), 'PASS' if passed else 'FAIL'))
+
+            for error in errors[:3]:
+                print(error, file=sys.stderr)
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
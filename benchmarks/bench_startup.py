@@ -0,0 +1,131 @@
+"""CLIの起動時間を計測するベンチマーク．
+
+一時ディレクトリに履歴と画数保存ファイルを用意し，モードごとにseimei.pyを
+別プロセスで繰り返し起動して，実行時間の中央値を計測する．
+また，「-X importtime」の出力から読み込みに時間のかかったモジュールを求め，
+そのモードで読み込むべきでない重いモジュール (NumPy, tkinterなど) が読み込まれていないかを調べる．
+中央値が予算を超えたか，読み込むべきでないモジュールが読み込まれたモードがある場合は，
+終了コード1で終了する．
+
+実行例
+$ python benchmarks/bench_startup.py
+$ python benchmarks/bench_startup.py 20
+"""
+# pylint: disable=C0103
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'seimei.py')
+REPEAT = 10
+TOP = 3
+
+# モード名，引数，実行時間の予算 [ms]
+MODES = (('help', ['-h'], 120),
+         ('show', ['-s'], 150),
+         ('info', ['-i', '1'], 150),
+         ('query', ['-q', '--soukaku', '24'], 150),
+         ('append', ['田中', '一郎'], 250))
+
+# どのモードでも読み込まないモジュール (登録は画数の取得にネットワーク接続を使う)
+FORBIDDEN = ('numpy', 'tkinter', 'gui.index', 'urllib.request', 'sqlite3')
+FORBIDDEN_OFFLINE = FORBIDDEN + ('http.client', 'concurrent.futures.process')
+
+# 画数保存ファイルに書き込んでおく文字と画数 (登録時にネットワーク接続しないようにする)
+KAKUSUU = {'田': 5, '中': 4, '一': 1, '郎': 9}
+
+def prepare(tmp_dir):
+    """一時ディレクトリに履歴と画数保存ファイルを作成する．
+
+    Args:
+        tmp_dir: 一時ディレクトリのパス
+    """
+    with open(os.path.join(tmp_dir, 'kakusuu.csv'), 'w', encoding='utf-8') as f:
+        for char, kakusuu in KAKUSUU.items():
+            f.write('{},{}\n'.format(char, kakusuu))
+
+    run(tmp_dir, ['田中', '一郎'])
+
+def run(tmp_dir, args, importtime=False):
+    """seimei.pyを起動し，終了を待つ．
+
+    Args:
+        tmp_dir: 作業ディレクトリのパス
+        args: seimei.pyの引数
+        importtime: Trueの場合は「-X importtime」を付けて起動する
+
+    Returns:
+        実行時間 (秒)
+        標準エラー出力
+    """
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + [SCRIPT] + args
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=tmp_dir, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, check=True, universal_newlines=True)
+    elapsed = time.perf_counter() - start
+
+    if 'ERROR' in proc.stdout:
+        raise RuntimeError('{}: {}'.format(' '.join(args), proc.stdout.strip()))
+
+    return elapsed, proc.stderr
+
+def parse_importtime(stderr):
+    """「-X importtime」の出力を解析する．
+
+    Args:
+        stderr: 標準エラー出力
+
+    Returns:
+        モジュール名と累積の読み込み時間 [us] の辞書
+        直接読み込まれた (他のモジュールから読み込まれていない) モジュール名のリスト
+    """
+    cumulative = {}
+    toplevel = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumul, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(cumul)
+
+        # 他のモジュールから読み込まれたモジュールは字下げされている
+        if not name[1:].startswith(' '):
+            toplevel.append(name.strip())
+
+    return cumulative, toplevel
+
+def main():
+    """ベンチマークを実行する．
+    """
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else REPEAT
+    failed = False
+
+    print('|モード|中央値 [ms]|予算 [ms]|読み込み時間の長いモジュール [ms]|重いモジュール|結果|')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        prepare(tmp_dir)
+
+        for name, args, budget in MODES:
+            # 1回目はバイトコードのキャッシュを作成するため計測しない
+            run(tmp_dir, args)
+            median = statistics.median(run(tmp_dir, args)[0] for _ in range(repeat))
+
+            cumulative, toplevel = parse_importtime(run(tmp_dir, args, importtime=True)[1])
+            top = sorted(((cumulative[key], key) for key in toplevel), reverse=True)[:TOP]
+            forbidden = FORBIDDEN if name == 'append' else FORBIDDEN_OFFLINE
+            loaded = [module for module in forbidden if module in cumulative]
+
+            passed = median*1000 <= budget and not loaded
+            failed = failed or not passed
+            print('|{}|{:.1f}|{}|{}|{}|{}|'.format(
+                name, median*1000, budget,
+                ', '.join('{} ({:.1f})'.format(key, val/1000) for val, key in top),
+                ', '.join(loaded) if loaded else '-', 'PASS' if passed else 'FAIL'))
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
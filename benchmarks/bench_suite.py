@@ -0,0 +1,343 @@
+"""姓名の計算・画数保存ファイル・名前履歴の主な処理の時間をまとめて計測するベンチマーク．
+
+合成データ (synthetic) を使い，以下の処理の時間を計測する．
+画数の取得はローカルのスタブサーバ (mji_stub) に接続するため，ネットワークには接続しない．
+
+* core: Seimei.data() (画数を取得済みの場合と，スタブサーバから取得する場合)
+* kakusuu: Kakusuu.load_csv (CSVの解析・スナップショット), Kakusuu.save_csv
+* history: SeimeiHistory.load_csv, save_csv, add, move, remove, show
+
+結果は表形式で標準出力し，JSON形式のファイル (既定では bench_<コミット>.json) にも保存する．
+--compareで以前の結果のファイルを指定すると，各ケースの時間の比を表示し，
+--thresholdを超えて遅くなったケースがある場合は終了コード1で終了する．
+
+実行例
+$ python benchmarks/bench_suite.py
+$ python benchmarks/bench_suite.py --sizes 1000,10000,100000,1000000 --repeat 3
+$ python benchmarks/bench_suite.py --groups history --compare bench_1a2b3c4.json
+"""
+# pylint: disable=C0103, R0914
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import synthetic  # pylint: disable=C0413
+from mji_stub import MJIStub  # pylint: disable=C0413
+from seimei.kakusuu import Kakusuu  # pylint: disable=C0413
+from seimei.seimei_core import Seimei  # pylint: disable=C0413
+from seimei.seimei_history import SeimeiHistory  # pylint: disable=C0413
+
+HISTORY_SIZES = (1000, 10000, 100000)
+DICT_SIZES = (1000, 10000, 100000)
+REPEAT = 5
+THRESHOLD = 1.2
+GROUPS = ('core', 'kakusuu', 'history')
+
+# 姓名の計算の件数と，姓名に使う漢字の数
+NUM_NAMES = 10000
+NUM_NAME_CHARS = 2000
+
+# スタブサーバから画数を取得する姓名の件数
+NUM_STUB_NAMES = 200
+
+# 名前履歴の追加・移動・削除の回数
+NUM_OPS = 1000
+
+def measure(func, repeat, setup=None):
+    """関数の実行時間の中央値を返す．
+
+    Args:
+        func: 計測する関数
+        repeat: 計測する回数
+        setup: 毎回の計測の前に呼び出す関数 (計測しない)
+
+    Returns:
+        実行時間の中央値 (秒)
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+def bench_core(repeat, stub_latency):
+    """姓名の計算時間を計測する．
+
+    Args:
+        repeat: 計測する回数
+        stub_latency: スタブサーバの応答の遅延 (秒)
+
+    Yields:
+        ケース名，データの大きさ，実行時間 (秒)，処理の回数
+    """
+    chars = synthetic.KANJI[:NUM_NAME_CHARS]
+    names = list(synthetic.names(NUM_NAMES, chars=chars))
+    kakusuu = Kakusuu()
+    kakusuu.dict = {char: synthetic.stroke_count(char) for char in chars}
+    history = SeimeiHistory()
+
+    def data(names, kakusuu):
+        for family, given in names:
+            Seimei(family, given, history=history, kakusuu=kakusuu).data()
+
+    yield 'core.data', NUM_NAMES, measure(lambda: data(names, kakusuu), repeat), NUM_NAMES
+
+    # 毎回空の辞書から始めるため，未取得の文字はすべてスタブサーバから取得する
+    stub_names = names[:NUM_STUB_NAMES]
+    cold = []
+    with MJIStub(stub_latency):
+        elapsed = measure(lambda: data(stub_names, cold[-1]), repeat,
+                          setup=lambda: cold.append(Kakusuu()))
+
+    yield 'core.data_stub', NUM_STUB_NAMES, elapsed, NUM_STUB_NAMES
+
+def bench_kakusuu(tmp_dir, sizes, repeat):
+    """画数保存ファイルの読み込み・保存時間を計測する．
+
+    Args:
+        tmp_dir: 一時ディレクトリのパス
+        sizes: 文字数のリスト
+        repeat: 計測する回数
+
+    Yields:
+        ケース名，データの大きさ，実行時間 (秒)，処理の回数
+    """
+    for size in sizes:
+        filepath = os.path.join(tmp_dir, 'kakusuu{}.csv'.format(size))
+        synthetic.write_kakusuu_csv(filepath, size)
+        snapshot_path = Kakusuu.snapshot_path(filepath)
+
+        def remove_snapshot(snapshot_path=snapshot_path):
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+
+        elapsed = measure(lambda filepath=filepath: Kakusuu().load_csv(filepath), repeat,
+                          setup=remove_snapshot)
+        yield 'kakusuu.load_csv', size, elapsed, 1
+
+        Kakusuu().load_csv(filepath)
+        elapsed = measure(lambda filepath=filepath: Kakusuu().load_csv(filepath), repeat)
+        yield 'kakusuu.load_csv_snapshot', size, elapsed, 1
+
+        kakusuu = Kakusuu()
+        kakusuu.load_csv(filepath)
+        save_path = os.path.join(tmp_dir, 'kakusuu{}_save.csv'.format(size))
+        elapsed = measure(lambda kakusuu=kakusuu, save_path=save_path: kakusuu.save_csv(save_path),
+                          repeat)
+        yield 'kakusuu.save_csv', size, elapsed, 1
+
+def bench_history(tmp_dir, sizes, repeat):
+    """名前履歴の読み込み・保存・追加・移動・削除・表示の時間を計測する．
+
+    Args:
+        tmp_dir: 一時ディレクトリのパス
+        sizes: 項目数のリスト
+        repeat: 計測する回数
+
+    Yields:
+        ケース名，データの大きさ，実行時間 (秒)，処理の回数
+    """
+    rng = random.Random(0)
+    for size in sizes:
+        filepath = os.path.join(tmp_dir, 'name{}.csv'.format(size))
+        synthetic.write_history_csv(filepath, size + NUM_OPS)
+
+        # 先頭のsize件を読み込んだ名前履歴に，残りの件を追加する
+        extra = list(SeimeiHistory.read_csv(filepath))[size:]
+        with open(filepath, 'r', encoding='utf-8') as f:
+            lines = f.readlines()[:size]
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+
+        elapsed = measure(lambda filepath=filepath: SeimeiHistory().load_csv(filepath), repeat)
+        yield 'history.load_csv', size, elapsed, 1
+
+        history = SeimeiHistory()
+        history.load_csv(filepath)
+
+        save_path = os.path.join(tmp_dir, 'name{}_save.csv'.format(size))
+        open(save_path, 'w', encoding='utf-8').close()
+        elapsed = measure(lambda history=history, save_path=save_path: history.save_csv(save_path),
+                          repeat)
+        yield 'history.save_csv', size, elapsed, 1
+
+        def add_items(history=history, extra=extra):
+            for item in extra:
+                history.add(item)
+
+        def remove_added(history=history, size=size):
+            if len(history) > size:
+                history.remove(*range(size, len(history)))
+
+        elapsed = measure(add_items, repeat, setup=remove_added)
+        remove_added()
+        yield 'history.add', size, elapsed, NUM_OPS
+
+        moves = [(rng.randrange(size), rng.randint(-size, size)) for _ in range(NUM_OPS)]
+
+        def move_items(history=history, moves=moves):
+            for idx, move_val in moves:
+                history.move(idx, move_val)
+
+        yield 'history.move', size, measure(move_items, repeat), NUM_OPS
+
+        removed = []
+
+        def remove_items(history=history, removed=removed):
+            for _ in range(NUM_OPS):
+                idx = rng.randrange(len(history))
+                removed.append(history[idx])
+                history.remove(idx)
+
+        def restore_removed(history=history, removed=removed):
+            history.extend(removed)
+            removed.clear()
+
+        elapsed = measure(remove_items, repeat, setup=restore_removed)
+        restore_removed()
+        yield 'history.remove', size, elapsed, NUM_OPS
+
+        def show(history=history):
+            with open(os.devnull, 'w', encoding='utf-8') as f, contextlib.redirect_stdout(f):
+                history.show()
+
+        yield 'history.show', size, measure(show, repeat), size
+
+def git_commit():
+    """現在のコミットの短いハッシュを返す．
+
+    Returns:
+        コミットのハッシュ．gitが使えない場合は「unknown」．
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+                              universal_newlines=True).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare(results, old_path, threshold):
+    """以前の結果と比較した表を表示する．
+
+    Args:
+        results: 今回の結果のリスト
+        old_path: 以前の結果のファイルのパス
+        threshold: 遅くなったとみなす時間の比
+
+    Returns:
+        遅くなったケースがある場合はTrue
+    """
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+
+    old_results = {(result['name'], result['size']): result for result in old['results']}
+
+    print()
+    print('|ケース|大きさ|{} [ms]|今回 [ms]|比|'.format(old['meta']['commit']))
+    regressed = False
+    for result in results:
+        old_result = old_results.get((result['name'], result['size']))
+        if old_result is None:
+            continue
+
+        ratio = result['seconds'] / old_result['seconds'] if old_result['seconds'] > 0 else 0
+        slower = ratio > threshold
+        regressed = regressed or slower
+        print('|{}|{}|{:.2f}|{:.2f}|{:.2f}{}|'.format(
+            result['name'], result['size'], old_result['seconds']*1000,
+            result['seconds']*1000, ratio, ' (遅化)' if slower else ''))
+
+    return regressed
+
+def parse():
+    """コマンドライン引数を解析する．
+
+    Returns:
+        解析結果
+    """
+    parser = argparse.ArgumentParser(description='姓名の計算・画数保存ファイル・名前履歴のベンチマーク．')
+    parser.add_argument('--sizes', type=lambda s: [int(val) for val in s.split(',')],
+                        default=list(HISTORY_SIZES),
+                        help='名前履歴の項目数．カンマ区切りで複数指定できます．')
+    parser.add_argument('--dict-sizes', type=lambda s: [int(val) for val in s.split(',')],
+                        default=list(DICT_SIZES),
+                        help='画数保存ファイルの文字数．カンマ区切りで複数指定できます．')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='各ケースを計測する回数．')
+    parser.add_argument('--groups', type=lambda s: s.split(','), default=list(GROUPS),
+                        help=('計測するケースのグループ (core, kakusuu, history)．'
+                              'カンマ区切りで複数指定できます．'))
+    parser.add_argument('--stub-latency', type=float, default=0.0,
+                        help='スタブサーバの応答の遅延 (秒)．')
+    parser.add_argument('--output', type=str, default=None,
+                        help='結果を保存するファイル．省略時は bench_<コミット>.json になります．')
+    parser.add_argument('--compare', type=str, default=None, metavar='FILE',
+                        help='比較する以前の結果のファイル．')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='遅くなったとみなす時間の比．省略時は {} になります．'.format(THRESHOLD))
+    return parser.parse_args()
+
+def main():
+    """ベンチマークを実行する．
+    """
+    args = parse()
+    commit = git_commit()
+
+    results = []
+    print('|ケース|大きさ|時間 [ms]|1回あたり [us]|')
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        benches = {'core': lambda: bench_core(args.repeat, args.stub_latency),
+                   'kakusuu': lambda: bench_kakusuu(tmp_dir, args.dict_sizes, args.repeat),
+                   'history': lambda: bench_history(tmp_dir, args.sizes, args.repeat)}
+        for group in GROUPS:
+            if group not in args.groups:
+                continue
+
+            for name, size, elapsed, num_ops in benches[group]():
+                results.append({'name': name, 'size': size, 'seconds': elapsed,
+                                'ops': num_ops, 'us_per_op': elapsed / num_ops * 1e6})
+                print('|{}|{}|{:.2f}|{:.2f}|'.format(name, size, elapsed*1000,
+                                                     elapsed / num_ops * 1e6), flush=True)
+
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    output = args.output if args.output is not None else 'bench_{}.json'.format(commit)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'meta': {'commit': commit,
+                            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                            'python': platform.python_version(),
+                            'platform': platform.platform(),
+                            'repeat': args.repeat,
+                            'stub_latency': args.stub_latency},
+                   'results': results}, f, ensure_ascii=False, indent=1)
+
+    print()
+    print('{}に保存しました．'.format(output))
+
+    if args.compare is not None and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""ベンチマーク用のMJ文字情報APIのスタブサーバを含むモジュール．
+
+ローカルでMJ文字情報APIと同じ形式のJSONを返すHTTPサーバを起動し，
+mji.MJI_URLをスタブサーバに向けることで，ネットワークに接続せずに画数の取得を計測する．
+返す画数はsynthetic.stroke_countと同じ．
+
+使用例
+with MJIStub(latency=0.01) as stub:
+    ...
+    print(stub.num_requests)
+"""
+# pylint: disable=C0103
+
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from seimei import mji  # pylint: disable=C0413
+from synthetic import stroke_count  # pylint: disable=C0413
+
+class _StubServer(ThreadingMixIn, HTTPServer):
+    """リクエストごとにスレッドで応答するスタブサーバ．
+    """
+    daemon_threads = True
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """「/mji/q?UCS=...」に画数 (総画数) を返すハンドラ．
+    """
+    protocol_version = 'HTTP/1.1'
+
+    # ヘッダと本文を別々に送るため，Nagleアルゴリズムによる遅延を避ける
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=C0111
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        char = chr(int(query['UCS'][0], 16))
+
+        stub = self.server.stub
+        with stub.lock:
+            stub.num_requests += 1
+
+        if stub.latency > 0:
+            time.sleep(stub.latency)
+
+        body = json.dumps({'results': [{'総画数': stroke_count(char)}]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        pass
+
+class MJIStub:
+    """MJ文字情報APIのスタブサーバ．
+
+    withブロックの間だけ起動し，mji.MJI_URLをスタブサーバのURLに置き換える．
+
+    Attributes:
+        latency: 1リクエストあたりの応答の遅延 (秒)
+        num_requests: 受け付けたリクエストの数
+        lock: num_requestsを更新するためのロック
+        url: スタブサーバのURL
+    """
+    def __init__(self, latency=0.0):
+        """初期化．
+
+        Args:
+            latency: 1リクエストあたりの応答の遅延 (秒)
+        """
+        self.latency = latency
+        self.num_requests = 0
+        self.lock = threading.Lock()
+        self.url = None
+        self._server = None
+        self._thread = None
+        self._saved_url = None
+
+    def __enter__(self):
+        self._server = _StubServer(('127.0.0.1', 0), _StubHandler)
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        self.url = 'http://127.0.0.1:{}/mji/q?UCS=%'.format(self._server.server_address[1])
+        self._saved_url = mji.MJI_URL
+        mji.MJI_URL = self.url
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        mji.MJI_URL = self._saved_url
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -0,0 +1,206 @@
+"""ベンチマーク用の合成データを作成するモジュール．
+
+姓名，名前情報，名前履歴ファイル，画数保存ファイルを乱数のシードから決定的に作成する．
+同じ引数であれば常に同じデータになるため，コミット間で計測結果を比較できる．
+
+* 姓は漢字2文字で，項目番号から決まるため重複しない．
+* 名は漢字1〜3文字か，ひらがな・カタカナ2〜3文字 (KANA_RATIOの割合) とする．
+* 姓名に同じ文字は2回以上使わない．
+* 漢字の画数は文字コードから決める (mji_stubが返す画数と同じ)．
+"""
+# pylint: disable=C0103
+
+import os
+import random
+import sys
+import unicodedata
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from seimei.history_columns import GOKAKU_KEYS  # pylint: disable=C0413
+from seimei.kakusuu import kana_table  # pylint: disable=C0413
+from seimei.seimei_core import Seimei  # pylint: disable=C0413
+from seimei.seimei_history import SeimeiHistory  # pylint: disable=C0413
+from seimei.seimei_item import SeimeiItem  # pylint: disable=C0413
+from seimei.seimei_search import gokaku  # pylint: disable=C0413
+
+# CJK統合漢字 (基本)
+KANJI = tuple(chr(codepoint) for codepoint in range(0x4E00, 0xA000))
+
+# 画数保存ファイルに使う文字 (CJK統合漢字の拡張A, 基本, 拡張B〜)
+DICT_CODEPOINTS = tuple(range(0x3400, 0xA000)) + tuple(range(0x20000, 0x32000))
+
+# 名をひらがな・カタカナにする割合
+KANA_RATIO = 0.2
+
+# 姓が項目番号の順に並ばないようにするための乗数 (素数)
+_FAMILY_STRIDE = 7919
+
+def stroke_count(char):
+    """漢字の合成データ上の画数を返す．
+
+    Args:
+        char: 文字
+
+    Returns:
+        画数 (1〜30)
+    """
+    return ord(char) % 30 + 1
+
+def kana_chars():
+    """名に使うひらがな・カタカナを返す．
+
+    Returns:
+        文字のリスト
+    """
+    return sorted(char for char in kana_table()
+                  if '\u3041' <= char <= '\u3096' or '\u30a1' <= char <= '\u30fa')
+
+def halfwidth(text):
+    """カタカナを半角カタカナ (濁点・半濁点は別の文字) にする．
+
+    半角の文字がないカタカナと，カタカナ以外の文字はそのままにする．
+
+    Args:
+        text: 文字列
+
+    Returns:
+        文字列
+    """
+    table = {unicodedata.normalize('NFKC', chr(code)): chr(code)
+             for code in range(0xff66, 0xff9e)}
+    marks = {'\u3099': '\uff9e', '\u309a': '\uff9f'}
+
+    result = ''
+    for char in text:
+        base, *mark = unicodedata.normalize('NFD', char)
+        if base in table and all(val in marks for val in mark):
+            result += table[base] + ''.join(marks[val] for val in mark)
+
+        else:
+            result += char
+
+    return result
+
+def names(size, seed=0, chars=KANJI):
+    """重複しない姓名を作成する．
+
+    姓の1文字目は漢字の候補の前半，2文字目は後半から選ぶ．
+    姓名の数が前半と後半の文字数の積を超える場合は，同じ姓名が現れる．
+
+    Args:
+        size: 姓名の数
+        seed: 乱数のシード
+        chars: 漢字の候補 (4文字以上)
+
+    Yields:
+        姓と名のタプル
+    """
+    rng = random.Random(seed)
+    kana = kana_chars()
+    half = len(chars) // 2
+    capacity = half*(len(chars) - half)
+    for i in range(size):
+        code = i*_FAMILY_STRIDE % capacity
+        family = chars[code % half] + chars[half + code // half]
+        while True:
+            if rng.random() < KANA_RATIO:
+                given = ''.join(rng.sample(kana, rng.randint(2, 3)))
+
+            else:
+                given = ''.join(rng.sample(chars, rng.randint(1, 3)))
+
+            if not set(family) & set(given):
+                break
+
+        yield family, given
+
+def item(family, given):
+    """姓名の名前情報を合成データ上の画数で作成する．
+
+    Args:
+        family: 姓
+        given: 名
+
+    Returns:
+        名前情報
+    """
+    kana = kana_table()
+    kakusuu_family = [kana[char] if char in kana else stroke_count(char) for char in family]
+    kakusuu_given = [kana[char] if char in kana else stroke_count(char) for char in given]
+    values = gokaku(kakusuu_family, kakusuu_given)
+    gogyo_dict = {'天格': Seimei.genso_str(values[0]),
+                  '人格': Seimei.genso_str(values[1]),
+                  '地格': Seimei.genso_str(values[2]),
+                  '運勢': Seimei.gogyo(*values[:3])}
+    return SeimeiItem(family, given, dict(zip(family + given, kakusuu_family + kakusuu_given)),
+                      dict(zip(GOKAKU_KEYS, values)), gogyo_dict)
+
+def items(size, seed=0):
+    """重複しない名前情報を作成する．
+
+    Args:
+        size: 項目数
+        seed: 乱数のシード
+
+    Yields:
+        名前情報
+    """
+    for family, given in names(size, seed):
+        yield item(family, given)
+
+def history(size, seed=0):
+    """名前履歴を作成する．
+
+    Args:
+        size: 項目数
+        seed: 乱数のシード
+
+    Returns:
+        名前履歴
+    """
+    result = SeimeiHistory()
+    result.extend(items(size, seed))
+    return result
+
+def write_history_csv(filepath, size, seed=0):
+    """名前履歴ファイルを作成する．
+
+    Args:
+        filepath: 作成するファイルのパス
+        size: 行数
+        seed: 乱数のシード
+    """
+    with open(filepath, 'w', encoding='utf-8') as f:
+        for name in items(size, seed):
+            f.write('{},{},{},{},{},\n'.format(
+                name.family, name.given,
+                ','.join(str(val) for val in name.gokaku_dict.values()),
+                ','.join(name.gogyo_dict.values()),
+                ','.join(str(val) for val in name.char_kakusuu_dict.values())))
+
+def kakusuu_dict(size, seed=0):
+    """画数の辞書を作成する．
+
+    Args:
+        size: 文字数
+        seed: 乱数のシード
+
+    Returns:
+        文字と画数の辞書
+    """
+    rng = random.Random(seed)
+    return {chr(codepoint): stroke_count(chr(codepoint))
+            for codepoint in rng.sample(DICT_CODEPOINTS, size)}
+
+def write_kakusuu_csv(filepath, size, seed=0):
+    """画数保存ファイルを作成する．
+
+    Args:
+        filepath: 作成するファイルのパス
+        size: 文字数
+        seed: 乱数のシード
+    """
+    with open(filepath, 'w', encoding='utf-8') as f:
+        for char, kakusuu in kakusuu_dict(size, seed).items():
+            f.write('{},{}\n'.format(char, kakusuu))
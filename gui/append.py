@@ -5,13 +5,13 @@ import os
 import tkinter as tk
 import tkinter.ttk as ttk
 from tkinter.font import Font
-from seimei.seimei_core import Seimei
 from tkinter import messagebox
 
 class AppendFrame(tk.Frame):
     """姓名を登録するためのフレーム．
 
     Attributes:
+        session: 履歴と画数の辞書を保持するセッション
         master: マスタ
         item: 姓名データ
         font_family: フォント種類
@@ -30,15 +30,15 @@ class AppendFrame(tk.Frame):
         ok: OKボタン
         cancel: キャンセルボタン
     """
-    def __init__(self, kakusuu_dict_path, master=None):
+    def __init__(self, session, master=None):
         """初期化をする．
 
         Args:
-            kakusuu_dict_path: 画数履歴フィアルのパス
+            session: 履歴と画数の辞書を保持するセッション
             master: マスタ
         """
         super().__init__(master)
-        self.kakusuu_dict_path = kakusuu_dict_path
+        self.session = session
         self.master = master
         self.item = None
         self.font_family = 'IPAゴシック' if os.name == 'posix' else 'ＭＳ ゴシック'
@@ -213,10 +213,9 @@ class AppendFrame(tk.Frame):
         given = self.given_entry.get()
 
         try:
-            name = Seimei(family, given, kakusuu_path=self.kakusuu_dict_path)
+            item = self.session.data(family, given)
             self.view.configure(state=tk.NORMAL)
             self.view.delete('1.0', 'end')
-            item = name.data()
             self.view.insert('end', str(item))
             self.error_message.set('')
 
@@ -236,8 +235,7 @@ class AppendFrame(tk.Frame):
         given = self.given_entry.get()
 
         try:
-            name = Seimei(family, given, kakusuu_path=self.kakusuu_dict_path)
-            self.item = name.data()
+            self.item = self.session.data(family, given)
             self.item.note = self.note.get('1.0', 'end')
             self.master.destroy()
 
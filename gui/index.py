@@ -7,9 +7,8 @@ import tkinter as tk
 import tkinter.ttk as ttk
 from tkinter.font import Font
 from tkinter import messagebox
-import numpy as np
 
-from seimei.seimei_history import SeimeiHistory
+from seimei.seimei_session import SeimeiSession
 from gui.append import AppendFrame
 
 class SeimeiFrame(tk.Frame):
@@ -17,8 +16,8 @@ class SeimeiFrame(tk.Frame):
 
     Attributes:
         master: マスタ
+        session: 履歴と画数の辞書を保持するセッション
         history: 姓名データ
-        kakusuu_dict_path: 文字と画数の辞書ファイルのパス
         header_label: ヘッダラベル
         info_header_label: 詳細情報ヘッダラベル
         tree: 履歴表示部
@@ -38,18 +37,19 @@ class SeimeiFrame(tk.Frame):
         ok: OKボタン
         cancel: キャンセルボタン
     """
-    def __init__(self, history_path, kakusuu_dict_path, master=None):
+    def __init__(self, history_path, kakusuu_dict_path, master=None, kakusuu_table_path=None):
         """初期化をする．
 
         Args:
             history_path: 姓名データファイルへのパス
             kakusuu_dict_path: 画数履歴フィアルのパス
             master: マスタ
+            kakusuu_table_path: 画数表のファイルのパス
         """
         super().__init__(master)
         self.master = master
-        self.history = SeimeiHistory(history_path)
-        self.kakusuu_dict_path = kakusuu_dict_path
+        self.session = SeimeiSession(history_path, kakusuu_dict_path, kakusuu_table_path)
+        self.history = self.session.history
         self.view_item = None
         self.font_family = 'IPAゴシック' if os.name == 'posix' else 'ＭＳ ゴシック'
 
@@ -200,7 +200,13 @@ class SeimeiFrame(tk.Frame):
         """
         item = self.view_item
         if item:
-            item.note = self.note.get('1.0', 'end').replace('\n', '\\n')
+            note = self.note.get('1.0', 'end').replace('\n', '\\n')
+            idx = self.history.find(item.family, item.given)
+            if idx is None:
+                item.note = note
+                return
+
+            self.history.set_note(idx, note)
 
     def create_buttons(self):
         """ボタンを生成する．
@@ -275,15 +281,37 @@ class SeimeiFrame(tk.Frame):
         """
         self.tree.delete(*self.tree.get_children())
         for i, item in enumerate(self.history):
-            family = item.family
-            given = item.given
-            tenkaku = item.gokaku_dict['天格']
-            jinkaku = item.gokaku_dict['人格']
-            tikaku = item.gokaku_dict['地格']
-            gaikaku = item.gokaku_dict['外格']
-            soukaku = item.gokaku_dict['総格']
-            self.tree.insert('', 'end', values=(i+1, family, given, tenkaku,
-                                                jinkaku, tikaku, gaikaku, soukaku))
+            self.tree.insert('', 'end', values=self.row_values(i, item))
+
+    def update_rows(self, indices):
+        """指定された位置の行だけ表示データを更新する．
+
+        Args:
+            indices: 更新する行のインデックス
+
+        Returns:
+            全行のリスト
+        """
+        children = self.tree.get_children()
+        for idx in indices:
+            self.tree.item(children[idx], values=self.row_values(idx, self.history[idx]))
+
+        return children
+
+    @staticmethod
+    def row_values(idx, item):
+        """表示する行の値を返す．
+
+        Args:
+            idx: 行のインデックス
+            item: 名前情報
+
+        Returns:
+            行の値のタプル
+        """
+        return (idx+1, item.family, item.given, item.gokaku_dict['天格'],
+                item.gokaku_dict['人格'], item.gokaku_dict['地格'],
+                item.gokaku_dict['外格'], item.gokaku_dict['総格'])
 
     def on_save(self, event=None):
         """保存する．
@@ -296,7 +324,9 @@ class SeimeiFrame(tk.Frame):
         """
         res = messagebox.askokcancel(title='確認', message='保存してよろしいですか？')
         if res:
-            self.history.save()
+            # 他のプロセスの変更を取り込んだ場合があるため表示し直す
+            self.session.save()
+            self.update_view()
 
         return res
 
@@ -356,20 +386,10 @@ class SeimeiFrame(tk.Frame):
         if not moved:
             return
 
-        self.update_view()
-        sorted_indices = iter(np.sort(indices))
-
-        items = []
-        try:
-            idx = next(sorted_indices)
-            for item in self.tree.get_children():
-                tree_idx = self.tree.item(item)['values'][0] - 1
-                if tree_idx == idx - 1:
-                    items.append(item)
-                    idx = next(sorted_indices)
-
-        except StopIteration:
-            pass
+        # 移動元と移動先の行だけ更新する
+        sorted_indices = sorted(indices)
+        children = self.update_rows(set(indices) | {idx - 1 for idx in indices})
+        items = [children[idx - 1] for idx in sorted_indices]
 
         self.tree.selection_set(*items)
         for item in items:
@@ -395,20 +415,10 @@ class SeimeiFrame(tk.Frame):
         if not moved:
             return
 
-        self.update_view()
-        sorted_indices = iter(np.sort(indices))
-
-        items = []
-        try:
-            idx = next(sorted_indices)
-            for item in self.tree.get_children():
-                tree_idx = self.tree.item(item)['values'][0] - 1
-                if tree_idx == idx + 1:
-                    items.append(item)
-                    idx = next(sorted_indices)
-
-        except StopIteration:
-            pass
+        # 移動元と移動先の行だけ更新する
+        sorted_indices = sorted(indices)
+        children = self.update_rows(set(indices) | {idx + 1 for idx in indices})
+        items = [children[idx + 1] for idx in sorted_indices]
 
         self.tree.selection_set(*items)
         for item in items:
@@ -450,7 +460,7 @@ class SeimeiFrame(tk.Frame):
             return
 
         dlg = tk.Toplevel()
-        frame = AppendFrame(self.kakusuu_dict_path, dlg)
+        frame = AppendFrame(self.session, dlg)
         dlg.grab_set()
         dlg.focus_set()
         dlg.wait_window(dlg)
@@ -27,32 +27,76 @@ $ python seimei.py -i 5
 GUIモード
 $ python seimei.py -g
 
+名の探索
+$ python seimei.py --search 田中 --chars pool.txt --len 1-3 --unsei 大吉 --soukaku 24,31
+
+画数表の作成
+$ python seimei.py --build-table Unihan_IRGSources.txt
+
+サーバモード
+$ python seimei.py --serve --port 8080
+
+フィルタモード
+$ python seimei.py --stdin --format jsonl < names.txt
+
+処理の回数と時間の表示
+$ python seimei.py --import names.txt --stats
+
 [1] たまごクラブ編, たまひよ 赤ちゃんのしあわせ名前事典 2020〜2021年版,
     株式会社ベネッセコーポレーション，東京，2019.
 [2] 独立行政法人 情報処理推進機構, MJ文字情報API, http://mojikiban.ipa.go.jp/mji/,
     最終閲覧:2020年2月16日.
 """
-# pylint: disable=R0902, R0914, C0103
+# pylint: disable=R0902, R0914, C0103, C0415
 
 import os
+import signal
+import sys
+import time
 import argparse
 import configparser
-import urllib.request
+import urllib.error
 
-from seimei.seimei_core import Seimei
+from seimei import metrics
 from seimei.seimei_history import SeimeiHistory
 
-import tkinter as tk
-from gui.index import SeimeiFrame
+# フィルタモードで履歴を保存する間隔 (秒)
+SAVE_INTERVAL = 10.0
+
+# 表示・削除などのモードで起動時間を短くするため，
+# 画数の取得・計算・GUI・サーバのモジュールは各モードの関数の中で読み込む
 
-def show(filepath):
+def show(filepath, page=None, page_size=20, head=None, tail=None):
     """履歴を表示する．
 
+    履歴ファイル全体は読み込まず，読み込んだ行から順に表示する．
+
     Args:
         filepath: 履歴のファイルパス
+        page: 表示するページ番号 (1始まり)．Noneの場合はすべて表示する．
+        page_size: 1ページあたりの項目数
+        head: 先頭から表示する項目数
+        tail: 末尾から表示する項目数
     """
-    history = SeimeiHistory(filepath)
-    history.show()
+    if [page, head, tail].count(None) < 2:
+        raise RuntimeError('--page, --head, --tailはいずれか1つだけ指定して下さい．')
+
+    if tail is not None:
+        SeimeiHistory.show_file(filepath, tail=tail)
+        return
+
+    if head is not None:
+        SeimeiHistory.show_file(filepath, 0, head)
+        return
+
+    if page is not None:
+        if page < 1 or page_size < 1:
+            raise RuntimeError('ページ番号とページあたりの項目数は1以上を指定して下さい．')
+
+        SeimeiHistory.show_file(filepath, (page - 1)*page_size, page*page_size)
+        return
+
+    SeimeiHistory.show_file(filepath)
 
 def remove(filepath, remove_ids):
     """履歴を削除する．
@@ -211,7 +255,37 @@ def info(filepath, info_idx):
     print()
     history[info_idx].show()
 
-def append(family, given, seimei_history_path, kakusuu_dict_path):
+def query(filepath, cond, chars, sort_keys):
+    """条件を満たす履歴の項目を表示する．
+
+    Args:
+        filepath: 履歴のファイルパス
+        cond: 項目の名前と許容する値のリストの辞書
+        chars: 姓名に含む文字
+        sort_keys: 並べ替えに使う項目の名前のリスト
+    """
+    history = SeimeiHistory(filepath)
+    indices = history.query(cond, chars, sort_keys)
+    for idx in indices:
+        print(SeimeiHistory.format_row(idx, history[idx]))
+
+    print()
+    print('{}件見つかりました．'.format(len(indices)))
+
+def query_field(name):
+    """コマンドライン引数の項目の名前を検索用の項目の名前に変換する．
+
+    Args:
+        name: 項目の名前 (tenkakuなどのオプション名も可)．先頭に「-」を付けると降順．
+
+    Returns:
+        検索用の項目の名前
+    """
+    prefix = '-' if name.startswith('-') else ''
+    name = name.lstrip('-')
+    return prefix + QUERY_OPTIONS.get(name, name)
+
+def append(family, given, seimei_history_path, kakusuu_dict_path, kakusuu_table_path=None):
     """姓名を登録する．
 
     Args:
@@ -219,6 +293,7 @@ def append(family, given, seimei_history_path, kakusuu_dict_path):
         given: 名
         seimei_history_path: 履歴の保存先ファイルパス
         kakusuu_dict_path: 画数辞書の保存先ファイルパス
+        kakusuu_table_path: 画数表のファイルパス
     """
     if not family and not given:
         print()
@@ -240,9 +315,274 @@ def append(family, given, seimei_history_path, kakusuu_dict_path):
 
         family, given = input_str.split(' ', 1)
 
-    name = Seimei(family, given, seimei_history_path, kakusuu_dict_path)
+    from seimei.seimei_session import SeimeiSession
+
+    session = SeimeiSession(seimei_history_path, kakusuu_dict_path, kakusuu_table_path)
+    name = session.seimei(family, given)
     name.show_name_status()
-    name.save()
+    session.save()
+
+def read_names(lines):
+    """「姓 名」の形式の行から姓名を1つずつ返す．
+
+    空行と「#」で始まる行は読み飛ばす．
+
+    Args:
+        lines: 行の列 (ファイルなど)
+
+    Yields:
+        姓と名のタプル
+    """
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line[0] == '#':
+            continue
+
+        fields = line.split()
+        if len(fields) != 2:
+            raise RuntimeError('{}行目が「姓 名」の形式ではありません．'.format(line_no))
+
+        yield fields[0], fields[1]
+
+def import_names(names_path, max_workers, seimei_history_path, kakusuu_dict_path,
+                 kakusuu_table_path=None):
+    """ファイルまたは標準入力の姓名をまとめて登録する．
+
+    履歴・画数辞書は最後に一度だけ保存する．
+
+    Args:
+        names_path: 「姓 名」の形式の行からなるファイルのパス．「-」の場合は標準入力．
+        max_workers: 計算に使うプロセス数
+        seimei_history_path: 履歴の保存先ファイルパス
+        kakusuu_dict_path: 画数辞書の保存先ファイルパス
+        kakusuu_table_path: 画数表のファイルパス
+    """
+    from seimei.seimei_session import SeimeiSession
+
+    start = time.perf_counter()
+    session = SeimeiSession(seimei_history_path, kakusuu_dict_path, kakusuu_table_path)
+
+    if names_path == '-':
+        num_read, num_added, num_skipped = session.import_names(read_names(sys.stdin),
+                                                                max_workers=max_workers)
+
+    else:
+        with open(names_path, 'r', encoding='utf-8') as f:
+            num_read, num_added, num_skipped = session.import_names(read_names(f),
+                                                                    max_workers=max_workers)
+
+    session.save()
+    elapsed = time.perf_counter() - start
+
+    print('{}件を読み込み，{}件を追加しました (重複: {}件, 画数不明: {}件)．'.format(
+        num_read, num_added, num_read - num_added - num_skipped, num_skipped))
+    print('{:.2f}秒 ({:.0f}件/秒)'.format(elapsed, num_read / elapsed if elapsed > 0 else 0))
+
+def filter_names(output_format, save, save_interval, seimei_history_path, kakusuu_dict_path,
+                 kakusuu_table_path=None):
+    """標準入力の「姓 名」の行を1行ずつ計算し，名前情報を標準出力する．
+
+    履歴・画数辞書は最初に一度だけ読み込み，すべての行で使い回す．
+    名前情報は1行計算するたびに出力する．
+    計算できなかった行は，jsonl形式では行番号とエラーメッセージ (error) を出力し，
+    text形式では標準エラー出力にエラーメッセージを出力して，次の行に進む．
+    履歴への追加は一定時間ごとにまとめて保存し，終了時 (Ctrl+C, SIGTERMを含む) にも保存する．
+
+    Args:
+        output_format: 出力形式 (text: 表形式の1行, jsonl: 1行に1つのJSON)
+        save: 履歴に追加して保存する場合はTrue
+        save_interval: 保存する間隔 (秒)．0の場合は1件追加するたびに保存する．
+        seimei_history_path: 履歴の保存先ファイルパス
+        kakusuu_dict_path: 画数辞書の保存先ファイルパス
+        kakusuu_table_path: 画数表のファイルパス
+    """
+    import json
+    from seimei.seimei_session import SeimeiSession
+
+    signal.signal(signal.SIGTERM, on_terminate)
+
+    session = SeimeiSession(seimei_history_path, kakusuu_dict_path, kakusuu_table_path)
+    history = session.history
+    num_unsaved = 0
+    last_saved = time.monotonic()
+    try:
+        for line_no, line in enumerate(sys.stdin, 1):
+            line = line.strip()
+            if not line or line[0] == '#':
+                continue
+
+            fields = line.split()
+            try:
+                if len(fields) != 2:
+                    raise RuntimeError('{}行目が「姓 名」の形式ではありません．'.format(line_no))
+
+                item = session.data(fields[0], fields[1])
+
+            except (RuntimeError, urllib.error.URLError) as e:
+                if output_format == 'jsonl':
+                    print(json.dumps({'line': line_no, 'error': str(e)}, ensure_ascii=False),
+                          flush=True)
+
+                else:
+                    print('ERROR: {}行目: {}'.format(line_no, e), file=sys.stderr, flush=True)
+
+                continue
+
+            if output_format == 'jsonl':
+                print(json.dumps(item.to_dict(), ensure_ascii=False), flush=True)
+
+            else:
+                print('|{} {}|{}|{}|'.format(
+                    item.family, item.given,
+                    ', '.join(['{}: {:2d}'.format(key, val)
+                               for key, val in item.gokaku_dict.items()]),
+                    item.gogyo_dict['運勢']), flush=True)
+
+            if not save or item in history:
+                continue
+
+            session.add(item)
+            num_unsaved += 1
+            if time.monotonic() - last_saved >= save_interval:
+                session.save()
+                num_unsaved = 0
+                last_saved = time.monotonic()
+
+    except BrokenPipeError:
+        # 出力先 (headなど) が先に終了した場合は，残りの行を読まずに保存して終了する
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        if save and num_unsaved:
+            session.save()
+
+def search(family, chars_path, len_str, gokaku_cond, unsei_cond, max_workers,
+           kakusuu_dict_path, kakusuu_table_path=None):
+    """条件を満たす名を探索し，見つかった順に表示する．
+
+    Args:
+        family: 姓
+        chars_path: 名に使う文字の候補を記載したファイルのパス
+        len_str: 名の文字数 (「2」または「1-3」の形式)
+        gokaku_cond: 五格の名前と許容する値のリストの辞書
+        unsei_cond: 許容する運勢のリスト．Noneの場合は条件なし．
+        max_workers: 探索に使うプロセス数
+        kakusuu_dict_path: 画数辞書の保存先ファイルパス
+        kakusuu_table_path: 画数表のファイルパス
+    """
+    if chars_path is None:
+        raise RuntimeError('--charsで名に使う文字の候補のファイルを指定して下さい．')
+
+    chars = []
+    with open(chars_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line[0] == '#':
+                continue
+
+            chars.extend(line)
+
+    try:
+        len_range = [int(val) for val in len_str.split('-', 1)]
+
+    except ValueError:
+        raise RuntimeError('文字数は「2」または「1-3」の形式で指定して下さい．')
+
+    from seimei.kakusuu import Kakusuu
+    from seimei.seimei_search import SeimeiSearch
+
+    kakusuu = Kakusuu(kakusuu_dict_path, kakusuu_table_path)
+    seimei_search = SeimeiSearch(family, chars, len_range[0], len_range[-1],
+                                 gokaku_cond, unsei_cond, kakusuu_dict_path, kakusuu)
+    seimei_search.save()
+
+    num_found = 0
+    for item in seimei_search.search(max_workers):
+        num_found += 1
+        print('|{:5d}|{} {}|{}|{}|'.format(
+            num_found, item.family, item.given,
+            ', '.join(['{}: {:2d}'.format(key, val) for key, val in item.gokaku_dict.items()]),
+            item.gogyo_dict['運勢']), flush=True)
+
+    print()
+    print('{}件見つかりました．'.format(num_found))
+
+def serve(host, port, max_workers, seimei_history_path, kakusuu_dict_path,
+          kakusuu_table_path=None):
+    """姓名の計算と履歴の参照をJSONで返すHTTPサーバを起動する．
+
+    Ctrl+CまたはSIGTERMで終了し，保存していない変更を保存する．
+
+    Args:
+        host: 待ち受けるホスト名
+        port: 待ち受けるポート番号
+        max_workers: リクエストを処理するスレッド数
+        seimei_history_path: 履歴の保存先ファイルパス
+        kakusuu_dict_path: 画数辞書の保存先ファイルパス
+        kakusuu_table_path: 画数表のファイルパス
+    """
+    from seimei.seimei_server import SeimeiServer, SeimeiService
+
+    signal.signal(signal.SIGTERM, on_terminate)
+
+    service = SeimeiService(seimei_history_path, kakusuu_dict_path, kakusuu_table_path)
+    try:
+        server = SeimeiServer((host, port), service, max_workers)
+        print('http://{}:{}/ で待ち受けています (Ctrl+Cで終了)．'.format(host, port), flush=True)
+        try:
+            server.serve_forever()
+
+        except KeyboardInterrupt:
+            print()
+
+        finally:
+            server.server_close()
+
+    finally:
+        service.close()
+
+def on_terminate(signum, frame):  # pylint: disable=W0613
+    """SIGTERMを受け取ったときに，Ctrl+Cと同じく保存して終了させるためのハンドラ．
+
+    Args:
+        signum: シグナル番号
+        frame: 現在のスタックフレーム
+    """
+    raise KeyboardInterrupt
+
+def build_table(src_path, kakusuu_table_path):
+    """画数の元データから画数表を作成する．
+
+    Args:
+        src_path: 画数の元データのファイルパス
+            「文字,画数」の形式か，Unihanデータベースの形式のファイルを指定する．
+        kakusuu_table_path: 画数表の保存先ファイルパス
+    """
+    from seimei import kakusuu_table
+
+    num_chars = kakusuu_table.build(src_path, kakusuu_table_path)
+    print('{}文字の画数表を{}に作成しました．'.format(num_chars, kakusuu_table_path))
+
+# 検索モードのオプション名と検索用の項目の名前
+QUERY_OPTIONS = {'tenkaku': '天格', 'jinkaku': '人格', 'tikaku': '地格',
+                 'gaikaku': '外格', 'soukaku': '総格',
+                 'gogyo-tenkaku': '五行：天格', 'gogyo-jinkaku': '五行：人格',
+                 'gogyo-tikaku': '五行：地格', 'unsei': '運勢',
+                 'family-len': '姓の文字数', 'given-len': '名の文字数'}
+
+def int_list(values_str):
+    """カンマ区切りの整数のリストを返す．
+
+    Args:
+        values_str: カンマ区切りの整数の文字列
+
+    Returns:
+        整数のリスト
+    """
+    return [int(val) for val in values_str.split(',')]
 
 def create_files(seimei_csv, kakusuu_csv):
     """デフォルトの履歴・画数ファイルを生成する．
@@ -272,6 +612,15 @@ def parse():
     parser.add_argument('--config', '-c', action='store', default='config.ini', type=str,
                         help='設定ファイル．省略時は config.ini になります．')
     parser.add_argument('--show', '-s', action='store_true', help='表示モード．')
+    parser.add_argument('--page', action='store', type=int, default=None,
+                        help=('表示モードで表示するページ番号．\n'
+                              '例えば，「-s --page 3 --page-size 50」で101〜150番目の項目を表示します．'))
+    parser.add_argument('--page-size', action='store', type=int, default=20,
+                        help='表示モードの1ページあたりの項目数．省略時は 20 になります．')
+    parser.add_argument('--head', action='store', type=int, default=None,
+                        help='表示モードで先頭から表示する項目数．')
+    parser.add_argument('--tail', action='store', type=int, default=None,
+                        help='表示モードで末尾から表示する項目数．')
     parser.add_argument('--remove', '-r', action='store', nargs='*', default=None, type=int,
                         help=('削除モード．\n'
                               '表示モードの一番左の番号をスペース区切りで指定してください．\n'
@@ -290,6 +639,84 @@ def parse():
                               '例えば，「-i 5」で5番目の項目の詳細が表示されます．\n'
                               '「-i」だけの場合は対話モードになります．'))
     parser.add_argument('--gui', '-g', action='store_true', help='GUIモード')
+    parser.add_argument('--search', action='store', type=str, default=None, metavar='姓',
+                        help=('探索モード．\n'
+                              '指定した姓に対して，条件を満たす名を探索します．\n'
+                              '例えば，「--search 田中 --chars pool.txt --len 1-3 '
+                              '--unsei 大吉 --soukaku 24,31」で，\n'
+                              'pool.txtに含まれる文字からなる1から3文字の名のうち，\n'
+                              '運勢が大吉で総格が24または31になるものを表示します．'))
+    parser.add_argument('--build-table', action='store', type=str, default=None,
+                        metavar='SRC',
+                        help=('画数表作成モード．\n'
+                              '「文字,画数」の形式か，Unihanデータベース (kTotalStrokes) の\n'
+                              '形式の画数の元データから，設定ファイルの画数表を作成します．\n'
+                              '画数表に含まれる文字は，ネットワークに接続せずに画数が求まります．'))
+    parser.add_argument('--import', action='store', type=str, default=None, metavar='FILE',
+                        dest='import_path',
+                        help=('一括登録モード．\n'
+                              '「姓 名」の形式の行からなるファイルの姓名をまとめて登録します．\n'
+                              '「--import -」の場合は標準入力から読み込みます．\n'
+                              '計算に使うプロセス数は--jobsで指定できます．'))
+    parser.add_argument('--stdin', action='store_true',
+                        help=('フィルタモード．\n'
+                              '標準入力の「姓 名」の形式の行を1行ずつ計算し，名前情報を標準出力します．\n'
+                              '例えば，「--stdin --format jsonl < names.txt」で，\n'
+                              '1行に1つのJSON (画数，五格，五行，運勢) を出力します．'))
+    parser.add_argument('--format', action='store', type=str, default='text',
+                        choices=('text', 'jsonl'),
+                        help='フィルタモードの出力形式．省略時は text になります．')
+    parser.add_argument('--no-save', action='store_true',
+                        help='フィルタモードで，計算した姓名を履歴に追加・保存しません．')
+    parser.add_argument('--save-interval', action='store', type=float, default=SAVE_INTERVAL,
+                        help=('フィルタモードで履歴を保存する間隔 (秒)．'
+                              '省略時は {} になります．').format(SAVE_INTERVAL))
+    parser.add_argument('--chars', action='store', type=str, default=None,
+                        help='探索モードで名に使う文字の候補を記載したファイル．')
+    parser.add_argument('--len', action='store', type=str, default='1-2',
+                        help='探索モードの名の文字数．省略時は 1-2 になります．')
+    for key, name in [('tenkaku', '天格'), ('jinkaku', '人格'), ('tikaku', '地格'),
+                      ('gaikaku', '外格'), ('soukaku', '総格')]:
+        parser.add_argument('--{}'.format(key), action='store', type=int_list, default=None,
+                            help='探索・検索モードの{}．カンマ区切りで複数指定できます．'.format(name))
+    parser.add_argument('--unsei', action='store', type=lambda s: s.split(','), default=None,
+                        help='探索・検索モードの運勢．カンマ区切りで複数指定できます．')
+    parser.add_argument('--query', '-q', action='store_true',
+                        help=('検索モード．\n'
+                              '履歴から条件を満たす項目を表示します．\n'
+                              '例えば，「-q --soukaku 31 --unsei 大吉 --sort=-tenkaku」で，\n'
+                              '総格が31で運勢が大吉の項目を天格の降順に表示します．'))
+    for key, name in [('tenkaku', '天格'), ('jinkaku', '人格'), ('tikaku', '地格')]:
+        parser.add_argument('--gogyo-{}'.format(key), action='store',
+                            type=lambda s: s.split(','), default=None,
+                            help=('検索モードの{}の五行 (木火土金水)．'
+                                  'カンマ区切りで複数指定できます．').format(name))
+    parser.add_argument('--family-len', action='store', type=int_list, default=None,
+                        help='検索モードの姓の文字数．カンマ区切りで複数指定できます．')
+    parser.add_argument('--given-len', action='store', type=int_list, default=None,
+                        help='検索モードの名の文字数．カンマ区切りで複数指定できます．')
+    parser.add_argument('--contains', action='store', type=str, default='',
+                        help='検索モードで姓名に含む文字．複数指定するとすべて含む項目を表示します．')
+    parser.add_argument('--sort', action='store', type=lambda s: s.split(','), default=None,
+                        help=('検索モードで並べ替える項目 (tenkaku, unsei, given-lenなど)．\n'
+                              'カンマ区切りで複数指定でき，先頭に「-」を付けると降順になります\n'
+                              '(降順の項目から始める場合は「--sort=-tenkaku」の形式で指定して下さい)．'))
+    parser.add_argument('--serve', action='store_true',
+                        help=('サーバモード．姓名の計算 (/score, /score/batch) と\n'
+                              '履歴の参照 (/history, /history/query) をJSONで返します．'))
+    parser.add_argument('--host', action='store', type=str, default='127.0.0.1',
+                        help='サーバモードで待ち受けるホスト名．省略時は 127.0.0.1 になります．')
+    parser.add_argument('--port', action='store', type=int, default=8080,
+                        help='サーバモードで待ち受けるポート番号．省略時は 8080 になります．')
+    parser.add_argument('--threads', action='store', type=int, default=8,
+                        help='サーバモードでリクエストを処理するスレッド数．省略時は 8 になります．')
+    parser.add_argument('--stats', action='store_true',
+                        help=('画数の辞書の参照，MJ文字情報APIの呼び出し，CSVファイルの読み書き，\n'
+                              '履歴の操作，姓名の計算の回数と時間を記録し，終了時に標準エラー出力に表示します\n'
+                              '(サーバモードでは /stats でも取得できます)．\n'
+                              '一括登録モードでプロセスプールで計算した分は含まれません．'))
+    parser.add_argument('--jobs', '-j', action='store', type=int, default=None,
+                        help='探索・一括登録モードのプロセス数．省略時はCPU数になります．')
     args = parser.parse_args()
     return args
 
@@ -299,10 +726,12 @@ def config_default_values():
     Returns:
         seimei_history: 姓名の履歴ファイルパス
         kakusuu_dict: 文字と画数の辞書ファイルのパス
+        kakusuu_table: 画数表のファイルのパス
     """
     seimei_history = 'name.csv'
     kakusuu_dict = 'kakusuu.csv'
-    return seimei_history, kakusuu_dict
+    kakusuu_table = 'kakusuu.tbl'
+    return seimei_history, kakusuu_dict, kakusuu_table
 
 
 def config_parse(config_path):
@@ -314,38 +743,43 @@ def config_parse(config_path):
     Returns:
         seimei_history: 姓名の履歴ファイルパス
         kakusuu_dict: 文字と画数の辞書ファイルのパス
+        kakusuu_table: 画数表のファイルのパス
     """
     if not os.path.exists(config_path):
-        seimei_history, kakusuu_dict =  config_default_values()
+        seimei_history, kakusuu_dict, kakusuu_table = config_default_values()
         create_files(seimei_history, kakusuu_dict)
-        return seimei_history, kakusuu_dict
+        return seimei_history, kakusuu_dict, kakusuu_table
 
     config = configparser.ConfigParser()
     config.read(config_path)
 
     if 'Paths' not in config:
-        seimei_history, kakusuu_dict =  config_default_values()
+        seimei_history, kakusuu_dict, kakusuu_table = config_default_values()
         create_files(seimei_history, kakusuu_dict)
-        return seimei_history, kakusuu_dict
+        return seimei_history, kakusuu_dict, kakusuu_table
 
     config_paths = config['Paths']
 
     seimei_history = config_paths.get('seimei_history', 'name.csv')
     kakusuu_dict = config_paths.get('kakusuu_dict', 'kakusuu.csv')
+    kakusuu_table = config_paths.get('kakusuu_table', 'kakusuu.tbl')
 
     create_files(seimei_history, kakusuu_dict)
-    return seimei_history, kakusuu_dict
+    return seimei_history, kakusuu_dict, kakusuu_table
 
 def main():
     """プログラムを起動する．
     """
     args = parse()
+    if args.stats:
+        metrics.enable()
+
     try:
-        seimei_history, kakusuu_dict = config_parse(args.config)
+        seimei_history, kakusuu_dict, kakusuu_table = config_parse(args.config)
 
         if args.show:
             # 表示モード
-            show(seimei_history)
+            show(seimei_history, args.page, args.page_size, args.head, args.tail)
 
         elif args.remove is not None:
             # 削除モード
@@ -361,15 +795,54 @@ def main():
             info_idx = args.info[0] if args.info else None
             info(seimei_history, info_idx)
 
+        elif args.query:
+            # 検索モード
+            cond = {name: getattr(args, key.replace('-', '_')) for key, name
+                    in QUERY_OPTIONS.items() if getattr(args, key.replace('-', '_')) is not None}
+            sort_keys = [query_field(name) for name in args.sort] if args.sort else None
+            query(seimei_history, cond, args.contains, sort_keys)
+
+        elif args.search is not None:
+            # 探索モード
+            gokaku_cond = {name: getattr(args, key) for key, name
+                           in [('tenkaku', '天格'), ('jinkaku', '人格'), ('tikaku', '地格'),
+                               ('gaikaku', '外格'), ('soukaku', '総格')]
+                           if getattr(args, key) is not None}
+            search(args.search, args.chars, args.len, gokaku_cond, args.unsei, args.jobs,
+                   kakusuu_dict, kakusuu_table)
+
+        elif args.import_path is not None:
+            # 一括登録モード
+            import_names(args.import_path, args.jobs, seimei_history, kakusuu_dict,
+                         kakusuu_table)
+
+        elif args.stdin:
+            # フィルタモード
+            filter_names(args.format, not args.no_save, args.save_interval, seimei_history,
+                         kakusuu_dict, kakusuu_table)
+
+        elif args.serve:
+            # サーバモード
+            serve(args.host, args.port, args.threads, seimei_history, kakusuu_dict,
+                  kakusuu_table)
+
+        elif args.build_table is not None:
+            # 画数表作成モード
+            build_table(args.build_table, kakusuu_table)
+
         elif args.gui:
             # GUIモード
+            import tkinter as tk
+            from gui.index import SeimeiFrame
+
             root = tk.Tk()
-            app = SeimeiFrame(seimei_history, kakusuu_dict, master=root)
+            app = SeimeiFrame(seimei_history, kakusuu_dict, master=root,
+                              kakusuu_table_path=kakusuu_table)
             app.mainloop()
 
         else:
             # 追加モード
-            append(args.family, args.given, seimei_history, kakusuu_dict)
+            append(args.family, args.given, seimei_history, kakusuu_dict, kakusuu_table)
 
     except RuntimeError as e:
         print('ERROR: {}'.format(e))
@@ -383,5 +856,8 @@ def main():
     except urllib.error.URLError as e:
         print('ERROR: {}'.format(e))
 
+    if args.stats:
+        print(metrics.report(), file=sys.stderr, end='')
+
 if __name__ == '__main__':
     main()
@@ -1,6 +1,22 @@
 """姓名登録・五格計算のためのライブラリ．
+
+各モジュールは，seimei.kakusuuのように初めて参照されたときに読み込む．
 """
-from . import kakusuu
-from . import fileio
-from . import seimei_core
-from . import seimei_history
+import importlib
+
+__all__ = ['kakusuu', 'kakusuu_table', 'fileio', 'gogyo_table', 'metrics', 'mji', 'seimei_core',
+           'seimei_history', 'seimei_batch', 'seimei_search', 'seimei_session', 'seimei_server']
+
+def __getattr__(name):
+    """モジュールを初めて参照したときに読み込んで返す (PEP 562)．
+
+    Args:
+        name: モジュール名
+
+    Returns:
+        モジュール
+    """
+    if name in __all__:
+        return importlib.import_module('.' + name, __name__)
+
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
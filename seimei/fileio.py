@@ -1,8 +1,183 @@
 """ファイルの読み書きの機能をもつクラスを含むモジュール
+
+複数のプロセス (CLIとGUIなど) が同じファイルに保存しても壊れないように，
+ファイルごとの勧告ロック，一時ファイルへの書き込みと置き換えによる保存，
+ファイルの更新を検出するためのバージョンの機能も含む．
 """
 
 # pylint: disable=R0902, R0914, C0103
 
+import contextlib
+import os
+import threading
+import time
+
+try:
+    import fcntl
+    msvcrt = None
+
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Windowsで他のプロセスのロックの解放を待つときに，ロックを再び試みるまでの時間 (秒)
+LOCK_RETRY_INTERVAL = 0.05
+
+# ロック中のファイルのパスと，そのロックの辞書
+_file_locks = {}
+_file_locks_lock = threading.Lock()
+
+class _FileLock:
+    """ロックファイルによるプロセス間の勧告ロック．
+
+    同じプロセス内では，スレッド間で排他し，同じスレッドからは再入できる．
+
+    Attributes:
+        lock_path: ロックファイルのパス
+        rlock: プロセス内のロック
+        count: 同じスレッドがロックしている回数
+        fd: ロックファイルのファイル記述子．ロックしていない場合はNone
+    """
+    def __init__(self, lockfile_path):
+        self.lock_path = lockfile_path
+        self.rlock = threading.RLock()
+        self.count = 0
+        self.fd = None
+
+    def acquire(self):
+        """ロックする．他のプロセスがロックしている場合は解放されるまで待つ．
+        """
+        self.rlock.acquire()
+        if self.count == 0:
+            try:
+                self.fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+                if fcntl is not None:
+                    fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+                else:
+                    # LK_LOCKは約10秒でOSErrorとなるため，間隔を空けて再び試みる
+                    while True:
+                        try:
+                            msvcrt.locking(self.fd, msvcrt.LK_LOCK, 1)
+                            break
+
+                        except OSError:
+                            time.sleep(LOCK_RETRY_INTERVAL)
+
+            except BaseException:
+                if self.fd is not None:
+                    os.close(self.fd)
+                    self.fd = None
+
+                self.rlock.release()
+                raise
+
+        self.count += 1
+
+    def release(self):
+        """ロックを解放する．
+        """
+        self.count -= 1
+        if self.count == 0:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+
+            os.close(self.fd)
+            self.fd = None
+
+        self.rlock.release()
+
+def lock_path(filepath):
+    """ファイルのロックに使うロックファイルのパスを返す．
+
+    例えば，name.csvに対してname.csv.lockとなる．
+
+    Args:
+        filepath: ファイルパス
+
+    Returns:
+        ロックファイルのパス
+    """
+    return filepath + '.lock'
+
+@contextlib.contextmanager
+def file_lock(filepath):
+    """ファイルを排他ロックするコンテキストマネージャ．
+
+    ロックは勧告ロックのため，このコンテキストマネージャを使う読み書き同士でのみ排他される．
+
+    Args:
+        filepath: ロックするファイルのパス
+    """
+    key = os.path.abspath(filepath)
+    with _file_locks_lock:
+        lock = _file_locks.get(key)
+        if lock is None:
+            lock = _file_locks[key] = _FileLock(lock_path(key))
+
+    lock.acquire()
+    try:
+        yield
+
+    finally:
+        lock.release()
+
+@contextlib.contextmanager
+def atomic_write(filepath, mode='w', encoding='utf-8'):
+    """一時ファイルに書き込み，書き込みが完了したらファイルを置き換えるコンテキストマネージャ．
+
+    書き込み中に例外が発生した場合やプロセスが異常終了した場合も，
+    元のファイルは書き込み前の内容のまま残る．
+
+    Args:
+        filepath: 書き込むファイルのパス
+        mode: ファイルを開くモード ('w'または'wb')
+        encoding: テキストモードの場合の文字コード
+
+    Yields:
+        一時ファイルのファイルオブジェクト
+    """
+    tmp_path = '{}.{}.{}.tmp'.format(filepath, os.getpid(), threading.get_ident())
+    encoding = encoding if 'b' not in mode else None
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+
+        if os.path.exists(filepath):
+            os.chmod(tmp_path, os.stat(filepath).st_mode & 0o7777)
+
+        os.replace(tmp_path, filepath)
+
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def version_stamp(filepath):
+    """ファイルのバージョンを返す．
+
+    ファイルを置き換えるとiノード番号が，追記すると更新時刻・サイズが変わるため，
+    読み込み時と保存時のバージョンを比べることで，他のプロセスによる更新を検出できる．
+
+    Args:
+        filepath: ファイルパス
+
+    Returns:
+        更新時刻 (ナノ秒)，サイズ，iノード番号のタプル．ファイルがない場合はNone
+    """
+    try:
+        stat = os.stat(filepath)
+
+    except FileNotFoundError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
 class FileIO:
     """CSVファイルの読み書きに関する機能をもつインタフェースクラス．
 
@@ -41,24 +216,55 @@ class CSVFileIO(FileIO):
     save, loadメソッドはCSV向けデフォルト実装である．
     CSVFileIO以外のインタフェースも実装する場合は，
     各ファイル形式が扱えるsaveメソッドをオーバーロード実装すること
+    拡張子がsqlite, dbの場合はsave_sqlite, load_sqliteを，
+    jsonlの場合はsave_jsonl, load_jsonlを，npzの場合はsave_npz, load_npzを呼び出す．
+    SQLiteデータベース以外は，ファイルをロックしてから読み書きする (file_lockを参照)．
 
     以下の機能をもつ．
     * FileIOインタフェースの機能
     * CSV形式で保存する機能
     * CSV形式のファイルから読み込む機能
     """
-    def save(self, filepath=None):
-        filepath = filepath if filepath is not None else self.get_filepath()
+    SQLITE_EXTS = ('sqlite', 'db')
+    JSONL_EXTS = ('jsonl',)
+    NPZ_EXTS = ('npz',)
+
+    @staticmethod
+    def get_ext(filepath):
+        """ファイルパスの拡張子を小文字で返す．拡張子がない場合はcsvとする．
 
+        Args:
+            filepath: ファイルパス
+
+        Returns:
+            拡張子
+        """
         if not '.' in filepath:
-            self.save_csv(filepath)
+            return 'csv'
 
-        ext = filepath.rsplit('.', 1)[-1]
-        ext = ext.strip().lower()
-        if ext == 'csv':
-            self.save_csv(filepath)
+        return filepath.rsplit('.', 1)[-1].strip().lower()
+
+    def save(self, filepath=None):
+        filepath = filepath if filepath is not None else self.get_filepath()
+
+        ext = CSVFileIO.get_ext(filepath)
+        if ext in CSVFileIO.SQLITE_EXTS:
+            self.save_sqlite(filepath)
             return
 
+        with file_lock(filepath):
+            if ext == 'csv':
+                self.save_csv(filepath)
+                return
+
+            if ext in CSVFileIO.JSONL_EXTS:
+                self.save_jsonl(filepath)
+                return
+
+            if ext in CSVFileIO.NPZ_EXTS:
+                self.save_npz(filepath)
+                return
+
         raise NotImplementedError('未対応のファイルフォーマットです')
 
     def save_csv(self, filepath):
@@ -72,15 +278,24 @@ class CSVFileIO(FileIO):
     def load(self, filepath):
         filepath = filepath if filepath is not None else self.get_filepath()
 
-        if not '.' in filepath:
-            self.load_csv(filepath)
-
-        ext = filepath.rsplit('.', 1)[-1]
-        ext = ext.strip().lower()
-        if ext == 'csv':
-            self.load_csv(filepath)
+        ext = CSVFileIO.get_ext(filepath)
+        if ext in CSVFileIO.SQLITE_EXTS:
+            self.load_sqlite(filepath)
             return
 
+        with file_lock(filepath):
+            if ext == 'csv':
+                self.load_csv(filepath)
+                return
+
+            if ext in CSVFileIO.JSONL_EXTS:
+                self.load_jsonl(filepath)
+                return
+
+            if ext in CSVFileIO.NPZ_EXTS:
+                self.load_npz(filepath)
+                return
+
         raise NotImplementedError('未対応のファイルフォーマットです')
 
     def load_csv(self, filepath):
@@ -91,6 +306,54 @@ class CSVFileIO(FileIO):
         """
         raise NotImplementedError
 
+    def save_sqlite(self, filepath):
+        """SQLiteデータベースに保存する．
+
+        Args:
+            filepath: 保存先のファイルのパス
+        """
+        raise NotImplementedError('未対応のファイルフォーマットです')
+
+    def load_sqlite(self, filepath):
+        """SQLiteデータベースから読み込む．
+
+        Args:
+            filepath: 読み込むファイルのパス
+        """
+        raise NotImplementedError('未対応のファイルフォーマットです')
+
+    def save_jsonl(self, filepath):
+        """JSON Lines形式でファイルに保存する．
+
+        Args:
+            filepath: 保存先のファイルのパス
+        """
+        raise NotImplementedError('未対応のファイルフォーマットです')
+
+    def load_jsonl(self, filepath):
+        """JSON Lines形式のファイルから読み込む．
+
+        Args:
+            filepath: 読み込むファイルのパス
+        """
+        raise NotImplementedError('未対応のファイルフォーマットです')
+
+    def save_npz(self, filepath):
+        """NumPyのnpz形式でファイルに保存する．
+
+        Args:
+            filepath: 保存先のファイルのパス
+        """
+        raise NotImplementedError('未対応のファイルフォーマットです')
+
+    def load_npz(self, filepath):
+        """NumPyのnpz形式のファイルから読み込む．
+
+        Args:
+            filepath: 読み込むファイルのパス
+        """
+        raise NotImplementedError('未対応のファイルフォーマットです')
+
     @staticmethod
     def is_continue(line):
         """読み飛ばす行のときTrueを返す．
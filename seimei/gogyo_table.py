@@ -0,0 +1,112 @@
+"""陰陽五行・三才吉凶表の表引きを行うモジュール．
+
+元素は画数の下1桁だけで決まるため，下1桁から元素への対応表と，
+元素の組から運勢への対応表を読み込み時に一度だけ作成しておく．
+また，運勢から，その運勢となる天格・人格・地格の下1桁の組への逆引き表ももつ．
+"""
+
+# 元素 (木:0, 火:1, 土:2, 金:3, 水:4)
+GENSO_TBL = '木火土金水'
+
+# 運勢 (凶:0, 中吉:1, 大吉:2)
+UNSEI_TBL = ('凶', '中吉', '大吉')
+
+# 画数の下1桁に対応する元素ID
+# 下1桁が1, 2で木，3, 4で火，…，9, 0で水となる．
+GENSO_RESIDUE_TBL = bytes(((bit - 1) % 10) // 2 for bit in range(10))
+
+# 木火土金水の元素がそれぞれ0から4に対応するとして，
+# 天格・人格・地格に対応する元素を対応する番号に変換し，
+# 各番号をその順に並べた数字を5進数3桁の整数とみなしたとき，
+# インデックスがその整数となる値が運勢IDを表す．
+# 例えば，天格，人格，地格が9, 5, 10ならば，
+# 対応する元素は水，土，水なので，番号に変換して並べると424になる．
+# これを5進数とみなすと十進数で114となり，
+# 先頭をインデックスを0とするとインデックスが114の値は0なので凶とわかる．
+SANSAI_KIKKYO_TBL = bytes(int(val) for val in ('2220021200010000010020001'
+                                               '2220022000022100000000000'
+                                               '1100021200022200022000000'
+                                               '0010000000012200020000020'
+                                               '2120000000000100020000000'))
+
+def genso(kakusuu):
+    """画数に対応する陰陽五行の元素を返す．
+
+    Args:
+        kakusuu: 画数
+
+    Returns:
+        元素ID (木:0, 火:1, 土:2, 金:3, 水:4)
+    """
+    return GENSO_RESIDUE_TBL[kakusuu % 10]
+
+def sansai_index(tenkaku_genso, jinkaku_genso, tikaku_genso):
+    """天格・人格・地格の元素IDから三才吉凶表のインデックスを返す．
+
+    Args:
+        tenkaku_genso: 天格の元素ID
+        jinkaku_genso: 人格の元素ID
+        tikaku_genso: 地格の元素ID
+
+    Returns:
+        三才吉凶表のインデックス
+    """
+    return 5*(tenkaku_genso + 5*jinkaku_genso) + tikaku_genso
+
+def unsei(tenkaku, jinkaku, tikaku):
+    """天格・人格・地格から，三才吉凶表に基づく運勢を返す．
+
+    Args:
+        tenkaku: 天格
+        jinkaku: 人格
+        tikaku: 地格
+
+    Returns:
+        運勢ID (凶:0, 中吉:1, 大吉:2)
+    """
+    return SANSAI_KIKKYO_TBL[sansai_index(genso(tenkaku), genso(jinkaku), genso(tikaku))]
+
+def unsei_id(unsei_str):
+    """運勢の文字列を運勢IDに変換する．
+
+    Args:
+        unsei_str: 運勢 (大吉，中吉，凶)
+
+    Returns:
+        運勢ID (凶:0, 中吉:1, 大吉:2)
+    """
+    if unsei_str not in UNSEI_TBL:
+        raise RuntimeError('運勢は{}のいずれかを指定して下さい．'.format('，'.join(UNSEI_TBL)))
+
+    return UNSEI_TBL.index(unsei_str)
+
+def _create_residue_index():
+    """運勢IDから，その運勢となる天格・人格・地格の下1桁の組への逆引き表を返す．
+
+    Returns:
+        運勢IDと下1桁の組の集合の辞書
+    """
+    residue_index = {idx: set() for idx in range(len(UNSEI_TBL))}
+    for tenkaku in range(10):
+        for jinkaku in range(10):
+            for tikaku in range(10):
+                residue_index[unsei(tenkaku, jinkaku, tikaku)].add((tenkaku, jinkaku, tikaku))
+
+    return {idx: frozenset(residues) for idx, residues in residue_index.items()}
+
+UNSEI_RESIDUE_INDEX = _create_residue_index()
+
+def residues(*unsei_strs):
+    """指定した運勢のいずれかとなる天格・人格・地格の下1桁の組を返す．
+
+    Args:
+        unsei_strs: 運勢 (大吉，中吉，凶)
+
+    Returns:
+        天格・人格・地格の下1桁の組の集合
+    """
+    result = set()
+    for unsei_str in unsei_strs:
+        result |= UNSEI_RESIDUE_INDEX[unsei_id(unsei_str)]
+
+    return frozenset(result)
@@ -0,0 +1,319 @@
+"""名前履歴を列ごとに保持するクラスを含むモジュール．
+
+名前情報を1件ずつ辞書で保持する代わりに，五格は整数の配列，
+陰陽五行と運勢は元素ID・運勢IDの配列，文字ごとの画数は全項目分を連結した配列と
+各項目の先頭位置の配列で保持する．
+名前情報は参照されたときに行番号から作成する．
+列はNumPyの配列にまとめて変換でき，npz形式のファイルの読み書きに使う．
+NumPyは読み込みに時間がかかるため，配列に変換するときに初めて読み込む．
+"""
+# pylint: disable=C0103, C0415
+
+from array import array
+
+from seimei import gogyo_table
+from seimei.seimei_item import SeimeiItem
+
+GOKAKU_KEYS = ('天格', '人格', '地格', '外格', '総格')
+GENSO_KEYS = ('天格', '人格', '地格')
+
+# 検索・並べ替えに使える項目の名前 (文字は姓名に含まれる文字)
+QUERY_FIELDS = GOKAKU_KEYS + tuple('五行：' + key for key in GENSO_KEYS) + \
+    ('運勢', '姓の文字数', '名の文字数', '文字')
+
+_GENSO_IDS = {genso: idx for idx, genso in enumerate(gogyo_table.GENSO_TBL)}
+_UNSEI_IDS = {unsei: idx for idx, unsei in enumerate(gogyo_table.UNSEI_TBL)}
+
+def _to_array(typecode, values):
+    """NumPyの配列を同じ型の標準ライブラリの配列に変換する．
+
+    Args:
+        typecode: 配列の型コード
+        values: NumPyの配列
+
+    Returns:
+        配列
+    """
+    import numpy as np
+
+    result = array(typecode)
+    result.frombytes(np.ascontiguousarray(values, dtype=np.dtype(typecode)).tobytes())
+    return result
+
+def _remap(codes, table, ids):
+    """ファイル中の表に対するIDの配列を，この表に対するIDの配列に変換する．
+
+    Args:
+        codes: ファイル中のIDの配列
+        table: ファイル中の表 (IDから値への配列)
+        ids: 値からこのモジュールのIDへの辞書
+
+    Returns:
+        IDの配列
+    """
+    import numpy as np
+
+    try:
+        mapping = np.array([ids[val] for val in table.tolist()], dtype=np.uint8)
+        return mapping[codes]
+
+    except (KeyError, IndexError):
+        raise RuntimeError('陰陽五行の値が不正です．')  # pylint: disable=W0707
+
+class HistoryColumns:
+    """名前履歴の各項目を列ごとに保持するクラス．
+
+    項目は追加した順に行番号で参照する．行は追加のみで削除しないため，
+    不要になった行を除くにはtake()で必要な行だけをもつ列を作り直す．
+
+    Attributes:
+        family: 姓のリスト
+        given: 名のリスト
+        note: ノートのリスト
+        gokaku: 天格，人格，地格，外格，総格の配列のタプル
+        genso: 天格，人格，地格の元素IDの配列のタプル
+        unsei: 運勢IDの配列
+        strokes: 全項目の姓名の各文字の画数を連結した配列
+        offsets: 各項目の画数のstrokes中の先頭位置の配列 (末尾に全体の長さを含む)
+    """
+    def __init__(self):
+        """初期化．
+        """
+        self.family = []
+        self.given = []
+        self.note = []
+        self.gokaku = tuple(array('H') for _ in GOKAKU_KEYS)
+        self.genso = tuple(array('B') for _ in GENSO_KEYS)
+        self.unsei = array('B')
+        self.strokes = array('H')
+        self.offsets = array('I', [0])
+
+    def __len__(self):
+        return len(self.family)
+
+    def append(self, item):
+        """名前情報を末尾の行に追加する．
+
+        Args:
+            item: 名前情報
+
+        Returns:
+            追加した行の行番号
+        """
+        try:
+            genso = [_GENSO_IDS[item.gogyo_dict[key]] for key in GENSO_KEYS]
+            unsei = _UNSEI_IDS[item.gogyo_dict['運勢']]
+
+        except KeyError:
+            raise RuntimeError('陰陽五行の値が不正です．')  # pylint: disable=W0707
+
+        char_kakusuu_dict = item.char_kakusuu_dict
+        for column, key in zip(self.gokaku, GOKAKU_KEYS):
+            column.append(item.gokaku_dict[key])
+
+        for column, val in zip(self.genso, genso):
+            column.append(val)
+
+        self.unsei.append(unsei)
+        self.strokes.extend(char_kakusuu_dict[char] for char in item.family + item.given)
+        self.offsets.append(len(self.strokes))
+
+        self.family.append(item.family)
+        self.given.append(item.given)
+        self.note.append(item.note)
+        return len(self.family) - 1
+
+    def key(self, row):
+        """行の姓名を返す．
+
+        Args:
+            row: 行番号
+
+        Returns:
+            姓名 (姓, 名)
+        """
+        return self.family[row], self.given[row]
+
+    def kakusuu_list(self, row):
+        """行の姓名の各文字の画数を返す．
+
+        Args:
+            row: 行番号
+
+        Returns:
+            姓名の各文字の画数の配列
+        """
+        return self.strokes[self.offsets[row]:self.offsets[row + 1]]
+
+    def query_values(self, field, row):
+        """行の検索用の項目の値を返す．
+
+        Args:
+            field: 項目の名前 (QUERY_FIELDSを参照)
+            row: 行番号
+
+        Returns:
+            項目の値のタプル (文字の場合は姓名に含まれる文字，それ以外は値1つ)
+        """
+        if field in GOKAKU_KEYS:
+            return (self.gokaku[GOKAKU_KEYS.index(field)][row],)
+
+        if field.startswith('五行：'):
+            genso = self.genso[GENSO_KEYS.index(field[len('五行：'):])][row]
+            return (gogyo_table.GENSO_TBL[genso],)
+
+        if field == '運勢':
+            return (gogyo_table.UNSEI_TBL[self.unsei[row]],)
+
+        if field == '姓の文字数':
+            return (len(self.family[row]),)
+
+        if field == '名の文字数':
+            return (len(self.given[row]),)
+
+        return tuple(set(self.family[row] + self.given[row]))
+
+    def sort_value(self, field, row):
+        """行の並べ替え用の項目の値を返す．
+
+        五行は木火土金水，運勢は凶・中吉・大吉の順になるようにIDを返す．
+
+        Args:
+            field: 項目の名前 (QUERY_FIELDSを参照，文字を除く)
+            row: 行番号
+
+        Returns:
+            並べ替え用の値
+        """
+        if field.startswith('五行：'):
+            return self.genso[GENSO_KEYS.index(field[len('五行：'):])][row]
+
+        if field == '運勢':
+            return self.unsei[row]
+
+        return self.query_values(field, row)[0]
+
+    def item(self, row):
+        """行の名前情報を作成して返す．
+
+        Args:
+            row: 行番号
+
+        Returns:
+            名前情報
+        """
+        family = self.family[row]
+        given = self.given[row]
+        char_kakusuu_dict = dict(zip(family + given, self.kakusuu_list(row)))
+        gokaku_dict = {key: column[row] for key, column in zip(GOKAKU_KEYS, self.gokaku)}
+        gogyo_dict = {key: gogyo_table.GENSO_TBL[column[row]]
+                      for key, column in zip(GENSO_KEYS, self.genso)}
+        gogyo_dict['運勢'] = gogyo_table.UNSEI_TBL[self.unsei[row]]
+        return SeimeiItem(family, given, char_kakusuu_dict, gokaku_dict, gogyo_dict,
+                          self.note[row])
+
+    def take(self, rows):
+        """指定された行だけをこの順にもつ列を作成して返す．
+
+        Args:
+            rows: 行番号のリスト
+
+        Returns:
+            作成した列
+        """
+        columns = HistoryColumns()
+        columns.family = [self.family[row] for row in rows]
+        columns.given = [self.given[row] for row in rows]
+        columns.note = [self.note[row] for row in rows]
+        columns.gokaku = tuple(array('H', [column[row] for row in rows])
+                               for column in self.gokaku)
+        columns.genso = tuple(array('B', [column[row] for row in rows])
+                              for column in self.genso)
+        columns.unsei = array('B', [self.unsei[row] for row in rows])
+        for row in rows:
+            columns.strokes.extend(self.kakusuu_list(row))
+            columns.offsets.append(len(columns.strokes))
+
+        return columns
+
+    def to_arrays(self, rows):
+        """指定された行をこの順にNumPyの配列に変換して返す．
+
+        五行・運勢はIDで格納し，IDから値への表 (genso_table, unsei_table) も含める．
+
+        Args:
+            rows: 行番号のリスト
+
+        Returns:
+            配列の名前と配列の辞書
+        """
+        import numpy as np
+
+        rows = np.array(rows, dtype=np.int64)
+        offsets = np.array(self.offsets, dtype=np.int64)
+        starts = offsets[rows]
+        lengths = offsets[rows + 1] - starts
+
+        new_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=new_offsets[1:])
+
+        # 各行の画数の位置を，連結後の位置からの差分で求める
+        positions = np.repeat(starts - new_offsets[:-1], lengths) + \
+            np.arange(new_offsets[-1], dtype=np.int64)
+
+        return {'family': np.array([self.family[row] for row in rows.tolist()], dtype=str),
+                'given': np.array([self.given[row] for row in rows.tolist()], dtype=str),
+                'note': np.array([self.note[row] for row in rows.tolist()], dtype=str),
+                'gokaku': np.stack([np.array(column, dtype=np.uint16)[rows]
+                                    for column in self.gokaku], axis=1),
+                'genso': np.stack([np.array(column, dtype=np.uint8)[rows]
+                                   for column in self.genso], axis=1),
+                'unsei': np.array(self.unsei, dtype=np.uint8)[rows],
+                'strokes': np.array(self.strokes, dtype=np.uint16)[positions],
+                'offsets': new_offsets.astype(np.uint32),
+                'genso_table': np.array(list(gogyo_table.GENSO_TBL), dtype=str),
+                'unsei_table': np.array(list(gogyo_table.UNSEI_TBL), dtype=str)}
+
+    @staticmethod
+    def from_arrays(arrays):
+        """to_arraysで変換した配列から列を作成して返す．
+
+        Args:
+            arrays: 配列の名前と配列の辞書 (npz形式のファイルを読み込んだものでもよい)
+
+        Returns:
+            作成した列
+        """
+        import numpy as np
+
+        try:
+            family = arrays['family'].tolist()
+            given = arrays['given'].tolist()
+            note = arrays['note'].tolist()
+            gokaku = arrays['gokaku'].reshape(-1, len(GOKAKU_KEYS))
+            genso = _remap(arrays['genso'].reshape(-1, len(GENSO_KEYS)),
+                           arrays['genso_table'], _GENSO_IDS)
+            unsei = _remap(arrays['unsei'], arrays['unsei_table'], _UNSEI_IDS)
+            strokes = arrays['strokes']
+            offsets = arrays['offsets']
+
+        except (KeyError, ValueError):
+            raise RuntimeError('ファイル形式が不正です．')  # pylint: disable=W0707
+
+        num_rows = len(family)
+        if not num_rows == len(given) == len(note) == len(gokaku) == len(genso) == \
+                len(unsei) == len(offsets) - 1 or offsets[-1] != len(strokes) or \
+                np.any(np.diff(offsets.astype(np.int64)) != [len(family[row] + given[row])
+                                                            for row in range(num_rows)]):
+            raise RuntimeError('ファイル形式が不正です．')
+
+        columns = HistoryColumns()
+        columns.family = family
+        columns.given = given
+        columns.note = note
+        columns.gokaku = tuple(_to_array('H', gokaku[:, i]) for i in range(len(GOKAKU_KEYS)))
+        columns.genso = tuple(_to_array('B', genso[:, i]) for i in range(len(GENSO_KEYS)))
+        columns.unsei = _to_array('B', unsei)
+        columns.strokes = _to_array('H', strokes)
+        columns.offsets = _to_array('I', offsets)
+        return columns
@@ -0,0 +1,198 @@
+"""名前履歴をSQLiteデータベースに保存するクラスを含むモジュール．
+
+名前情報，文字ごとの画数，ノートはそれぞれ別の表に格納する．
+項目の並び順は実数の順序キー (order_key) で表すため，
+項目を移動しても移動した項目の順序キーを書き換えるだけで済む．
+"""
+# pylint: disable=C0103
+
+import itertools
+
+from seimei.seimei_item import SeimeiItem
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    family TEXT NOT NULL,
+    given TEXT NOT NULL,
+    order_key REAL NOT NULL,
+    tenkaku INTEGER NOT NULL,
+    jinkaku INTEGER NOT NULL,
+    tikaku INTEGER NOT NULL,
+    gaikaku INTEGER NOT NULL,
+    soukaku INTEGER NOT NULL,
+    gogyo_tenkaku TEXT NOT NULL,
+    gogyo_jinkaku TEXT NOT NULL,
+    gogyo_tikaku TEXT NOT NULL,
+    unsei TEXT NOT NULL,
+    UNIQUE (family, given)
+);
+CREATE INDEX IF NOT EXISTS items_order_key ON items (order_key);
+
+CREATE TABLE IF NOT EXISTS strokes (
+    item_id INTEGER NOT NULL REFERENCES items (id) ON DELETE CASCADE,
+    pos INTEGER NOT NULL,
+    char TEXT NOT NULL,
+    kakusuu INTEGER NOT NULL,
+    PRIMARY KEY (item_id, pos)
+);
+CREATE INDEX IF NOT EXISTS strokes_char ON strokes (char);
+
+CREATE TABLE IF NOT EXISTS notes (
+    item_id INTEGER PRIMARY KEY REFERENCES items (id) ON DELETE CASCADE,
+    note TEXT NOT NULL
+);
+"""
+
+class SQLiteHistoryStore:
+    """名前履歴のSQLiteデータベースを読み書きするクラス．
+
+    変更を行うメソッドは，それぞれ1つのトランザクションでコミットする．
+
+    Attributes:
+        filepath: データベースのファイルパス
+        conn: データベースへの接続
+    """
+    def __init__(self, filepath):
+        """初期化．
+
+        Args:
+            filepath: データベースのファイルパス
+        """
+        # SQLite形式の履歴を使うときにだけ読み込む
+        import sqlite3  # pylint: disable=C0415
+
+        self.filepath = filepath
+        # サーバではスレッドプールの各スレッドから使うため，同じスレッドに限定しない．
+        # 呼び出し側 (SeimeiService.lockなど) で同時に使わないようにする．
+        self.conn = sqlite3.connect(filepath, check_same_thread=False)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(SCHEMA)
+
+    def iterate(self):
+        """順序キーの順に名前情報を1件ずつ読み込んで返す．
+
+        Yields:
+            名前情報と順序キーの組
+        """
+        rows = self.conn.execute(
+            'SELECT items.id, family, given, order_key, tenkaku, jinkaku, tikaku, gaikaku, '
+            'soukaku, gogyo_tenkaku, gogyo_jinkaku, gogyo_tikaku, unsei, note, char, kakusuu '
+            'FROM items LEFT JOIN notes ON notes.item_id = items.id '
+            'LEFT JOIN strokes ON strokes.item_id = items.id '
+            'ORDER BY order_key, items.id, pos')
+        for _, item_rows in itertools.groupby(rows, key=lambda row: row[0]):
+            item_rows = list(item_rows)
+            row = item_rows[0]
+            char_kakusuu_dict = {char: kakusuu for *_, char, kakusuu in item_rows
+                                 if char is not None}
+            gokaku_dict = dict(zip(('天格', '人格', '地格', '外格', '総格'), row[4:9]))
+            gogyo_dict = dict(zip(('天格', '人格', '地格', '運勢'), row[9:13]))
+            note = row[13] if row[13] is not None else ''
+            yield SeimeiItem(row[1], row[2], char_kakusuu_dict, gokaku_dict, gogyo_dict,
+                             note), row[3]
+
+    def load(self):
+        """順序キーの順に名前情報を読み込む．
+
+        Returns:
+            名前情報と順序キーの組のリスト
+        """
+        return list(self.iterate())
+
+    def _insert(self, item, order_key):
+        """名前情報を1件追加する (コミットはしない)．
+
+        Args:
+            item: 名前情報
+            order_key: 順序キー
+        """
+        gokaku_dict = item.gokaku_dict
+        gogyo_dict = item.gogyo_dict
+        cursor = self.conn.execute(
+            'INSERT INTO items (family, given, order_key, tenkaku, jinkaku, tikaku, gaikaku, '
+            'soukaku, gogyo_tenkaku, gogyo_jinkaku, gogyo_tikaku, unsei) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (item.family, item.given, order_key,
+             gokaku_dict['天格'], gokaku_dict['人格'], gokaku_dict['地格'],
+             gokaku_dict['外格'], gokaku_dict['総格'],
+             gogyo_dict['天格'], gogyo_dict['人格'], gogyo_dict['地格'], gogyo_dict['運勢']))
+        item_id = cursor.lastrowid
+
+        char_kakusuu_dict = item.char_kakusuu_dict
+        self.conn.executemany(
+            'INSERT INTO strokes (item_id, pos, char, kakusuu) VALUES (?, ?, ?, ?)',
+            [(item_id, pos, char, char_kakusuu_dict[char])
+             for pos, char in enumerate(item.family + item.given)])
+
+        if item.note:
+            self.conn.execute('INSERT INTO notes (item_id, note) VALUES (?, ?)',
+                              (item_id, item.note))
+
+    def insert(self, item, order_key):
+        """名前情報を追加する．
+
+        Args:
+            item: 名前情報
+            order_key: 順序キー
+        """
+        with self.conn:
+            self._insert(item, order_key)
+
+    def insert_many(self, items):
+        """複数の名前情報を1つのトランザクションで追加する．
+
+        Args:
+            items: 名前情報と順序キーの組の列
+        """
+        with self.conn:
+            for item, order_key in items:
+                self._insert(item, order_key)
+
+    def delete(self, *keys):
+        """名前情報を削除する．
+
+        Args:
+            keys: 削除する姓名 (姓, 名)
+        """
+        with self.conn:
+            self.conn.executemany('DELETE FROM items WHERE family = ? AND given = ?', keys)
+
+    def update_order(self, *order_keys):
+        """名前情報の順序キーを更新する．
+
+        Args:
+            order_keys: 姓名 (姓, 名) と新しい順序キーの組
+        """
+        with self.conn:
+            self.conn.executemany(
+                'UPDATE items SET order_key = ? WHERE family = ? AND given = ?',
+                [(order_key, family, given) for (family, given), order_key in order_keys])
+
+    def update_note(self, key, note):
+        """名前情報のノートを更新する．
+
+        Args:
+            key: 姓名 (姓, 名)
+            note: ノート
+        """
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO notes (item_id, note) '
+                'SELECT id, ? FROM items WHERE family = ? AND given = ?', (note,) + tuple(key))
+
+    def replace_all(self, items):
+        """すべての名前情報を置き換える．
+
+        Args:
+            items: 名前情報のリスト (この順に順序キーを振る)
+        """
+        with self.conn:
+            self.conn.execute('DELETE FROM items')
+            for order_key, item in enumerate(items):
+                self._insert(item, float(order_key))
+
+    def close(self):
+        """データベースへの接続を閉じる．
+        """
+        self.conn.close()
@@ -2,56 +2,392 @@
 """
 # pylint: disable=R0902, R0914, C0103
 
+import array
+import json
+import marshal
 import os
-from seimei.fileio import CSVFileIO
+import re
+import time
+import types
+import unicodedata
+
+from seimei import metrics
+from seimei.fileio import CSVFileIO, atomic_write, version_stamp
+from seimei.kakusuu_table import KakusuuTable
 
 class Kakusuu(CSVFileIO):
     """画数を管理するクラス．
 
+    文字の画数は，辞書，ひらがな・カタカナの画数表 (kana_tableを参照)，画数表の順に探す．
+    また，文字情報取得APIで画数が求まらなかった文字を，記録した時刻とともに保持する．
+    これらは辞書とは別のファイル (unresolved_pathを参照) に保存する．
+
+    読み込んだファイルが他のプロセスによって更新されている場合は，
+    ファイル全体を書き直す前に，最新のファイルの内容を辞書に取り込む (mergeを参照)．
+
     Attributes:
         dict: 文字と画数の辞書
         filepath: 出力先ファイルパス
+        table: 画数表．指定されていない場合はNone
+        unresolved: 画数が求まらなかった文字と，記録した時刻 (UNIX時間) の辞書
+        unresolved_ttl: 画数が求まらなかった文字を記録しておく期間 (秒)
+        journal: 読み込み後・保存後に新たに登録した文字と画数の辞書
+        version: 読み込み時・保存時のファイルのバージョン (file_versionを参照)
     """
-    def __init__(self, filepath=None):
+    UNRESOLVED_TTL = 30*24*60*60
+
+    # ジャーナルファイルのサイズがこれを超えたらコンパクションする
+    JOURNAL_MAX_BYTES = 64*1024
+
+    # スナップショットの形式のバージョン
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self, filepath=None, table_path=None, unresolved_ttl=UNRESOLVED_TTL):
         """初期化．
 
         Args:
             filepath: 辞書情報が格納されているファイルのパス
+            table_path: 画数表のファイルのパス
+            unresolved_ttl: 画数が求まらなかった文字を記録しておく期間 (秒)
         """
         self.filepath = filepath
         self.dict = {}
+        self.journal = {}
+        self.unresolved = {}
+        self.unresolved_ttl = unresolved_ttl
+        self.version = None
         if filepath is not None:
             self.load(filepath)
 
-        kakusuu = Kakusuu.kana_load()
-        self.dict.update(kakusuu)
+        self.table = None
+        if table_path is not None and os.path.exists(table_path):
+            self.table = KakusuuTable(table_path)
 
     def __getitem__(self, key):
-        return self.dict[key]
+        if key in self.dict:
+            if metrics.ENABLED:
+                metrics.count('kakusuu.hit.dict')
+
+            return self.dict[key]
+
+        kana = kana_table()
+        if key in kana:
+            if metrics.ENABLED:
+                metrics.count('kakusuu.hit.kana')
+
+            return kana[key]
+
+        if self.table is not None:
+            val = self.table[key]
+            if metrics.ENABLED:
+                metrics.count('kakusuu.hit.table')
+
+            return val
+
+        raise KeyError(key)
 
     def __setitem__(self, key, value):
         self.dict[key] = value
+        self.journal[key] = value
 
     def __contains__(self, item):
-        return item in self.dict
+        return item in self.dict or item in kana_table() or \
+            (self.table is not None and item in self.table)
+
+    def update(self, kakusuu):
+        """文字と画数をまとめて登録する．
+
+        Args:
+            kakusuu: 文字と画数の辞書
+        """
+        self.dict.update(kakusuu)
+        self.journal.update(kakusuu)
+
+    def is_unresolved(self, char):
+        """画数が求まらなかった文字として記録されているときTrueを返す．
+
+        記録してからunresolved_ttl秒経過した文字は記録から削除する．
+
+        Args:
+            char: 文字
+
+        Returns:
+            記録されている場合はTrue
+        """
+        timestamp = self.unresolved.get(char)
+        if timestamp is None:
+            return False
+
+        if time.time() - timestamp > self.unresolved_ttl:
+            del self.unresolved[char]
+            return False
+
+        return True
+
+    def add_unresolved(self, char, timestamp=None):
+        """画数が求まらなかった文字として記録する．
+
+        Args:
+            char: 文字
+            timestamp: 記録する時刻 (UNIX時間)．省略時は現在時刻となる．
+        """
+        self.unresolved[char] = timestamp if timestamp is not None else time.time()
+
+    @staticmethod
+    def unresolved_path(filepath):
+        """画数が求まらなかった文字を保存するファイルのパスを返す．
+
+        例えば，kakusuu.csvに対してkakusuu.unresolved.csvとなる．
+        辞書がJSON Lines形式・npz形式の場合も，CSV形式で保存する (kakusuu.unresolved.csv)．
+
+        Args:
+            filepath: 辞書のファイルパス
+
+        Returns:
+            画数が求まらなかった文字を保存するファイルのパス
+        """
+        root, ext = os.path.splitext(filepath)
+        if ext[1:].strip().lower() in CSVFileIO.JSONL_EXTS + CSVFileIO.NPZ_EXTS:
+            ext = '.csv'
+
+        return '{}.unresolved{}'.format(root, ext)
+
+    def save_unresolved(self, filepath):
+        """画数が求まらなかった文字を保存する．
+
+        Args:
+            filepath: 辞書のファイルパス
+        """
+        unresolved_path = Kakusuu.unresolved_path(filepath)
+        if not self.unresolved and not os.path.exists(unresolved_path):
+            return
+
+        # 他のプロセスが記録した文字も残す
+        unresolved = Kakusuu.read_unresolved(unresolved_path)
+        unresolved.update(self.unresolved)
+
+        now = time.time()
+        with atomic_write(unresolved_path) as f:
+            for key, val in unresolved.items():
+                if now - val <= self.unresolved_ttl:
+                    f.write('{},{}\n'.format(key, int(val)))
+
+    def load_unresolved(self, filepath):
+        """画数が求まらなかった文字を読み込む．
+
+        Args:
+            filepath: 辞書のファイルパス
+        """
+        unresolved_path = Kakusuu.unresolved_path(filepath)
+        if not os.path.exists(unresolved_path):
+            return
+
+        self.unresolved = Kakusuu.read_unresolved(unresolved_path)
+
+    @staticmethod
+    def read_unresolved(unresolved_path):
+        """画数が求まらなかった文字のファイルを読み込む．
+
+        Args:
+            unresolved_path: 画数が求まらなかった文字のファイルのパス
+
+        Returns:
+            文字と記録した時刻 (UNIX時間) の辞書．ファイルがない場合は空の辞書
+        """
+        unresolved = {}
+        if not os.path.exists(unresolved_path):
+            return unresolved
+
+        with open(unresolved_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if CSVFileIO.is_continue(line):
+                    continue
+
+                if line.count(',') != 1:
+                    raise RuntimeError("ファイル形式が不正です．")
+
+                key, val = line.split(',')
+                unresolved[key.strip()] = int(val.strip())
+
+        return unresolved
 
     def get_filepath(self):
         return self.filepath
 
+    @staticmethod
+    def journal_path(filepath):
+        """新たに登録した文字を追記するジャーナルファイルのパスを返す．
+
+        例えば，kakusuu.csvに対してkakusuu.journal.csvとなる．
+
+        Args:
+            filepath: 辞書のファイルパス
+
+        Returns:
+            ジャーナルファイルのパス
+        """
+        root, ext = os.path.splitext(filepath)
+        return '{}.journal{}'.format(root, ext)
+
+    @staticmethod
+    def file_version(filepath):
+        """辞書のファイルとジャーナルファイルのバージョンを返す．
+
+        Args:
+            filepath: 辞書のファイルパス
+
+        Returns:
+            辞書のファイルとジャーナルファイルのバージョン (version_stampを参照) のタプル
+        """
+        return version_stamp(filepath), version_stamp(Kakusuu.journal_path(filepath))
+
+    def is_modified(self, filepath):
+        """読み込んだファイルが，読み込み後・保存後に他のプロセスによって更新されたときTrueを返す．
+
+        Args:
+            filepath: 辞書のファイルパス
+
+        Returns:
+            更新された場合はTrue．読み込んだファイル以外の場合はFalse
+        """
+        return filepath == self.filepath and Kakusuu.file_version(filepath) != self.version
+
+    def update_version(self, filepath):
+        """読み込んだファイルの場合は，ファイルのバージョンを記録する．
+
+        Args:
+            filepath: 辞書のファイルパス
+        """
+        if filepath == self.filepath:
+            self.version = Kakusuu.file_version(filepath)
+
+    def merge(self, filepath):
+        """ファイルの最新の内容を辞書に取り込む．
+
+        画数は文字ごとに決まるため，ファイルとこの辞書の両方にある文字はこの辞書の画数とする．
+
+        Args:
+            filepath: 辞書のファイルパス
+        """
+        latest = Kakusuu()
+        latest.load(filepath)
+        latest.dict.update(self.dict)
+        self.dict = latest.dict
+
+        for key, val in latest.unresolved.items():
+            self.unresolved[key] = max(val, self.unresolved.get(key, val))
+
     def save_csv(self, filepath):
         """CSV形式で保存する．
 
+        読み込んだファイルに保存する場合は，新たに登録した文字だけをジャーナルファイルに追記する．
+        ジャーナルファイルがJOURNAL_MAX_BYTESを超えた場合は，
+        辞書全体をファイルに書き出して (コンパクション) ジャーナルファイルを削除する．
+        追記だけの場合は，他のプロセスによる更新があってもファイルを読み込み直さない．
+
+        Args:
+            filepath: 保存先ファイルパス
+        """
+        journal_path = Kakusuu.journal_path(filepath)
+        if filepath == self.filepath and os.path.exists(filepath):
+            modified = self.is_modified(filepath)
+            if self.journal:
+                text = ''.join('{},{}\n'.format(key, val) for key, val in self.journal.items())
+                with open(journal_path, 'a', encoding='utf-8') as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                if metrics.ENABLED:
+                    metrics.count_rows('csv.write', len(self.journal),
+                                       len(text.encode('utf-8')))
+
+            self.journal = {}
+
+            if os.path.exists(journal_path) and \
+                    os.path.getsize(journal_path) > self.JOURNAL_MAX_BYTES:
+                if modified:
+                    self.merge(filepath)
+
+                self.compact(filepath)
+
+            elif not modified:
+                self.update_version(filepath)
+
+        else:
+            self.compact(filepath)
+
+        self.save_unresolved(filepath)
+
+    def compact(self, filepath):
+        """辞書全体をCSV形式で書き出し，ジャーナルファイルを削除する．
+
         Args:
             filepath: 保存先ファイルパス
         """
-        with open(filepath, 'w', encoding='utf-8') as f:
+        with atomic_write(filepath) as f:
             for key, val in self.dict.items():
                 line = '{},{}\n'.format(key, val)
                 f.write(line)
 
+        if metrics.ENABLED:
+            metrics.count_rows('csv.write', len(self.dict), os.path.getsize(filepath))
+
+        # 辞書のファイルを置き換えた後に削除するため，途中で異常終了しても登録した文字は失われない
+        journal_path = Kakusuu.journal_path(filepath)
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+
+        self.journal = {}
+        Kakusuu.save_snapshot(filepath, self.dict)
+        self.update_version(filepath)
+
     def load_csv(self, filepath):
         """CSV形式のファイルから読み込む．
 
+        ジャーナルファイルがある場合は，その内容も反映する．
+
+        Args:
+            filepath: 保存先ファイルパス
+        """
+        if not os.path.exists(filepath):
+            return
+
+        self.dict = Kakusuu.load_snapshot(filepath)
+        if self.dict is None:
+            self.dict = Kakusuu.read_csv(filepath)
+            Kakusuu.save_snapshot(filepath, self.dict)
+
+        self.journal = {}
+
+        journal_path = Kakusuu.journal_path(filepath)
+        if os.path.exists(journal_path):
+            self.dict.update(Kakusuu.read_csv(journal_path))
+
+        self.load_unresolved(filepath)
+        self.update_version(filepath)
+
+    def save_jsonl(self, filepath):
+        """JSON Lines形式 (1行に1文字の{"char": 文字, "kakusuu": 画数}) で保存する．
+
+        Args:
+            filepath: 保存先ファイルパス
+        """
+        if self.is_modified(filepath):
+            self.merge(filepath)
+
+        with atomic_write(filepath) as f:
+            for key, val in self.dict.items():
+                f.write(json.dumps({'char': key, 'kakusuu': val}, ensure_ascii=False) + '\n')
+
+        self.journal = {}
+        self.update_version(filepath)
+        self.save_unresolved(filepath)
+
+    def load_jsonl(self, filepath):
+        """JSON Lines形式のファイルから読み込む．
+
         Args:
             filepath: 保存先ファイルパス
         """
@@ -59,6 +395,155 @@ class Kakusuu(CSVFileIO):
             return
 
         self.dict = {}
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    row = json.loads(line)
+                    self.dict[row['char']] = int(row['kakusuu'])
+
+                except (ValueError, KeyError, TypeError):
+                    raise RuntimeError("ファイル形式が不正です．")  # pylint: disable=W0707
+
+        self.journal = {}
+        self.load_unresolved(filepath)
+        self.update_version(filepath)
+
+    def save_npz(self, filepath):
+        """文字の配列 (chars) と画数の配列 (kakusuu) をnpz形式で保存する．
+
+        Args:
+            filepath: 保存先ファイルパス
+        """
+        import numpy as np  # pylint: disable=C0415
+
+        if self.is_modified(filepath):
+            self.merge(filepath)
+
+        with atomic_write(filepath, 'wb') as f:
+            np.savez(f, chars=np.array(list(self.dict), dtype=str),
+                     kakusuu=np.array(list(self.dict.values()), dtype=np.uint16))
+
+        self.journal = {}
+        self.update_version(filepath)
+        self.save_unresolved(filepath)
+
+    def load_npz(self, filepath):
+        """npz形式のファイルから読み込む．
+
+        Args:
+            filepath: 保存先ファイルパス
+        """
+        if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+            return
+
+        import zipfile  # pylint: disable=C0415
+        import numpy as np  # pylint: disable=C0415
+
+        try:
+            with np.load(filepath) as arrays:
+                chars = arrays['chars'].tolist()
+                kakusuu = arrays['kakusuu'].tolist()
+
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            raise RuntimeError("ファイル形式が不正です．")  # pylint: disable=W0707
+
+        if len(chars) != len(kakusuu):
+            raise RuntimeError("ファイル形式が不正です．")
+
+        self.dict = dict(zip(chars, kakusuu))
+        self.journal = {}
+        self.load_unresolved(filepath)
+        self.update_version(filepath)
+
+    @staticmethod
+    def snapshot_path(filepath):
+        """辞書のスナップショットのファイルパスを返す．
+
+        例えば，kakusuu.csvに対してkakusuu.snapshotとなる．
+
+        Args:
+            filepath: 辞書のファイルパス
+
+        Returns:
+            スナップショットのファイルパス
+        """
+        root, _ = os.path.splitext(filepath)
+        return '{}.snapshot'.format(root)
+
+    @staticmethod
+    def save_snapshot(filepath, kakusuu):
+        """辞書のスナップショットを，辞書のファイルの更新時刻・サイズとともに保存する．
+
+        スナップショットには，改行で連結した文字と，画数を詰めた配列を保存する．
+        スナップショットは読み込みを速くするためのものなので，保存に失敗しても無視する．
+
+        Args:
+            filepath: 辞書のファイルパス
+            kakusuu: 辞書のファイルの内容 (文字と画数の辞書)
+        """
+        snapshot_path = Kakusuu.snapshot_path(filepath)
+        tmp_path = snapshot_path + '.tmp'
+        try:
+            stat = os.stat(filepath)
+            keys = '\n'.join(kakusuu)
+            vals = array.array('H', kakusuu.values()).tobytes()
+            with open(tmp_path, 'wb') as f:
+                f.write(marshal.dumps((Kakusuu.SNAPSHOT_VERSION, stat.st_mtime_ns,
+                                       stat.st_size, keys, vals)))
+
+            os.replace(tmp_path, snapshot_path)
+
+        except (OSError, OverflowError):
+            pass
+
+    @staticmethod
+    def load_snapshot(filepath):
+        """辞書のスナップショットを読み込む．
+
+        Args:
+            filepath: 辞書のファイルパス
+
+        Returns:
+            文字と画数の辞書．
+            スナップショットがない場合や，記録された更新時刻・サイズが
+            辞書のファイルと一致しない場合はNone
+        """
+        snapshot_path = Kakusuu.snapshot_path(filepath)
+        if not os.path.exists(snapshot_path):
+            return None
+
+        try:
+            with open(snapshot_path, 'rb') as f:
+                version, mtime_ns, size, keys, vals = marshal.loads(f.read())
+
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        stat = os.stat(filepath)
+        if version != Kakusuu.SNAPSHOT_VERSION or \
+                mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+            return None
+
+        kakusuu = array.array('H')
+        kakusuu.frombytes(vals)
+        return dict(zip(keys.split('\n'), kakusuu)) if keys else {}
+
+    @staticmethod
+    def read_csv(filepath):
+        """「文字,画数」の形式のCSVファイルを読み込む．
+
+        Args:
+            filepath: 読み込むファイルのパス
+
+        Returns:
+            文字と画数の辞書
+        """
+        kakusuu = {}
+        num_rows = 0
         with open(filepath, 'r', encoding='utf-8') as f:
             for line in f:
                 line = line.strip()
@@ -71,7 +556,13 @@ class Kakusuu(CSVFileIO):
                 key, val = line.split(',')
                 key = key.strip()
                 val = val.strip()
-                self.dict[key] = int(val)
+                kakusuu[key] = int(val)
+                num_rows += 1
+
+        if metrics.ENABLED:
+            metrics.count_rows('csv.read', num_rows, os.path.getsize(filepath))
+
+        return kakusuu
 
     @staticmethod
     def kana_load():
@@ -140,4 +631,47 @@ class Kakusuu(CSVFileIO):
         kakusuu_dict.update({key: kakusuu_dict[small_dict[key]] for key in small_h})
         kakusuu_dict.update({key: kakusuu_dict[small_dict[key]] for key in small_k})
 
+        # ゔ，ヴ，ヷ〜ヺ，ヽ，ヾ
+        kakusuu_dict.update({key: kakusuu_dict[val] + dakuon_kakusuu
+                             for key, val in zip('ゔヴヷヸヹヺ', 'うウワヰヱヲ')})
+        kakusuu_dict.update({key: val for key, val in zip('ヽヾ', [1, 3])})
+
         return kakusuu_dict
+
+_kana_table = None
+
+def kana_table():
+    """ひらがな・カタカナの画数表を返す．
+
+    画数表は初めて呼び出されたときに一度だけ作成し，以降は同じものを返す．
+
+    Returns:
+        ひらがな・カタカナの画数表 (変更不可)
+    """
+    global _kana_table  # pylint: disable=W0603
+    if _kana_table is None:
+        _kana_table = types.MappingProxyType(Kakusuu.kana_load())
+
+    return _kana_table
+
+# 半角カタカナ (濁点・半濁点が続く場合はそれも含む)
+_HALFWIDTH_KANA = re.compile('[\uff66-\uff9d][\uff9e\uff9f]?')
+
+# 濁点・半濁点の結合文字が続く文字
+_COMBINING_MARKS = re.compile('.[\u3099\u309a]+')
+
+def normalize_name(name):
+    """姓・名の表記を，画数表で1文字ずつ引ける形にそろえる．
+
+    半角カタカナは全角にし (NFKC)，濁点・半濁点の結合文字は直前の文字と合成する (NFC)．
+    文字数は加成数に影響するため，画数を求める前にそろえておく．
+    CJK互換漢字はNFCでも別の漢字に置き換わるため，かな以外はそのままにする．
+
+    Args:
+        name: 姓または名
+
+    Returns:
+        そろえた姓または名
+    """
+    name = _HALFWIDTH_KANA.sub(lambda m: unicodedata.normalize('NFKC', m.group()), name)
+    return _COMBINING_MARKS.sub(lambda m: unicodedata.normalize('NFC', m.group()), name)
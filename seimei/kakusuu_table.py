@@ -0,0 +1,201 @@
+"""コードポイントで引ける画数表を含むモジュール．
+
+画数表はCJK統合漢字などのブロックごとに，コードポイント順に画数を1バイトずつ並べた
+バイナリファイルである．ブロック外の文字や255画を超える文字は，
+コードポイント順に並べた別表 (オーバーフロー表) に格納する．
+読み込み時はファイルをメモリマップするため，解析は不要で，参照したページだけが読まれる．
+
+ファイル形式 (リトルエンディアン) は以下のとおりである．
+* ヘッダ: マジック (4バイト)，バージョン (2バイト)，ブロック数 (2バイト)，
+  オーバーフロー表の件数 (4バイト)，オーバーフロー表の位置 (4バイト)
+* ブロック表: ブロックごとに先頭コードポイント，末尾コードポイント，画数の位置 (各4バイト)
+* 画数: ブロックごとのコードポイント順の画数 (各1バイト，0は未登録)
+* オーバーフロー表: コードポイント (4バイト) と画数 (2バイト) の組
+"""
+# pylint: disable=C0103
+
+import mmap
+import os
+import struct
+
+MAGIC = b'SMKT'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHII')
+BLOCK = struct.Struct('<III')
+OVERFLOW = struct.Struct('<IH')
+
+# 画数を密に格納するブロック (先頭・末尾のコードポイント)
+CJK_BLOCKS = ((0x3400, 0x4DBF),    # CJK統合漢字拡張A
+              (0x4E00, 0x9FFF),    # CJK統合漢字
+              (0xF900, 0xFAFF),    # CJK互換漢字
+              (0x20000, 0x2EBEF),  # CJK統合漢字拡張B〜F
+              (0x2F800, 0x2FA1F),  # CJK互換漢字補助
+              (0x30000, 0x3134F))  # CJK統合漢字拡張G
+
+def read_source(filepath):
+    """画数の元データを読み込む．
+
+    以下のいずれかの形式の行を読み込む．
+    * 「文字,画数」の形式 (画数保存ファイルと同じ形式)
+    * Unihanデータベースの「U+4E00<TAB>kTotalStrokes<TAB>1」の形式
+      (kTotalStrokes以外の項目は読み飛ばす)
+
+    Args:
+        filepath: 元データのファイルパス
+
+    Returns:
+        コードポイントと画数の辞書
+    """
+    kakusuu = {}
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line[0] == '#':
+                continue
+
+            if line.startswith('U+'):
+                fields = line.split('\t')
+                if len(fields) < 3 or fields[1] != 'kTotalStrokes':
+                    continue
+
+                kakusuu[int(fields[0][2:], 16)] = int(fields[2].split()[0])
+                continue
+
+            if line.count(',') != 1:
+                raise RuntimeError("ファイル形式が不正です．")
+
+            key, val = line.split(',')
+            key = key.strip()
+            if len(key) != 1:
+                raise RuntimeError("ファイル形式が不正です．")
+
+            kakusuu[ord(key)] = int(val.strip())
+
+    return kakusuu
+
+def build(src_path, dst_path):
+    """画数の元データから画数表を作成する．
+
+    Args:
+        src_path: 元データのファイルパス
+        dst_path: 画数表の保存先ファイルパス
+
+    Returns:
+        登録した文字数
+    """
+    kakusuu = read_source(src_path)
+
+    data_offset = HEADER.size + BLOCK.size*len(CJK_BLOCKS)
+    blocks = []
+    dense = bytearray()
+    for start, end in CJK_BLOCKS:
+        blocks.append((start, end, data_offset + len(dense)))
+        dense.extend(bytes(end - start + 1))
+
+    overflow = []
+    for codepoint, val in kakusuu.items():
+        for start, end, offset in blocks:
+            if start <= codepoint <= end and 0 < val < 256:
+                dense[offset - data_offset + codepoint - start] = val
+                break
+
+        else:
+            overflow.append((codepoint, val))
+
+    overflow.sort()
+    overflow_offset = data_offset + len(dense)
+
+    tmp_path = dst_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(blocks), len(overflow), overflow_offset))
+        for block in blocks:
+            f.write(BLOCK.pack(*block))
+
+        f.write(dense)
+        for codepoint, val in overflow:
+            f.write(OVERFLOW.pack(codepoint, val))
+
+    os.replace(tmp_path, dst_path)
+    return len(kakusuu)
+
+
+class KakusuuTable:
+    """メモリマップした画数表から画数を引くクラス．
+
+    Attributes:
+        filepath: 画数表のファイルパス
+    """
+    def __init__(self, filepath):
+        """初期化．
+
+        Args:
+            filepath: 画数表のファイルパス
+        """
+        self.filepath = filepath
+        with open(filepath, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, num_blocks, num_overflow, overflow_offset = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise RuntimeError("ファイル形式が不正です．")
+
+        self._blocks = [BLOCK.unpack_from(self._mm, HEADER.size + BLOCK.size*i)
+                        for i in range(num_blocks)]
+        self._num_overflow = num_overflow
+        self._overflow_offset = overflow_offset
+
+    def get(self, char, default=None):
+        """文字の画数を返す．
+
+        Args:
+            char: 文字 (複数文字不可)
+            default: 登録されていない場合に返す値
+
+        Returns:
+            文字の画数
+        """
+        if len(char) != 1:
+            return default
+
+        codepoint = ord(char)
+        for start, end, offset in self._blocks:
+            if start <= codepoint <= end:
+                val = self._mm[offset + codepoint - start]
+                if val:
+                    return val
+
+                break
+
+        # オーバーフロー表を二分探索する
+        low, high = 0, self._num_overflow
+        while low < high:
+            mid = (low + high) // 2
+            key, val = OVERFLOW.unpack_from(self._mm, self._overflow_offset + OVERFLOW.size*mid)
+            if key == codepoint:
+                return val
+
+            if key < codepoint:
+                low = mid + 1
+
+            else:
+                high = mid
+
+        return default
+
+    def __getitem__(self, key):
+        val = self.get(key)
+        if val is None:
+            raise KeyError(key)
+
+        return val
+
+    def __contains__(self, item):
+        return self.get(item) is not None
+
+    def close(self):
+        """メモリマップを閉じる．
+        """
+        self._mm.close()
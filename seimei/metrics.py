@@ -0,0 +1,171 @@
+"""処理の回数と時間を記録するモジュール．
+
+ライブラリの主な処理 (画数の辞書の参照，MJ文字情報APIの呼び出し，CSVファイルの読み書き，
+履歴の操作，姓名の計算) は，有効にした場合にこのモジュールに回数と時間を記録する．
+無効の場合 (既定) は，各処理はENABLEDを1回参照するだけで何も記録しない．
+
+記録は同じプロセス内だけで集計するため，プロセスプールで計算した分は含まれない．
+
+使用例
+metrics.enable()
+...
+print(metrics.snapshot()['counters']['kakusuu.hit.dict'])
+print(metrics.report())
+"""
+# pylint: disable=C0103
+
+import bisect
+import collections
+import functools
+import threading
+import time
+
+# 記録する場合はTrue (enableで切り替える)
+ENABLED = False
+
+# 時間のヒストグラムの各区間の上限 (秒)．最後の区間は上限なし．
+BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+BUCKET_LABELS = ('<10us', '<100us', '<1ms', '<10ms', '<100ms', '<1s', '>=1s')
+
+_lock = threading.Lock()
+_counters = collections.Counter()
+_timers = {}
+
+class _Timer:
+    """1つの処理の回数・合計時間・最大時間・時間のヒストグラム．
+
+    Attributes:
+        count: 回数
+        total: 合計時間 (秒)
+        max: 最大時間 (秒)
+        histogram: BUCKETSの各区間の回数
+    """
+    __slots__ = ('count', 'total', 'max', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0]*(len(BUCKETS) + 1)
+
+def enable(enabled=True):
+    """記録を有効 (または無効) にする．
+
+    Args:
+        enabled: 有効にする場合はTrue
+    """
+    global ENABLED  # pylint: disable=W0603
+    ENABLED = enabled
+
+def reset():
+    """記録した回数と時間を消去する．
+    """
+    with _lock:
+        _counters.clear()
+        _timers.clear()
+
+def count(name, value=1):
+    """回数 (または量) を加算する．
+
+    Args:
+        name: 項目名
+        value: 加算する値
+    """
+    with _lock:
+        _counters[name] += value
+
+def observe(name, seconds):
+    """処理1回分の時間を記録する．
+
+    Args:
+        name: 処理の名前
+        seconds: 時間 (秒)
+    """
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = _Timer()
+
+        timer.count += 1
+        timer.total += seconds
+        timer.max = max(timer.max, seconds)
+        timer.histogram[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+def count_rows(name, num_rows, num_bytes):
+    """ファイルの読み書きの行数とバイト数を加算する．
+
+    Args:
+        name: 項目名 (「csv.read」など)．「.rows」「.bytes」を付けた項目に加算する．
+        num_rows: 行数
+        num_bytes: バイト数
+    """
+    with _lock:
+        _counters[name + '.rows'] += num_rows
+        _counters[name + '.bytes'] += num_bytes
+
+def timed(name):
+    """関数の呼び出しの時間を記録するデコレータを返す．
+
+    記録が無効の場合は，そのまま関数を呼び出す．
+
+    Args:
+        name: 処理の名前
+
+    Returns:
+        デコレータ
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+
+            finally:
+                observe(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+def snapshot():
+    """記録した回数と時間を返す．
+
+    Returns:
+        項目名と値の辞書 (counters) と，
+        処理の名前と回数・合計時間・平均時間・最大時間・ヒストグラムの辞書 (timers) の辞書
+    """
+    with _lock:
+        return {'counters': dict(_counters),
+                'timers': {name: {'count': timer.count,
+                                  'total': timer.total,
+                                  'mean': timer.total / timer.count,
+                                  'max': timer.max,
+                                  'histogram': dict(zip(BUCKET_LABELS, timer.histogram))}
+                           for name, timer in _timers.items()}}
+
+def report():
+    """記録した回数と時間を表形式の文字列にして返す．
+
+    Returns:
+        文字列
+    """
+    stats = snapshot()
+
+    text = ''
+    text += '[回数]\n'
+    for name, value in sorted(stats['counters'].items()):
+        text += '- {}: {}\n'.format(name, value)
+
+    text += '\n'
+    text += '[時間]\n'
+    text += '|処理|回数|合計 [ms]|平均 [us]|最大 [ms]|{}|\n'.format('|'.join(BUCKET_LABELS))
+    for name, timer in sorted(stats['timers'].items()):
+        text += '|{}|{}|{:.2f}|{:.1f}|{:.2f}|{}|\n'.format(
+            name, timer['count'], timer['total']*1000, timer['mean']*1e6, timer['max']*1000,
+            '|'.join(str(val) for val in timer['histogram'].values()))
+
+    return text
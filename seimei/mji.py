@@ -0,0 +1,336 @@
+"""MJ文字情報APIから文字の画数を取得する機能を含むモジュール．
+"""
+# pylint: disable=C0103
+
+import collections
+import json
+import queue
+import threading
+import time
+import urllib.error
+import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from seimei import metrics
+
+# IPAが公開している文字情報取得APIのURL．%がコードポイントに置き換わる．
+MJI_URL = 'https://mojikiban.ipa.go.jp/mji/q?UCS=%'
+
+# 取得中の文字と，その取得結果のFutureの辞書
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def get_hex(char):
+    """文字をUnicodeコードポイントの16進文字列に変換して返す．
+
+    Args:
+        char: 文字
+
+    Returns:
+        16進文字列
+    """
+    return hex(ord(str(char)))
+
+class MJIClient:
+    """MJ文字情報APIから画数を取得するクライアント．
+
+    接続を使い回すため，接続済みのHTTP接続をプールに保持する．
+    また，直近のリクエストごとの所要時間を保持する．
+
+    Attributes:
+        url: 文字情報取得APIのURL．%がコードポイントに置き換わる．
+        pool_size: プールに保持する接続数の上限
+        timeout: 接続・読み込みのタイムアウト (秒)
+        latencies: 直近のリクエストの所要時間 (秒) のリスト
+    """
+    def __init__(self, url=None, pool_size=8, timeout=10, max_latencies=1024):
+        """初期化．
+
+        Args:
+            url: 文字情報取得APIのURL．省略時はMJI_URLとなる．
+            pool_size: プールに保持する接続数の上限
+            timeout: 接続・読み込みのタイムアウト (秒)
+            max_latencies: 保持する所要時間の個数の上限
+        """
+        self.url = url if url is not None else MJI_URL
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.latencies = collections.deque(maxlen=max_latencies)
+
+        parsed = urllib.parse.urlsplit(self.url)
+        self._https = parsed.scheme == 'https'
+        self._host = parsed.hostname
+        self._port = parsed.port
+        self._path = parsed.path + ('?' + parsed.query if parsed.query else '')
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _new_connection(self):
+        """新しいHTTP接続を返す．
+
+        Returns:
+            HTTP接続
+        """
+        import http.client  # pylint: disable=C0415
+
+        if self._https:
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self.timeout)
+
+        return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+
+    def _acquire(self):
+        """プールから接続を取り出す．プールが空の場合は新しく接続する．
+
+        Returns:
+            HTTP接続
+            プールから取り出した場合はTrue
+        """
+        try:
+            return self._pool.get_nowait(), True
+
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release(self, conn):
+        """接続をプールに戻す．プールが一杯の場合は閉じる．
+
+        Args:
+            conn: HTTP接続
+        """
+        try:
+            self._pool.put_nowait(conn)
+
+        except queue.Full:
+            conn.close()
+
+    def _get(self, path):
+        """GETリクエストを送り，レスポンスの本文を返す．
+
+        プールから取り出した接続がサーバ側で切断されていた場合は，
+        新しい接続で一度だけ再送する．
+
+        Args:
+            path: リクエストするパス
+
+        Returns:
+            レスポンスの本文
+        """
+        import http.client  # pylint: disable=C0415
+
+        conn, pooled = self._acquire()
+        while True:
+            try:
+                conn.request('GET', path, headers={'Connection': 'keep-alive'})
+                res = conn.getresponse()
+                body = res.read()
+
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if pooled:
+                    conn, pooled = self._new_connection(), False
+                    continue
+
+                raise urllib.error.URLError('画数取得時にネットワーク接続エラーが発生しました．')
+
+            if res.will_close:
+                conn.close()
+
+            else:
+                self._release(conn)
+
+            if res.status != 200:
+                raise urllib.error.URLError('画数取得時にネットワーク接続エラーが発生しました．')
+
+            return body
+
+    def request(self, char):
+        """文字の画数を取得して返す．
+
+        Args:
+            char: 文字 (複数文字不可)
+
+        Returns:
+            文字の画数
+        """
+        path = self._path.replace('%', get_hex(char))
+
+        start = time.perf_counter()
+        try:
+            body = json.loads(self._get(path).decode('utf-8'))
+
+        except Exception:
+            if metrics.ENABLED:
+                metrics.count('mji.errors')
+
+            raise
+
+        finally:
+            elapsed = time.perf_counter() - start
+            self.latencies.append(elapsed)
+            if metrics.ENABLED:
+                metrics.observe('mji.request', elapsed)
+
+        if 'results' in body:
+            return body['results'][0]['総画数']
+
+        if metrics.ENABLED:
+            metrics.count('mji.unresolved')
+
+        raise NotImplementedError('未対応の文字が含まれています．')
+
+    def last_latency(self):
+        """直近のリクエストの所要時間を返す．
+
+        Returns:
+            所要時間 (秒)．リクエストしていない場合はNone
+        """
+        return self.latencies[-1] if self.latencies else None
+
+    def close(self):
+        """プールに保持している接続をすべて閉じる．
+        """
+        while True:
+            try:
+                self._pool.get_nowait().close()
+
+            except queue.Empty:
+                return
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_client():
+    """MJI_URLに接続する既定のクライアントを返す．
+
+    Returns:
+        クライアント
+    """
+    global _default_client  # pylint: disable=W0603
+    with _default_client_lock:
+        if _default_client is None or _default_client.url != MJI_URL:
+            if _default_client is not None:
+                _default_client.close()
+
+            _default_client = MJIClient(MJI_URL)
+
+        return _default_client
+
+def request_kakusuu(char, client=None):
+    """文字情報取得APIから文字の画数を取得して返す．
+
+    Args:
+        char: 文字 (複数文字不可)
+        client: 使用するクライアント．省略時は既定のクライアントとなる．
+
+    Returns:
+        文字の画数
+    """
+    client = client if client is not None else get_client()
+    return client.request(char)
+
+def request_kakusuu_once(char, client=None):
+    """文字情報取得APIから文字の画数を取得して返す．
+
+    同じ文字を複数のスレッドが同時に取得しようとした場合は，
+    最初のスレッドだけが通信し，他のスレッドはその結果を待つ．
+
+    Args:
+        char: 文字 (複数文字不可)
+        client: 使用するクライアント．省略時は既定のクライアントとなる．
+
+    Returns:
+        文字の画数
+    """
+    with _inflight_lock:
+        future = _inflight.get(char)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[char] = future
+
+    if not owner:
+        return future.result()
+
+    try:
+        future.set_result(request_kakusuu(char, client))
+
+    except Exception as e:  # pylint: disable=W0703
+        future.set_exception(e)
+
+    finally:
+        with _inflight_lock:
+            del _inflight[char]
+
+    return future.result()
+
+def lookup(kakusuu, char, client=None):
+    """文字の画数を返す．
+
+    画数の辞書にない場合は文字情報取得APIから取得して辞書に登録する．
+    画数が求まらなかった文字として記録されている場合は，通信せずに例外を送出する．
+
+    Args:
+        kakusuu: 画数の辞書
+        char: 文字 (複数文字不可)
+        client: 使用するクライアント．省略時は既定のクライアントとなる．
+
+    Returns:
+        文字の画数
+    """
+    if char in kakusuu:
+        return kakusuu[char]
+
+    if kakusuu.is_unresolved(char):
+        raise NotImplementedError('未対応の文字が含まれています．')
+
+    if metrics.ENABLED:
+        metrics.count('kakusuu.miss')
+
+    try:
+        val = request_kakusuu_once(char, client)
+
+    except NotImplementedError:
+        kakusuu.add_unresolved(char)
+        raise
+
+    kakusuu[char] = val
+    return val
+
+def prefetch(kakusuu, chars, max_workers=8, client=None):
+    """画数が未取得の文字をまとめて並列に取得し，画数の辞書に登録する．
+
+    画数が求まらなかった文字は画数の辞書に記録し，通信エラー以外の例外は送出しない．
+
+    Args:
+        kakusuu: 画数の辞書
+        chars: 文字の列 (姓名や文字のリストなど)
+        max_workers: 同時に通信するスレッド数の上限
+        client: 使用するクライアント．省略時は既定のクライアントとなる．
+    """
+    missing = [char for char in dict.fromkeys(chars)
+               if char not in kakusuu and not kakusuu.is_unresolved(char)]
+    if not missing:
+        return
+
+    if metrics.ENABLED:
+        metrics.count('kakusuu.miss', len(missing))
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+        futures = {char: executor.submit(request_kakusuu_once, char, client) for char in missing}
+
+    # 取得できた文字はまとめて登録してから，最初のエラーを送出する
+    fetched = {}
+    error = None
+    for char, future in futures.items():
+        try:
+            fetched[char] = future.result()
+
+        except NotImplementedError:
+            kakusuu.add_unresolved(char)
+
+        except Exception as e:  # pylint: disable=W0703
+            error = error if error is not None else e
+
+    kakusuu.update(fetched)
+
+    if error is not None:
+        raise error
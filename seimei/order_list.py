@@ -0,0 +1,347 @@
+"""並べ替えに適した順序付きリストを含むモジュール．
+
+順序付きリストは，位置をキーとする平衡二分探索木 (暗黙のキーのトリープ) で実装する．
+各ノードは部分木の大きさと親へのポインタをもつため，位置による参照・挿入・削除と，
+ノードからの位置の逆引きをいずれも期待O(log n)で行える．
+"""
+# pylint: disable=C0103
+
+import random
+
+class _Node:
+    """順序付きリストのノード．
+
+    Attributes:
+        value: 値
+        priority: 優先度 (親は子より大きい)
+        size: このノードを根とする部分木のノード数
+        left: 左の子
+        right: 右の子
+        parent: 親
+    """
+    __slots__ = ('value', 'priority', 'size', 'left', 'right', 'parent')
+
+    def __init__(self, value, priority):
+        self.value = value
+        self.priority = priority
+        self.size = 1
+        self.left = None
+        self.right = None
+        self.parent = None
+
+def _size(node):
+    return node.size if node is not None else 0
+
+def _update(node):
+    """子の情報からノードの部分木の大きさと子の親を更新する．
+
+    Args:
+        node: ノード
+    """
+    node.size = 1 + _size(node.left) + _size(node.right)
+    if node.left is not None:
+        node.left.parent = node
+
+    if node.right is not None:
+        node.right.parent = node
+
+def _split(node, k):
+    """木を先頭k個とそれ以降に分割する．
+
+    戻り値の根の親は更新しないため，呼び出し側で更新する必要がある．
+
+    Args:
+        node: 木の根
+        k: 前半のノード数
+
+    Returns:
+        前半の木の根
+        後半の木の根
+    """
+    if node is None:
+        return None, None
+
+    if _size(node.left) >= k:
+        left, right = _split(node.left, k)
+        node.left = right
+        _update(node)
+        return left, node
+
+    left, right = _split(node.right, k - _size(node.left) - 1)
+    node.right = left
+    _update(node)
+    return node, right
+
+def _merge(left, right):
+    """2つの木をこの順に連結する．
+
+    戻り値の根の親は更新しないため，呼び出し側で更新する必要がある．
+
+    Args:
+        left: 前半の木の根
+        right: 後半の木の根
+
+    Returns:
+        連結した木の根
+    """
+    if left is None:
+        return right
+
+    if right is None:
+        return left
+
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+class OrderList:
+    """位置による挿入・削除・移動を対数時間で行う順序付きリスト．
+
+    値を追加すると，その値を保持するノードを返す．
+    ノードはリストから削除するまで変わらないため，
+    値からノードへの辞書をもっておけば値の現在の位置をindex()で求められる．
+    ただし，swap()はノードを動かさずに値を入れ替えるため，呼び出し側で辞書を更新する必要がある．
+    """
+    def __init__(self, values=()):
+        """初期化．
+
+        Args:
+            values: 初期値の列
+        """
+        self._root = self._build(list(values))
+
+    @staticmethod
+    def _build(values):
+        """値のリストから平衡した木をO(n)で作成する．
+
+        優先度は降順に並べた乱数を行きがけ順に割り当てて，親が子より大きくなるようにする．
+
+        Args:
+            values: 値のリスト
+
+        Returns:
+            木の根
+        """
+        priorities = iter(sorted((random.random() for _ in values), reverse=True))
+
+        def build(lo, hi):
+            if lo >= hi:
+                return None
+
+            mid = (lo + hi) // 2
+            node = _Node(values[mid], next(priorities))
+            node.left = build(lo, mid)
+            node.right = build(mid + 1, hi)
+            _update(node)
+            return node
+
+        return build(0, len(values))
+
+    def _set_root(self, root):
+        self._root = root
+        if root is not None:
+            root.parent = None
+
+    def __len__(self):
+        return _size(self._root)
+
+    def __iter__(self):
+        for node in self.nodes():
+            yield node.value
+
+    def nodes(self):
+        """先頭から順にノードを返す．
+
+        Yields:
+            ノード
+        """
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(self)[key]
+
+        return self.node(key).value
+
+    def _normalize(self, idx):
+        """負のインデックスを正のインデックスに変換し，範囲を確認する．
+
+        Args:
+            idx: インデックス
+
+        Returns:
+            0以上のインデックス
+        """
+        size = len(self)
+        if idx < 0:
+            idx += size
+
+        if not 0 <= idx < size:
+            raise IndexError('インデックスが範囲外です．')
+
+        return idx
+
+    def node(self, idx):
+        """指定された位置のノードを返す．
+
+        Args:
+            idx: インデックス
+
+        Returns:
+            ノード
+        """
+        idx = self._normalize(idx)
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if idx < left_size:
+                node = node.left
+
+            elif idx > left_size:
+                idx -= left_size + 1
+                node = node.right
+
+            else:
+                return node
+
+    def index(self, node):
+        """ノードの現在の位置を返す．
+
+        Args:
+            node: ノード
+
+        Returns:
+            インデックス
+        """
+        idx = _size(node.left)
+        while node.parent is not None:
+            if node is node.parent.right:
+                idx += _size(node.parent.left) + 1
+
+            node = node.parent
+
+        return idx
+
+    def _insert_node(self, idx, node):
+        left, right = _split(self._root, idx)
+        self._set_root(_merge(_merge(left, node), right))
+
+    def insert(self, idx, value):
+        """指定された位置に値を挿入する．
+
+        Args:
+            idx: 挿入する位置 (リストの長さ以上の場合は末尾)
+            value: 値
+
+        Returns:
+            値を保持するノード
+        """
+        node = _Node(value, random.random())
+        self._insert_node(max(min(idx, len(self)), 0), node)
+        return node
+
+    def append(self, value):
+        """末尾に値を追加する．
+
+        Args:
+            value: 値
+
+        Returns:
+            値を保持するノード
+        """
+        node = _Node(value, random.random())
+        self._set_root(_merge(self._root, node))
+        return node
+
+    def extend(self, values):
+        """末尾に複数の値を追加する．
+
+        追加する値から平衡した木を作成して連結するため，1つずつ追加するより速い．
+
+        Args:
+            values: 値の列
+
+        Returns:
+            追加した値を保持するノードのリスト
+        """
+        tree = OrderList(values)
+        nodes = list(tree.nodes())
+        self._set_root(_merge(self._root, tree._root))  # pylint: disable=W0212
+        return nodes
+
+    def _detach(self, idx):
+        """指定された位置のノードを木から切り離して返す．
+
+        Args:
+            idx: インデックス
+
+        Returns:
+            ノード
+        """
+        idx = self._normalize(idx)
+        left, right = _split(self._root, idx)
+        if right is not None:
+            right.parent = None
+
+        node, right = _split(right, 1)
+        self._set_root(_merge(left, right))
+        node.parent = None
+        return node
+
+    def pop(self, idx=-1):
+        """指定された位置の値を削除して返す．
+
+        Args:
+            idx: インデックス
+
+        Returns:
+            値
+        """
+        return self._detach(idx).value
+
+    def swap(self, idx1, idx2):
+        """2つの位置の値を入れ替える．
+
+        ノードは位置に残り，値だけが入れ替わる．
+
+        Args:
+            idx1: 1つ目のインデックス
+            idx2: 2つ目のインデックス
+
+        Returns:
+            入れ替え後の1つ目の位置のノード
+            入れ替え後の2つ目の位置のノード
+        """
+        node1 = self.node(idx1)
+        node2 = self.node(idx2)
+        node1.value, node2.value = node2.value, node1.value
+        return node1, node2
+
+    def move(self, src, dest):
+        """指定された位置の値を別の位置に移動する．
+
+        Args:
+            src: 移動する値のインデックス
+            dest: 移動後のインデックス
+
+        Returns:
+            移動した値を保持するノード
+        """
+        node = self._detach(src)
+        self._insert_node(dest, node)
+        return node
@@ -0,0 +1,267 @@
+"""複数の姓名の五格をまとめて計算するクラスを含むモジュール．
+"""
+# pylint: disable=R0902, R0913, R0914, C0103
+
+import numpy as np
+
+from seimei import gogyo_table
+from seimei import mji
+from seimei.kakusuu import Kakusuu, normalize_name
+from seimei.seimei_history import SeimeiHistory
+from seimei.seimei_item import SeimeiItem
+
+def score_names(names, kakusuu_dict):
+    """画数が既知の姓名の名前情報を計算して返す．
+
+    プロセスプールで並列に計算するためのモジュールレベルの関数であり，
+    ファイルやネットワークにはアクセスしない．
+
+    Args:
+        names: 「(姓, 名)」の形式の姓名のリスト
+        kakusuu_dict: 姓名に含まれる文字と画数の辞書
+
+    Returns:
+        名前情報のリスト
+    """
+    kakusuu = Kakusuu()
+    kakusuu.update(kakusuu_dict)
+    return SeimeiBatch(names, history=SeimeiHistory(), kakusuu=kakusuu).data()
+
+
+class SeimeiBatch:
+    """複数の姓名をまとめて管理するクラス．
+
+    姓・名の各文字の画数を，文字数の最大値に合わせて0埋めした行列として保持し，
+    五格・陰陽五行・運勢を配列演算でまとめて計算する．
+    計算結果はSeimei.dataと同じになる．
+
+    Attributes:
+        families: 姓のリスト
+        givens: 名のリスト
+        history_path: 履歴を格納するファイルのパス
+        kakusuu_path: 画数を格納するファイルのパス
+        history: 履歴
+        kakusuu: キャッシュされている画数の辞書
+        len_family: 姓の文字数の配列
+        len_given: 名の文字数の配列
+        kakusuu_family: 姓に含まれる文字の画数行列 (姓の数×姓の最大文字数)
+        kakusuu_given: 名に含まれる文字の画数行列 (名の数×名の最大文字数)
+    """
+    def __init__(self, names, history_path=None, kakusuu_path=None,
+                 history=None, kakusuu=None):
+        """初期化．
+
+        Args:
+            names: 「(姓, 名)」または「姓 名」の形式の姓名のリスト
+            history_path: 履歴が保存されているファイルのパス
+            kakusuu_path: 画数が保存されているファイルのパス
+            history: 読み込み済みの履歴．
+                指定した場合はhistory_pathからは読み込まない．
+            kakusuu: 読み込み済みの画数の辞書．
+                指定した場合はkakusuu_pathからは読み込まない．
+        """
+        self.families = []
+        self.givens = []
+        for name in names:
+            family, given = name.split(' ') if isinstance(name, str) else name
+
+            if not family:
+                raise RuntimeError('姓が空白です．')
+
+            if not given:
+                raise RuntimeError('名が空白です．')
+
+            self.families.append(normalize_name(family))
+            self.givens.append(normalize_name(given))
+
+        self.history_path = history_path
+        self.kakusuu_path = kakusuu_path
+        self.history = history if history is not None else SeimeiHistory(history_path)
+        self.kakusuu = kakusuu if kakusuu is not None else Kakusuu(kakusuu_path)
+
+        # 未取得の文字の画数はまとめて並列に取得しておく
+        mji.prefetch(self.kakusuu, ''.join(self.families) + ''.join(self.givens))
+
+        self.len_family = np.array([len(family) for family in self.families], dtype=int)
+        self.len_given = np.array([len(given) for given in self.givens], dtype=int)
+        self.kakusuu_family = self.get_kakusuu_matrix(self.families)
+        self.kakusuu_given = self.get_kakusuu_matrix(self.givens)
+
+    def __len__(self):
+        return len(self.families)
+
+    def get_kakusuu(self, char):
+        """文字の画数を返す．
+
+        Args:
+            char: 文字 (複数文字不可)
+
+        Returns:
+            文字の画数
+        """
+        if len(char) > 1:
+            raise RuntimeError('ひとつの文字を指定して下さい．')
+
+        return mji.lookup(self.kakusuu, char)
+
+    def get_kakusuu_matrix(self, names):
+        """姓または名の各文字の画数を0埋めした行列として返す．
+
+        Args:
+            names: 姓または名のリスト
+
+        Returns:
+            画数行列 (名前の数×最大文字数)
+        """
+        max_len = max([len(name) for name in names], default=1)
+        matrix = np.zeros((len(names), max_len), dtype=int)
+        for i, name in enumerate(names):
+            matrix[i, :len(name)] = [self.get_kakusuu(char) for char in name]
+
+        return matrix
+
+    def tenkaku(self):
+        """天格を返す．
+
+        Returns:
+            天格の配列
+        """
+        kaseisuu = np.maximum(self.len_given - self.len_family, 0)
+        return self.kakusuu_family.sum(axis=1) + kaseisuu
+
+    def jinkaku(self):
+        """人格を返す．
+
+        Returns:
+            人格の配列
+        """
+        rows = np.arange(len(self))
+        return self.kakusuu_family[rows, self.len_family - 1] + self.kakusuu_given[:, 0]
+
+    def tikaku(self):
+        """地格を返す．
+
+        Returns:
+            地格の配列
+        """
+        kaseisuu = np.maximum(self.len_family - self.len_given, 0)
+        return self.kakusuu_given.sum(axis=1) + kaseisuu
+
+    def gaikaku(self):
+        """外格を返す．
+
+        Returns:
+            外格の配列
+        """
+        rows = np.arange(len(self))
+        kaseisuu = np.abs(self.len_family - self.len_given)
+
+        # 姓の最後の文字と名の最初の文字を除いた画数の和
+        family_kakusuu = (self.kakusuu_family.sum(axis=1)
+                          - self.kakusuu_family[rows, self.len_family - 1])
+        given_kakusuu = self.kakusuu_given.sum(axis=1) - self.kakusuu_given[:, 0]
+        return family_kakusuu + given_kakusuu + kaseisuu
+
+    def soukaku(self):
+        """総格を返す．
+
+        Returns:
+            総格の配列
+        """
+        return self.kakusuu_family.sum(axis=1) + self.kakusuu_given.sum(axis=1)
+
+    @staticmethod
+    def genso(kakusuu):
+        """画数に対応する陰陽五行の元素を返す．
+
+        Args:
+            kakusuu: 画数の配列
+
+        Returns:
+            元素IDの配列 (木:0, 火:1, 土:2, 金:3, 水:4)
+        """
+        genso_residue_tbl = np.frombuffer(gogyo_table.GENSO_RESIDUE_TBL, dtype=np.uint8)
+        return genso_residue_tbl[np.asarray(kakusuu) % 10]
+
+    @staticmethod
+    def gogyo(tenkaku, jinkaku, tikaku):
+        """天格・人格・地格から，三才吉凶表に基づく運勢を返す．
+
+        Args:
+            tenkaku: 天格の配列
+            jinkaku: 人格の配列
+            tikaku: 地格の配列
+
+        Returns:
+            運勢IDの配列 (凶:0, 中吉:1, 大吉:2)
+        """
+        sansai_kikkyo_tbl = np.frombuffer(gogyo_table.SANSAI_KIKKYO_TBL, dtype=np.uint8)
+
+        tenkaku_genso = SeimeiBatch.genso(tenkaku)
+        jinkaku_genso = SeimeiBatch.genso(jinkaku)
+        tikaku_genso = SeimeiBatch.genso(tikaku)
+        idx = gogyo_table.sansai_index(tenkaku_genso, jinkaku_genso, tikaku_genso)
+        return sansai_kikkyo_tbl[idx]
+
+    def data(self):
+        """名前情報を計算して返す．
+
+        Returns:
+            名前情報のリスト
+        """
+        tenkaku_values = self.tenkaku()
+        jinkaku_values = self.jinkaku()
+        tikaku_values = self.tikaku()
+        gaikaku_values = self.gaikaku()
+        soukaku_values = self.soukaku()
+
+        tenkaku_genso = SeimeiBatch.genso(tenkaku_values)
+        jinkaku_genso = SeimeiBatch.genso(jinkaku_values)
+        tikaku_genso = SeimeiBatch.genso(tikaku_values)
+        gogyo_unsei = SeimeiBatch.gogyo(tenkaku_values, jinkaku_values, tikaku_values)
+
+        # NumPyの整数のままだと保存時に扱えない形式があるため，Pythonの整数に変換する
+        tenkaku_values = tenkaku_values.tolist()
+        jinkaku_values = jinkaku_values.tolist()
+        tikaku_values = tikaku_values.tolist()
+        gaikaku_values = gaikaku_values.tolist()
+        soukaku_values = soukaku_values.tolist()
+        kakusuu_family = self.kakusuu_family.tolist()
+        kakusuu_given = self.kakusuu_given.tolist()
+
+        items = []
+        for i, (family, given) in enumerate(zip(self.families, self.givens)):
+            full_kakusuu = (kakusuu_family[i][:len(family)] + kakusuu_given[i][:len(given)])
+            char_kakusuu_dict = {char: kakusuu for char, kakusuu
+                                 in zip(family + given, full_kakusuu)}
+
+            gokaku_dict = {'天格': tenkaku_values[i],
+                           '人格': jinkaku_values[i],
+                           '地格': tikaku_values[i],
+                           '外格': gaikaku_values[i],
+                           '総格': soukaku_values[i]}
+
+            gogyo_dict = {'天格': gogyo_table.GENSO_TBL[tenkaku_genso[i]],
+                          '人格': gogyo_table.GENSO_TBL[jinkaku_genso[i]],
+                          '地格': gogyo_table.GENSO_TBL[tikaku_genso[i]],
+                          '運勢': gogyo_table.UNSEI_TBL[gogyo_unsei[i]]}
+
+            items.append(SeimeiItem(family, given, char_kakusuu_dict,
+                                    gokaku_dict, gogyo_dict))
+
+        return items
+
+    def save(self, history_path=None, kakusuu_path=None):
+        """登録内容をファイルに保存する．
+
+        Args:
+            history_path: 履歴を保存するファイルのパス.
+                省略時は初期化時に指定されたファイルパスとなる．
+
+            kakusuu_path: 画数を保存するファイルのパス
+                省略時は初期化時に指定されたファイルパスとなる．
+        """
+        history_path = history_path if history_path is not None else self.history_path
+        kakusuu_path = kakusuu_path if kakusuu_path is not None else self.kakusuu_path
+        self.history.save(history_path)
+        self.kakusuu.save(kakusuu_path)
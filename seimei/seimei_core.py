@@ -2,11 +2,10 @@
 """
 # pylint: disable=R0902, R0903, R0913, R0914, C0103
 
-import urllib.request
-import json
-import numpy as np
-
-from seimei.kakusuu import Kakusuu
+from seimei import gogyo_table
+from seimei import metrics
+from seimei import mji
+from seimei.kakusuu import Kakusuu, normalize_name
 from seimei.seimei_history import SeimeiHistory
 from seimei.seimei_item import SeimeiItem
 
@@ -20,10 +19,12 @@ class Seimei:
         kakusuu_path: 画数を格納するファイルのパス
         history: 履歴
         kakusuu: キャッシュされている画数の辞書
+        client: 画数を取得するMJ文字情報APIのクライアント
         kakusuu_family: 姓に含まれる文字の画数リスト
         kakusuu_given: 姓に含まれる文字の画数リスト
     """
-    def __init__(self, family, given=None, history_path=None, kakusuu_path=None):
+    def __init__(self, family, given=None, history_path=None, kakusuu_path=None,
+                 history=None, kakusuu=None, client=None):
         """初期化．
 
         Args:
@@ -31,6 +32,12 @@ class Seimei:
             given: 名．ただし，familyを「姓 名」で指定した場合は省略可
             history_path: 履歴が保存されているファイルのパス
             kakusuu_path: 画数が保存されているファイルのパス
+            history: 読み込み済みの履歴．
+                指定した場合はhistory_pathからは読み込まない．
+            kakusuu: 読み込み済みの画数の辞書．
+                指定した場合はkakusuu_pathからは読み込まない．
+            client: 画数を取得するMJ文字情報APIのクライアント．
+                省略時は既定のクライアントとなる．
         """
         if given is None and (' ' in family):
             family, given = family.split(' ')
@@ -41,12 +48,13 @@ class Seimei:
         if given is None or (isinstance(given, str) and not given):
             raise RuntimeError('名が空白です．')
 
-        self.family = family
-        self.given = given
+        self.family = normalize_name(family)
+        self.given = normalize_name(given)
         self.history_path = history_path
         self.kakusuu_path = kakusuu_path
-        self.history = SeimeiHistory(history_path)
-        self.kakusuu = Kakusuu(kakusuu_path)
+        self.history = history if history is not None else SeimeiHistory(history_path)
+        self.kakusuu = kakusuu if kakusuu is not None else Kakusuu(kakusuu_path)
+        self.client = client if client is not None else mji.get_client()
         self.kakusuu_family, self.kakusuu_given = self.get_kakusuu_list()
 
     def get_kakusuu_list(self):
@@ -56,8 +64,11 @@ class Seimei:
             kakusuu_family: 姓に含まれる文字の画数リスト
             kakusuu_family: 名に含まれる文字の画数リスト
         """
-        kakusuu_family = np.array([self.get_kakusuu(char) for char in self.family])
-        kakusuu_given = np.array([self.get_kakusuu(char) for char in self.given])
+        # 未取得の文字の画数はまとめて並列に取得しておく
+        mji.prefetch(self.kakusuu, self.family + self.given, client=self.client)
+
+        kakusuu_family = [self.get_kakusuu(char) for char in self.family]
+        kakusuu_given = [self.get_kakusuu(char) for char in self.given]
         return kakusuu_family, kakusuu_given
 
     def tenkaku(self):
@@ -73,7 +84,7 @@ class Seimei:
         if len_family < len_given:
             kaseisuu = len_given - len_family
 
-        return np.sum(self.kakusuu_family) + kaseisuu
+        return sum(self.kakusuu_family) + kaseisuu
 
     def jinkaku(self):
         """人格を返す．
@@ -96,7 +107,7 @@ class Seimei:
         if len_family > len_given:
             kaseisuu = len_family - len_given
 
-        return np.sum(self.kakusuu_given) + kaseisuu
+        return sum(self.kakusuu_given) + kaseisuu
 
     def gaikaku(self):
         """外格を返す．
@@ -107,10 +118,10 @@ class Seimei:
         len_family = len(self.family)
         len_given = len(self.given)
 
-        kaseisuu = np.abs(len_family - len_given)
+        kaseisuu = abs(len_family - len_given)
 
-        given_kakusuu = np.sum(self.kakusuu_given[1:]) if len_given > 1 else 0
-        return np.sum(self.kakusuu_family[:-1]) + given_kakusuu + kaseisuu
+        given_kakusuu = sum(self.kakusuu_given[1:]) if len_given > 1 else 0
+        return sum(self.kakusuu_family[:-1]) + given_kakusuu + kaseisuu
 
     def soukaku(self):
         """総格を返す．
@@ -118,7 +129,7 @@ class Seimei:
         Returns:
             総格
         """
-        return np.sum(self.kakusuu_family) + np.sum(self.kakusuu_given)
+        return sum(self.kakusuu_family) + sum(self.kakusuu_given)
 
     @staticmethod
     def genso(kakusuu):
@@ -130,13 +141,7 @@ class Seimei:
         Returns:
             元素ID (木:0, 火:1, 土:2, 金:3, 水:4)
         """
-        bit = kakusuu % 10
-        if bit == 0:
-            bit = 10
-
-        genso_val = (bit - 1) // 2
-
-        return genso_val
+        return gogyo_table.genso(kakusuu)
 
     @staticmethod
     def genso_str(kakusuu):
@@ -148,9 +153,7 @@ class Seimei:
         Returns:
             画数に対応する陰陽五行の元素
         """
-        genso_tbl = '木火土金水'
-        genso_idx = Seimei.genso(kakusuu)
-        return genso_tbl[genso_idx]
+        return gogyo_table.GENSO_TBL[gogyo_table.genso(kakusuu)]
 
     @staticmethod
     def gogyo(tenkaku, jinkaku, tikaku):
@@ -164,29 +167,8 @@ class Seimei:
         Returns:
             三才吉凶表にもとづく運勢 (大吉，中吉，凶）
         """
-        # 木火土金水の元素がそれぞれ0から4に対応するとして，
-        # 天格・人格・地格に対応する元素を対応する番号に変換し，
-        # 各番号をその順に並べた数字を5進数3桁の整数とみなしたとき，
-        # インデックスがその整数となる文字が運勢を表す．
-        # 運勢は凶，中吉，大吉がそれぞれ0から2に対応する．
-        # 例えば，天格，人格，地格が9, 5, 10ならば，
-        # 対応する元素は水，土，水なので，番号に変換して並べると424になる．
-        # これを5進数とみなすと十進数で114となり，
-        # 先頭をインデックスを0とするとインデックスが114の値は0なので凶とわかる．
-        sansai_kikkyo_tbl = ('2220021200010000010020001'
-                             '2220022000022100000000000'
-                             '1100021200022200022000000'
-                             '0010000000012200020000020'
-                             '2120000000000100020000000')
-
-        unsei_tbl = ['凶', '中吉', '大吉']
-
-        tenkaku_genso = Seimei.genso(tenkaku)
-        jinkaku_genso = Seimei.genso(jinkaku)
-        tikaku_genso = Seimei.genso(tikaku)
-        idx = 5*(tenkaku_genso + 5*jinkaku_genso) + tikaku_genso
-        unsei_idx = int(sansai_kikkyo_tbl[idx])
-        return unsei_tbl[unsei_idx]
+        unsei_idx = gogyo_table.unsei(tenkaku, jinkaku, tikaku)
+        return gogyo_table.UNSEI_TBL[unsei_idx]
 
     def save(self, history_path=None, kakusuu_path=None):
         """登録内容をファイルに保存する．
@@ -215,15 +197,7 @@ class Seimei:
         Returns:
             16進文字列
         """
-        # 文字列に変換
-        letter = str(char)
-
-        # Unicodeコードポイントに変換
-        decimal = ord(letter)
-
-        # 0x付き16進文字列に変換
-        hex_str = hex(decimal)
-        return hex_str
+        return mji.get_hex(char)
 
     def get_kakusuu(self, char):
         """文字の画数を返す．
@@ -237,31 +211,22 @@ class Seimei:
         if len(char) > 1:
             raise RuntimeError('ひとつの文字を指定して下さい．')
 
-        # キャッシュされている場合は結果を返す
-        if char in self.kakusuu:
-            return self.kakusuu[char]
-
-        # IPAが公開している文字情報取得APIから画数を取得
-        request_url = "https://mojikiban.ipa.go.jp/mji/q?UCS=%"
-        hex_str = Seimei.get_hex(char)
-        request_url = request_url.replace('%', hex_str)
-
-        req = urllib.request.Request(request_url)
+        # キャッシュされていない場合は文字情報取得APIから取得する
+        return mji.lookup(self.kakusuu, char, self.client)
 
-        try:
-            with urllib.request.urlopen(req) as res:
-                body = json.load(res)
-
-        except urllib.error.URLError:
-            raise urllib.error.URLError('画数取得時にネットワーク接続エラーが発生しました．')
+    @staticmethod
+    def request_kakusuu(char):
+        """文字情報取得APIから文字の画数を取得して返す．
 
-        if 'results' in body:
-            kakusuu = body['results'][0]['総画数']
-            self.kakusuu[char] = kakusuu
-            return kakusuu
+        Args:
+            char: 文字 (複数文字不可)
 
-        raise NotImplementedError('未対応の文字が含まれています．')
+        Returns:
+            文字の画数
+        """
+        return mji.request_kakusuu_once(char)
 
+    @metrics.timed('seimei.data')
     def data(self):
         """名前情報を計算して返す．
 
@@ -270,7 +235,7 @@ class Seimei:
         """
         name = self.family + self.given
 
-        full_kakusuu = np.concatenate([self.kakusuu_family, self.kakusuu_given])
+        full_kakusuu = self.kakusuu_family + self.kakusuu_given
         char_kakusuu_dict = {char: kakusuu for char, kakusuu in zip(name, full_kakusuu)}
 
         tenkaku_value = self.tenkaku()
@@ -3,17 +3,46 @@
 
 # pylint: disable=R0902, R0914, C0103, R0801
 
+import collections
+import itertools
+import json
 import os
-import numpy as np
-from seimei.fileio import CSVFileIO
+
+from seimei import metrics
+from seimei.gogyo_table import GENSO_TBL, UNSEI_TBL
+from seimei.fileio import CSVFileIO, atomic_write, file_lock, version_stamp
+from seimei.history_columns import QUERY_FIELDS, HistoryColumns
+from seimei.history_store import SQLiteHistoryStore
+from seimei.order_list import OrderList
 from seimei.seimei_item import SeimeiItem
 
 class SeimeiHistory(CSVFileIO):
     """姓名の履歴を管理するクラス．
 
+    履歴の各項目は列ごとにまとめて保持し (HistoryColumnsを参照)，
+    名前情報は参照されたときに作成する．
+    履歴の並びは，列の行番号を並べ替えに適した順序付きリストで保持するため，
+    項目の移動は移動量によらず対数時間で行える．
+
+    SQLiteデータベースから読み込んだ場合は，追加・削除・移動・ノートの更新のたびに，
+    変更した項目だけをデータベースに書き込む．
+
+    それ以外のファイルの場合は，読み込み後の変更を操作ログとして記録しておき，
+    保存時にファイルが他のプロセスによって更新されていた場合は，
+    最新のファイルを読み込み直して操作ログの変更だけを適用してから保存する．
+
     Attributes:
-        history: 履歴
+        columns: 履歴の各項目の列
+        order: 履歴の並び順に列の行番号を並べた順序付きリスト
+        index: 姓名 (姓, 名) と，順序付きリスト中のノードの辞書
         filepath: 履歴を保存するファイルパス
+        store: 変更を書き込むデータベース．CSVファイルから読み込んだ場合はNone
+        order_keys: 姓名 (姓, 名) と，データベース中の順序キーの辞書
+        query_indexes: 検索用の項目の名前と，その値から行番号のリストへの辞書の辞書．
+            各項目の辞書は初めて検索したときに作成し，以降は追加のたびに更新する．
+        version: 読み込み時・保存時のファイルのバージョン (version_stampを参照)
+        oplog: 読み込み後・保存後の操作ログ．
+            各操作は，操作の種類 (add, remove, move, note) と対象の姓名などのタプル
     """
     def __init__(self, filepath=None):
         """初期化．
@@ -21,35 +50,388 @@ class SeimeiHistory(CSVFileIO):
         Args:
             filepath: 履歴が保存されているファイルパス
         """
-        self.history = []
+        self.columns = HistoryColumns()
+        self.order = OrderList()
+        self.index = {}
         self.filepath = filepath
+        self.store = None
+        self.order_keys = {}
+        self.query_indexes = {}
+        self.version = None
+        self.oplog = []
         if filepath is not None:
             self.load(filepath)
 
     def __len__(self):
-        return len(self.history)
+        return len(self.order)
 
     def get_filepath(self):
         return self.filepath
 
+    def __contains__(self, item):
+        return (item.family, item.given) in self.index
+
+    def find(self, family, given):
+        """姓名の履歴中の位置を返す．
+
+        Args:
+            family: 姓
+            given: 名
+
+        Returns:
+            履歴中のインデックス．履歴にない場合はNone
+        """
+        node = self.index.get((family, given))
+        return self.order.index(node) if node is not None else None
+
+    def key(self, idx):
+        """履歴の項目の姓名を返す．
+
+        Args:
+            idx: 項目のインデックス
+
+        Returns:
+            姓名 (姓, 名)
+        """
+        return self.columns.key(self.order[idx])
+
+    @metrics.timed('history.add')
     def add(self, item):
         """履歴に姓名を追加する．
 
         Args:
             item: 姓名データ
         """
-        for history_item in self.history:
-            # 姓より名を優先して判断する．
-            if history_item.given == item.given and history_item.family == item.family:
-                return
+        key = (item.family, item.given)
+        if key in self.index:
+            return
+
+        row = self.columns.append(item)
+        self.index[key] = self.order.append(row)
+        self.update_query_indexes([row])
+        self.record('add', [key])
+        if self.store is not None:
+            self.store.insert(item, self.update_order_key(len(self.order) - 1))
+
+    @metrics.timed('history.extend')
+    def extend(self, items):
+        """履歴に複数の姓名をまとめて追加する．
+
+        すでに履歴にある姓名と，同じ姓名の2つ目以降は追加しない．
+
+        Args:
+            items: 姓名データの列
+
+        Returns:
+            追加した姓名の数
+        """
+        keys = {}
+        new_items = []
+        for item in items:
+            key = (item.family, item.given)
+            if key not in self.index and key not in keys:
+                keys[key] = self.columns.append(item)
+                new_items.append(item)
+
+        num_items = len(self.order)
+        for key, node in zip(keys, self.order.extend(keys.values())):
+            self.index[key] = node
+
+        self.update_query_indexes(keys.values())
+        if keys:
+            self.record('add', list(keys))
+
+        # データベースには追加した項目をまとめて書き込む
+        if self.store is not None and new_items:
+            last_key = self.order_keys[self.key(num_items - 1)] if num_items > 0 else -1.0
+            order_keys = [last_key + i + 1.0 for i in range(len(new_items))]
+            self.order_keys.update(zip(keys, order_keys))
+            self.store.insert_many(zip(new_items, order_keys))
+
+        return len(new_items)
+
+    @metrics.timed('history.set_note')
+    def set_note(self, idx, note):
+        """履歴の項目のノートを更新する．
+
+        Args:
+            idx: 更新する項目のインデックス
+            note: ノート
+        """
+        self.columns.note[self.order[idx]] = note
+        self.record('note', self.key(idx), note)
+        if self.store is not None:
+            self.store.update_note(self.key(idx), note)
+
+    def update_order_key(self, idx):
+        """前後の項目の順序キーから，指定された位置の項目の順序キーを決めて返す．
+
+        前後の順序キーの間に実数が残っていない場合は，すべての項目の順序キーを振り直す．
+
+        Args:
+            idx: 順序キーを決める項目のインデックス
+
+        Returns:
+            順序キー
+        """
+        prev_key = self.order_keys[self.key(idx - 1)] if idx > 0 else None
+        next_key = self.order_keys[self.key(idx + 1)] if idx < len(self.order) - 1 else None
+
+        if prev_key is None:
+            order_key = next_key - 1.0 if next_key is not None else 0.0
+
+        elif next_key is None:
+            order_key = prev_key + 1.0
+
+        else:
+            order_key = (prev_key + next_key) / 2
+            if not prev_key < order_key < next_key:
+                self.renumber_order_keys()
+                return self.order_keys[self.key(idx)]
+
+        self.order_keys[self.key(idx)] = order_key
+        return order_key
+
+    def renumber_order_keys(self):
+        """すべての項目の順序キーを振り直し，データベースに書き込む．
+        """
+        self.order_keys = {self.columns.key(row): float(i) for i, row in enumerate(self.order)}
+        self.store.update_order(*self.order_keys.items())
+
+    def compact(self):
+        """削除した項目の行を除いて，列を作り直す．
+        """
+        self.columns = self.columns.take(list(self.order))
+        self.order = OrderList(range(len(self.columns)))
+        self.index = {self.columns.key(node.value): node for node in self.order.nodes()}
+        self.query_indexes = {}
+
+    def record(self, *op):
+        """操作ログに操作を記録する．
+
+        ファイルから読み込んでいない場合と，変更をデータベースに書き込む場合は記録しない．
+
+        Args:
+            op: 操作の種類と，対象の姓名などの引数
+        """
+        if self.filepath is not None and self.store is None:
+            self.oplog.append(op)
+
+    def is_own_file(self, filepath):
+        """初期化時に指定されたファイルのときTrueを返す．
+
+        Args:
+            filepath: ファイルパス
+
+        Returns:
+            初期化時に指定されたファイルのときTrue
+        """
+        return self.filepath is not None and \
+            os.path.abspath(filepath) == os.path.abspath(self.filepath)
+
+    def replay(self, oplog, history):
+        """操作ログの操作を別の履歴に適用する．
+
+        追加する名前情報はこの履歴から取り出すため，操作ログはこの履歴のものであること．
+        適用先の履歴にない項目に対する操作は無視する．
+
+        Args:
+            oplog: 操作ログ
+            history: 適用先の履歴
+        """
+        for kind, *args in oplog:
+            if kind == 'add':
+                history.extend(self.columns.item(self.index[key].value)
+                               for key in args[0] if key in self.index)
+
+            elif kind == 'remove':
+                indices = [history.find(*key) for key in args[0]]
+                indices = [idx for idx in indices if idx is not None]
+                if indices:
+                    history.remove(*indices)
+
+            elif kind == 'move':
+                idx = history.find(*args[0])
+                if idx is None:
+                    continue
+
+                if args[1] is None:
+                    dest_idx = 0
+
+                else:
+                    prev_idx = history.find(*args[1])
+                    if prev_idx is None:
+                        continue
+
+                    dest_idx = prev_idx + 1 if prev_idx < idx else prev_idx
+
+                history.move(idx, dest_idx - idx)
+
+            elif kind == 'note':
+                idx = history.find(*args[0])
+                if idx is not None:
+                    history.set_note(idx, args[1])
+
+    def merge(self, filepath):
+        """ファイルの最新の履歴に操作ログの変更を適用し，この履歴の内容とする．
+
+        Args:
+            filepath: 履歴のファイルパス
+        """
+        latest = SeimeiHistory()
+        latest.load(filepath)
+        self.replay(self.oplog, latest)
+
+        self.columns = latest.columns
+        self.order = latest.order
+        self.index = latest.index
+        self.query_indexes = {}
+        self.version = version_stamp(filepath)
+
+    @metrics.timed('history.save')
+    def save(self, filepath=None):
+        """ファイルに保存する．
+
+        読み込んだファイルが他のプロセスによって更新されていた場合は，
+        最新のファイルに読み込み後の変更を適用してから保存する (mergeを参照)．
+
+        Args:
+            filepath: 保存先のファイルのパス
+                省略時は既定 (get_filepath) のファイルパスとなる．
+        """
+        filepath = filepath if filepath is not None else self.get_filepath()
+        if CSVFileIO.get_ext(filepath) in CSVFileIO.SQLITE_EXTS:
+            super().save(filepath)
+            return
+
+        with file_lock(filepath):
+            own_file = self.is_own_file(filepath)
+            if own_file and version_stamp(filepath) != self.version:
+                self.merge(filepath)
+
+            super().save(filepath)
+
+            if own_file:
+                self.version = version_stamp(filepath)
+                if self.version is not None:
+                    self.oplog = []
+
+    @metrics.timed('history.load')
+    def load(self, filepath=None):
+        """ファイルから読み込む．
+
+        Args:
+            filepath: 読み込むファイルのパス
+                省略時は既定 (get_filepath) のファイルパスとなる．
+        """
+        filepath = filepath if filepath is not None else self.get_filepath()
+        if CSVFileIO.get_ext(filepath) in CSVFileIO.SQLITE_EXTS:
+            super().load(filepath)
+            return
+
+        with file_lock(filepath):
+            super().load(filepath)
+            if self.is_own_file(filepath):
+                self.version = version_stamp(filepath)
+                self.oplog = []
+
+    def update_query_indexes(self, rows):
+        """作成済みの検索用の辞書に行を追加する．
+
+        Args:
+            rows: 追加する行の行番号の列
+        """
+        for field, query_index in self.query_indexes.items():
+            for row in rows:
+                for val in self.columns.query_values(field, row):
+                    query_index.setdefault(val, []).append(row)
+
+    def get_query_index(self, field):
+        """検索用の項目の値から行番号のリストへの辞書を返す．未作成の場合は作成する．
+
+        削除した項目の行も含むため，使う側で除く必要がある．
+
+        Args:
+            field: 項目の名前 (QUERY_FIELDSを参照)
+
+        Returns:
+            値と行番号のリストの辞書
+        """
+        if field not in QUERY_FIELDS:
+            raise RuntimeError('検索する項目の名前が不正です．')
+
+        query_index = self.query_indexes.get(field)
+        if query_index is None:
+            query_index = {}
+            for row in range(len(self.columns)):
+                for val in self.columns.query_values(field, row):
+                    query_index.setdefault(val, []).append(row)
+
+            self.query_indexes[field] = query_index
+
+        return query_index
+
+    @metrics.timed('history.query')
+    def query(self, cond=None, chars='', sort_keys=None):
+        """条件を満たす履歴の項目を返す．
+
+        条件は項目ごとの検索用の辞書から行を引いて絞り込むため，
+        2回目以降の検索では履歴全体を走査しない．
+
+        Args:
+            cond: 項目の名前 (QUERY_FIELDSを参照) と許容する値のリストの辞書．
+                五格と文字数は整数，五行は木火土金水，運勢は大吉・中吉・凶で指定する．
+            chars: 姓名に含む文字 (すべて含む項目を返す)
+            sort_keys: 並べ替えに使う項目の名前のリスト．
+                名前の先頭に「-」を付けると降順になる．省略時は履歴の順となる．
+
+        Returns:
+            条件を満たす項目のインデックスのリスト
+        """
+        cond = dict(cond) if cond is not None else {}
+        if '文字' in cond:
+            raise RuntimeError('文字はcharsで指定して下さい．')
+
+        candidates = None
+        for field, values in itertools.chain(cond.items(), (('文字', [char]) for char in chars)):
+            query_index = self.get_query_index(field)
+            rows = set()
+            for val in values:
+                rows.update(query_index.get(val, ()))
+
+            candidates = rows if candidates is None else candidates & rows
+
+        if candidates is None:
+            candidates = range(len(self.columns))
 
-        self.history.append(item)
+        # 削除した項目の行を除き，履歴中の位置を求める
+        results = []
+        for row in candidates:
+            node = self.index.get(self.columns.key(row))
+            if node is not None and node.value == row:
+                results.append((self.order.index(node), row))
+
+        results.sort()
+        for sort_key in reversed(sort_keys if sort_keys is not None else []):
+            field = sort_key.lstrip('-')
+            if field not in QUERY_FIELDS or field == '文字':
+                raise RuntimeError('並べ替える項目の名前が不正です．')
+
+            results.sort(key=lambda result, field=field:
+                         self.columns.sort_value(field, result[1]),
+                         reverse=sort_key.startswith('-'))
+
+        return [idx for idx, _ in results]
 
     def __iter__(self):
-        return iter(self.history)
+        for row in self.order:
+            yield self.columns.item(row)
 
     def __getitem__(self, key):
-        return self.history[key]
+        if isinstance(key, slice):
+            return [self.columns.item(row) for row in self.order[key]]
+
+        return self.columns.item(self.order[key])
 
     def save_csv(self, filepath):
         """履歴をCSV形式で保存する．
@@ -60,54 +442,152 @@ class SeimeiHistory(CSVFileIO):
         if not os.path.exists(filepath):
             return
 
-        with open(filepath, 'w', encoding='utf-8') as f:
+        with atomic_write(filepath) as f:
             f.write(('# 姓, 名, 天格, 人格, 地格, 外格, 総格, '
                      '五行：天格, 五行：人格, 五行：地格, 五行運勢, 画数..., ノート\n'))
-            for item in self.history:
-                family = item.family
-                given = item.given
-                save_list = [family, given]
+            columns = self.columns
+            for row in self.order:
+                save_list = [columns.family[row], columns.given[row]]
 
-                gokaku_dict = item.gokaku_dict
-                save_list.append(str(gokaku_dict['天格']))
-                save_list.append(str(gokaku_dict['人格']))
-                save_list.append(str(gokaku_dict['地格']))
-                save_list.append(str(gokaku_dict['外格']))
-                save_list.append(str(gokaku_dict['総格']))
-
-                gogyo_dict = item.gogyo_dict
-                save_list.append(str(gogyo_dict['天格']))
-                save_list.append(str(gogyo_dict['人格']))
-                save_list.append(str(gogyo_dict['地格']))
-                save_list.append(str(gogyo_dict['運勢']))
+                # 五格
+                save_list.extend(str(column[row]) for column in columns.gokaku)
 
-                char_kakusuu_dict = item.char_kakusuu_dict
-                for char in family:
-                    save_list.append(str(char_kakusuu_dict[char]))
+                # 陰陽五行
+                save_list.extend(GENSO_TBL[column[row]] for column in columns.genso)
+                save_list.append(UNSEI_TBL[columns.unsei[row]])
 
-                for char in given:
-                    save_list.append(str(char_kakusuu_dict[char]))
+                # 画数
+                save_list.extend(str(kakusuu) for kakusuu in columns.kakusuu_list(row))
 
-                save_list.append(item.note)
+                save_list.append(columns.note[row])
 
                 save_str = ','.join(save_list) + '\n'
                 f.write(save_str)
 
+        if metrics.ENABLED:
+            metrics.count_rows('csv.write', len(self.order), os.path.getsize(filepath))
+
+    def save_sqlite(self, filepath):
+        """履歴をSQLiteデータベースに保存する．
+
+        読み込んだデータベースに保存する場合は，変更を書き込み済みのため何もしない．
+
+        Args:
+            filepath: 保存先のファイルのパス
+        """
+        if self.store is not None and \
+                os.path.abspath(filepath) == os.path.abspath(self.store.filepath):
+            return
+
+        store = SQLiteHistoryStore(filepath)
+        try:
+            store.replace_all(list(self))
+
+        finally:
+            store.close()
+
+    def load_sqlite(self, filepath):
+        """SQLiteデータベースから履歴を読み込み，以降の変更をデータベースに書き込むようにする．
+
+        Args:
+            filepath: 読み込むファイルのパス
+        """
+        store = SQLiteHistoryStore(filepath)
+        items = store.load()
+        self.extend(item for item, _ in items)
+        self.order_keys.update(((item.family, item.given), order_key)
+                               for item, order_key in items)
+
+        self.store = store
+        self.oplog = []
+
+    def close(self):
+        """データベースへの接続を閉じる．
+        """
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def save_jsonl(self, filepath):
+        """履歴をJSON Lines形式 (1行に1項目のSeimeiItem.to_dictの辞書) で保存する．
+
+        Args:
+            filepath: 保存先のファイルのパス
+        """
+        with atomic_write(filepath) as f:
+            for item in self:
+                f.write(json.dumps(item.to_dict(), ensure_ascii=False) + '\n')
+
+    def load_jsonl(self, filepath):
+        """JSON Lines形式のファイルから履歴を読み込む．
+
+        Args:
+            filepath: 読み込むファイルのパス
+        """
+        self.extend(list(SeimeiHistory.read_jsonl(filepath)))
+
+    def save_npz(self, filepath):
+        """履歴を列ごとの配列としてnpz形式で保存する．
+
+        配列の内容はHistoryColumns.to_arraysを参照．
+
+        Args:
+            filepath: 保存先のファイルのパス
+        """
+        import numpy as np  # pylint: disable=C0415
+
+        with atomic_write(filepath, 'wb') as f:
+            np.savez(f, **self.columns.to_arrays(list(self.order)))
+
+    def load_npz(self, filepath):
+        """npz形式のファイルから履歴を読み込む．
+
+        空の履歴に重複のない履歴を読み込む場合は，読み込んだ列をそのまま使う．
+
+        Args:
+            filepath: 読み込むファイルのパス
+        """
+        columns = SeimeiHistory.read_npz_columns(filepath)
+        keys = [columns.key(row) for row in range(len(columns))]
+        if len(self.order) > 0 or self.store is not None or len(set(keys)) != len(keys):
+            self.extend(columns.item(row) for row in range(len(columns)))
+            return
+
+        self.columns = columns
+        self.order = OrderList(range(len(columns)))
+        self.index = dict(zip(keys, self.order.nodes()))
+        self.query_indexes = {field: {} for field in self.query_indexes}
+        self.update_query_indexes(range(len(columns)))
+
     def load_csv(self, filepath):
         """CSV形式のファイルから履歴を読み込む．
 
         Args:
             filepath: 読み込むファイルのパス
         """
+        self.extend(list(SeimeiHistory.read_csv(filepath)))
+
+    @staticmethod
+    def read_csv(filepath):
+        """CSV形式のファイルから名前情報を1行ずつ読み込んで返す．
+
+        Args:
+            filepath: 読み込むファイルのパス
+
+        Yields:
+            名前情報
+        """
         if not os.path.exists(filepath):
             return
 
+        num_rows = 0
         with open(filepath, 'r', encoding='utf-8') as f:  # pylint: disable=R0801
             for line in f:
                 line = line.strip()
                 if CSVFileIO.is_continue(line):
                     continue
 
+                num_rows += 1
                 if line.count(',') < 6:
                     raise RuntimeError("ファイル形式が不正です．")
 
@@ -149,21 +629,168 @@ class SeimeiHistory(CSVFileIO):
 
                 note = load_list[idx2] if len(load_list) >= idx2+1 else ''
 
-                self.add(SeimeiItem(family, given, char_kakusuu_dict, gokaku_dict, gogyo_dict,
-                                    note))
+                yield SeimeiItem(family, given, char_kakusuu_dict, gokaku_dict, gogyo_dict, note)
+
+        if metrics.ENABLED:
+            metrics.count_rows('csv.read', num_rows, os.path.getsize(filepath))
+
+    @staticmethod
+    def iterate(filepath):
+        """ファイル全体を読み込まずに，履歴の項目を先頭から順に読み込んで返す．
+
+        履歴に読み込んだ場合と同じく，重複する姓名は最初の項目だけを返す．
+
+        Args:
+            filepath: 読み込むファイルのパス
+
+        Yields:
+            名前情報
+        """
+        ext = CSVFileIO.get_ext(filepath)
+        if ext == 'csv':
+            items = SeimeiHistory.read_csv(filepath)
+
+        elif ext in CSVFileIO.SQLITE_EXTS:
+            items = SeimeiHistory.read_sqlite(filepath)
+
+        elif ext in CSVFileIO.JSONL_EXTS:
+            items = SeimeiHistory.read_jsonl(filepath)
 
-    def show(self):
+        elif ext in CSVFileIO.NPZ_EXTS:
+            columns = SeimeiHistory.read_npz_columns(filepath)
+            items = (columns.item(row) for row in range(len(columns)))
+
+        else:
+            raise NotImplementedError('未対応のファイルフォーマットです')
+
+        keys = set()
+        for item in items:
+            key = (item.family, item.given)
+            if key not in keys:
+                keys.add(key)
+                yield item
+
+    @staticmethod
+    def read_sqlite(filepath):
+        """SQLiteデータベースから名前情報を1件ずつ読み込んで返す．
+
+        Args:
+            filepath: 読み込むファイルのパス
+
+        Yields:
+            名前情報
+        """
+        store = SQLiteHistoryStore(filepath)
+        try:
+            for item, _ in store.iterate():
+                yield item
+
+        finally:
+            store.close()
+
+    @staticmethod
+    def read_jsonl(filepath):
+        """JSON Lines形式のファイルから名前情報を1行ずつ読み込んで返す．
+
+        Args:
+            filepath: 読み込むファイルのパス
+
+        Yields:
+            名前情報
+        """
+        if not os.path.exists(filepath):
+            return
+
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    item_dict = json.loads(line)
+
+                except ValueError:
+                    raise RuntimeError("ファイル形式が不正です．")  # pylint: disable=W0707
+
+                yield SeimeiItem.from_dict(item_dict)
+
+    @staticmethod
+    def read_npz_columns(filepath):
+        """npz形式のファイルから履歴の列を読み込む．
+
+        Args:
+            filepath: 読み込むファイルのパス
+
+        Returns:
+            履歴の列．ファイルがない場合や空の場合は空の列
+        """
+        if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+            return HistoryColumns()
+
+        import zipfile  # pylint: disable=C0415
+        import numpy as np  # pylint: disable=C0415
+
+        try:
+            with np.load(filepath) as arrays:
+                return HistoryColumns.from_arrays(arrays)
+
+        except (OSError, ValueError, zipfile.BadZipFile):
+            raise RuntimeError("ファイル形式が不正です．")  # pylint: disable=W0707
+
+    def show(self, start=0, stop=None):
         """標準出力する．
+
+        Args:
+            start: 表示する範囲の先頭のインデックス
+            stop: 表示する範囲の末尾の次のインデックス．省略時は履歴の末尾まで．
         """
-        print('\n'.join(['|{:3d}|{}{}|{}|{}|'.format(
-            i+1,
+        stop = min(stop, len(self)) if stop is not None else len(self)
+        for i in range(start, stop):
+            print(SeimeiHistory.format_row(i, self[i]))
+
+    @staticmethod
+    def show_file(filepath, start=0, stop=None, tail=None):
+        """ファイルから1行ずつ読み込みながら標準出力する．
+
+        先頭側の範囲を表示する場合は，範囲の末尾まで読み込んだ時点で終了する．
+
+        Args:
+            filepath: 履歴のファイルパス
+            start: 表示する範囲の先頭のインデックス
+            stop: 表示する範囲の末尾の次のインデックス．省略時は履歴の末尾まで．
+            tail: 末尾から表示する項目数．指定した場合はstart, stopを無視する．
+        """
+        rows = enumerate(SeimeiHistory.iterate(filepath))
+        if tail is not None:
+            rows = collections.deque(rows, maxlen=tail) if tail > 0 else ()
+
+        else:
+            rows = itertools.islice(rows, start, stop)
+
+        for i, item in rows:
+            print(SeimeiHistory.format_row(i, item))
+
+    @staticmethod
+    def format_row(idx, item):
+        """表示用の1行の文字列を返す．
+
+        Args:
+            idx: 項目のインデックス
+            item: 名前情報
+
+        Returns:
+            表示用の文字列
+        """
+        return '|{:3d}|{}{}|{}|{}|'.format(
+            idx+1,
             '{} {}'.format(item.family, item.given),
             ' '*(11 - (2*len(item.family) + 2*len(item.given) + 1)),
             ', '.join(['{}: {:2d}'.format(key, val) for key, val in item.gokaku_dict.items()]),
             ', '.join(['{}: {:2d}'.format(key, val) for key, val
                        in item.char_kakusuu_dict.items()]))
-                         for i, item in enumerate(self.history)]))
 
+    @metrics.timed('history.remove')
     def remove(self, *remove_ids):
         """履歴を削除する．
 
@@ -172,9 +799,26 @@ class SeimeiHistory(CSVFileIO):
         """
         # インデックスが変わらないようにインデックスの大きい項目から削除する
         sorted_remove_ids = sorted(remove_ids)
+        removed = []
         for remove_id in sorted_remove_ids[::-1]:
-            self.history.pop(remove_id)
+            key = self.columns.key(self.order.pop(remove_id))
+            del self.index[key]
+            removed.append(key)
 
+        if removed:
+            self.record('remove', removed)
+
+        if self.store is not None and removed:
+            for key in removed:
+                del self.order_keys[key]
+
+            self.store.delete(*removed)
+
+        # 削除した行が残っている行より多くなったら列を作り直す
+        if len(self.columns) > 2*len(self.order):
+            self.compact()
+
+    @metrics.timed('history.move')
     def move(self, idx, move_val):
         """履歴の項目を移動する．
 
@@ -193,16 +837,30 @@ class SeimeiHistory(CSVFileIO):
         # 末尾より後になる場合は末尾にする
         last_idx = len(self) - 1
         dest_idx = dest_idx if dest_idx <= last_idx else last_idx
+        if dest_idx == idx:
+            return
+
+        # 移動する (隣との移動は入れ替えで済ませる)
+        if abs(dest_idx - idx) == 1:
+            for node in self.order.swap(idx, dest_idx):
+                self.index[self.columns.key(node.value)] = node
 
-        # 移動する
-        if dest_idx > idx:
-            for i in range(idx, dest_idx):
-                self.history[i], self.history[i+1] = self.history[i+1], self.history[i]
+            if self.store is not None:
+                key1 = self.key(idx)
+                key2 = self.key(dest_idx)
+                order_keys = self.order_keys
+                order_keys[key1], order_keys[key2] = order_keys[key2], order_keys[key1]
+                self.store.update_order((key1, order_keys[key1]), (key2, order_keys[key2]))
 
         else:
-            for i in range(idx, dest_idx, -1):
-                self.history[i], self.history[i-1] = self.history[i-1], self.history[i]
+            self.order.move(idx, dest_idx)
+            if self.store is not None:
+                self.store.update_order((self.key(dest_idx), self.update_order_key(dest_idx)))
+
+        # 移動先は直前の項目で記録しておく (他のプロセスの変更を反映した履歴にも適用できる)
+        self.record('move', self.key(dest_idx), self.key(dest_idx - 1) if dest_idx > 0 else None)
 
+    @metrics.timed('history.move_up')
     def move_up(self, *indices):
         """指定されたインデックスの履歴の項目をひとつ上に移動する．
 
@@ -212,7 +870,7 @@ class SeimeiHistory(CSVFileIO):
         Returns:
             移動したときTrue
         """
-        sorted_indices = np.sort(np.array(indices))
+        sorted_indices = sorted(indices)
         if sorted_indices[0] < 0 or sorted_indices[-1] >= len(self):
             raise RuntimeError('インデックスが不正です．')
 
@@ -224,6 +882,7 @@ class SeimeiHistory(CSVFileIO):
 
         return True
 
+    @metrics.timed('history.move_down')
     def move_down(self, *indices):
         """指定されたインデックスの履歴の項目をひとつ下に移動する．
 
@@ -233,7 +892,7 @@ class SeimeiHistory(CSVFileIO):
         Returns:
             移動したときTrue
         """
-        sorted_indices = np.sort(np.array(indices))
+        sorted_indices = sorted(indices)
         if sorted_indices[0] < 0 or sorted_indices[-1] >= len(self):
             raise RuntimeError('インデックスが不正です．')
 
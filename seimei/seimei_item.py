@@ -6,13 +6,19 @@
 class SeimeiItem:
     """名前情報を保持する構造体．
 
+    履歴は名前情報を列ごとにまとめて保持し，参照されたときにこの構造体を作成するため，
+    インスタンス辞書をもたない軽量な構造体としている．
+
     Attributes;
         family: 姓
         given: 名
         char_kakusuu_dict: 姓名に含まれる画数の辞書
         gokaku_dict: 五格の辞書
         gogyo_dict: 陰陽五行の辞書
+        note: ノート
     """
+    __slots__ = ('family', 'given', 'char_kakusuu_dict', 'gokaku_dict', 'gogyo_dict', 'note')
+
     def __init__(self, family, given, char_kakusuu_dict,
                  gokaku_dict, gogyo_dict, note=''):
         self.family = family
@@ -22,6 +28,40 @@ class SeimeiItem:
         self.gogyo_dict = gogyo_dict
         self.note = note
 
+    def to_dict(self):
+        """名前情報を属性名をキーとする辞書に変換して返す．
+
+        Returns:
+            名前情報の辞書 (JSONに変換できる)
+        """
+        # 画数・五格はNumPyの整数の場合があるため，JSONに変換できる整数にする
+        return {'family': self.family,
+                'given': self.given,
+                'char_kakusuu_dict': {key: int(val) for key, val
+                                      in self.char_kakusuu_dict.items()},
+                'gokaku_dict': {key: int(val) for key, val in self.gokaku_dict.items()},
+                'gogyo_dict': dict(self.gogyo_dict),
+                'note': self.note}
+
+    @staticmethod
+    def from_dict(item_dict):
+        """to_dictで変換した辞書から名前情報を作成して返す．
+
+        Args:
+            item_dict: 名前情報の辞書
+
+        Returns:
+            名前情報
+        """
+        try:
+            return SeimeiItem(item_dict['family'], item_dict['given'],
+                              dict(item_dict['char_kakusuu_dict']),
+                              dict(item_dict['gokaku_dict']), dict(item_dict['gogyo_dict']),
+                              item_dict.get('note', ''))
+
+        except (KeyError, TypeError, ValueError):
+            raise RuntimeError('ファイル形式が不正です．')  # pylint: disable=W0707
+
     def show(self):
         """名前情報を標準出力する．
         """
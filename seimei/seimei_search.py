@@ -0,0 +1,292 @@
+"""条件を満たす名を探索するクラスを含むモジュール．
+"""
+# pylint: disable=R0902, R0913, R0914, C0103
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from seimei import gogyo_table
+from seimei import mji
+from seimei.kakusuu import Kakusuu, normalize_name
+from seimei.seimei_core import Seimei
+from seimei.seimei_item import SeimeiItem
+
+GOKAKU_KEYS = ('天格', '人格', '地格', '外格', '総格')
+
+def gokaku(kakusuu_family, kakusuu_given):
+    """姓・名の各文字の画数から五格を返す．
+
+    Args:
+        kakusuu_family: 姓に含まれる文字の画数リスト
+        kakusuu_given: 名に含まれる文字の画数リスト
+
+    Returns:
+        天格，人格，地格，外格，総格のタプル
+    """
+    len_family = len(kakusuu_family)
+    len_given = len(kakusuu_given)
+    sum_family = sum(kakusuu_family)
+    sum_given = sum(kakusuu_given)
+
+    tenkaku = sum_family + max(len_given - len_family, 0)
+    jinkaku = kakusuu_family[-1] + kakusuu_given[0]
+    tikaku = sum_given + max(len_family - len_given, 0)
+    gaikaku = (sum_family - kakusuu_family[-1] + sum_given - kakusuu_given[0]
+               + abs(len_family - len_given))
+    soukaku = sum_family + sum_given
+    return tenkaku, jinkaku, tikaku, gaikaku, soukaku
+
+def is_match(kakusuu_family, kakusuu_given, gokaku_cond, unsei_residues):
+    """姓名の画数が条件を満たすか判定する．
+
+    Args:
+        kakusuu_family: 姓に含まれる文字の画数リスト
+        kakusuu_given: 名に含まれる文字の画数リスト
+        gokaku_cond: 五格の名前と許容する値の集合の辞書
+        unsei_residues: 許容する運勢となる天格・人格・地格の下1桁の組の集合．
+            Noneの場合は条件なし．
+
+    Returns:
+        条件を満たすときTrue
+    """
+    values = dict(zip(GOKAKU_KEYS, gokaku(kakusuu_family, kakusuu_given)))
+    for key, cond in gokaku_cond.items():
+        if values[key] not in cond:
+            return False
+
+    if unsei_residues is not None:
+        residue = (values['天格'] % 10, values['人格'] % 10, values['地格'] % 10)
+        if residue not in unsei_residues:
+            return False
+
+    return True
+
+def search_kakusuu(kakusuu_family, kakusuu_values, first, min_len, max_len,
+                   gokaku_cond, unsei_residues):
+    """先頭文字の画数を固定して，条件を満たす名の画数の並びを探索する．
+
+    地格・総格は名の文字を追加しても減らないため，
+    途中までの画数の和が条件の上限を超えた時点で探索を打ち切る．
+    また，人格と天格の下1桁の候補がどの運勢の条件も満たさない場合は，
+    先頭文字の画数ごと探索を打ち切る．
+
+    Args:
+        kakusuu_family: 姓に含まれる文字の画数リスト
+        kakusuu_values: 名に使える文字の画数 (昇順・重複なし)
+        first: 名の先頭文字の画数
+        min_len: 名の最小文字数
+        max_len: 名の最大文字数
+        gokaku_cond: 五格の名前と許容する値の集合の辞書
+        unsei_residues: 許容する運勢となる天格・人格・地格の下1桁の組の集合．
+            Noneの場合は条件なし．
+
+    Returns:
+        条件を満たす名の画数のタプルのリスト
+    """
+    len_family = len(kakusuu_family)
+    sum_family = sum(kakusuu_family)
+    max_kakusuu = kakusuu_values[-1]
+
+    tikaku_max = max(gokaku_cond['地格']) if '地格' in gokaku_cond else None
+    soukaku_max = max(gokaku_cond['総格']) if '総格' in gokaku_cond else None
+    soukaku_min = min(gokaku_cond['総格']) if '総格' in gokaku_cond else None
+
+    def is_over(depth, sum_given):
+        # 地格は文字を追加しても減らない
+        tikaku = sum_given + max(len_family - depth, 0)
+        if tikaku_max is not None and tikaku > tikaku_max:
+            return True
+
+        # 総格は文字を追加すると増える
+        return soukaku_max is not None and sum_family + sum_given > soukaku_max
+
+    def is_short(depth, sum_given):
+        # 残りの文字をすべて最大画数にしても総格の下限に届かない
+        return soukaku_min is not None and \
+            sum_family + sum_given + (max_len - depth)*max_kakusuu < soukaku_min
+
+    results = []
+
+    def dfs(kakusuu_given, sum_given):
+        depth = len(kakusuu_given)
+        if depth >= min_len and \
+                is_match(kakusuu_family, kakusuu_given, gokaku_cond, unsei_residues):
+            results.append(tuple(kakusuu_given))
+
+        if depth == max_len:
+            return
+
+        for kakusuu in kakusuu_values:
+            # 画数は昇順なので上限を超えたら以降の画数も超える
+            if is_over(depth + 1, sum_given + kakusuu):
+                break
+
+            if is_short(depth + 1, sum_given + kakusuu):
+                continue
+
+            kakusuu_given.append(kakusuu)
+            dfs(kakusuu_given, sum_given + kakusuu)
+            kakusuu_given.pop()
+
+    # 人格は姓の最後の文字と名の先頭文字で決まる
+    if '人格' in gokaku_cond and kakusuu_family[-1] + first not in gokaku_cond['人格']:
+        return results
+
+    # 人格の下1桁は先頭文字で決まり，天格の下1桁は名の文字数で決まる
+    if unsei_residues is not None:
+        jinkaku_residue = (kakusuu_family[-1] + first) % 10
+        tenkaku_residues = {(sum_family + max(len_given - len_family, 0)) % 10
+                            for len_given in range(min_len, max_len + 1)}
+        if not any(residue[0] in tenkaku_residues and residue[1] == jinkaku_residue
+                   for residue in unsei_residues):
+            return results
+
+    if not is_over(1, first) and not is_short(1, first):
+        dfs([first], first)
+
+    return results
+
+
+class SeimeiSearch:
+    """条件を満たす名を文字の候補から探索するクラス．
+
+    名の各文字を画数ごとにまとめ，画数の並びを枝刈りしながら探索したうえで，
+    条件を満たす画数の並びを文字に展開する．
+
+    Attributes:
+        family: 姓
+        chars: 名に使う文字の候補
+        min_len: 名の最小文字数
+        max_len: 名の最大文字数
+        gokaku_cond: 五格の名前と許容する値の集合の辞書
+        unsei_residues: 許容する運勢となる天格・人格・地格の下1桁の組の集合．
+            Noneの場合は条件なし．
+        kakusuu_path: 画数を格納するファイルのパス
+        kakusuu: キャッシュされている画数の辞書
+        kakusuu_family: 姓に含まれる文字の画数リスト
+        char_groups: 画数と，その画数をもつ文字のリストの辞書
+    """
+    def __init__(self, family, chars, min_len=1, max_len=2, gokaku_cond=None,
+                 unsei_cond=None, kakusuu_path=None, kakusuu=None):
+        """初期化．
+
+        Args:
+            family: 姓
+            chars: 名に使う文字の候補
+            min_len: 名の最小文字数
+            max_len: 名の最大文字数
+            gokaku_cond: 五格の名前と許容する値のリストの辞書
+            unsei_cond: 許容する運勢のリスト．Noneの場合は条件なし．
+            kakusuu_path: 画数が保存されているファイルのパス
+            kakusuu: 読み込み済みの画数の辞書．
+                指定した場合はkakusuu_pathからは読み込まない．
+        """
+        if not family:
+            raise RuntimeError('姓が空白です．')
+
+        if not 1 <= min_len <= max_len:
+            raise RuntimeError('文字数は1以上で，最小値を最大値以下にして下さい．')
+
+        gokaku_cond = gokaku_cond if gokaku_cond is not None else {}
+        for key in gokaku_cond:
+            if key not in GOKAKU_KEYS:
+                raise RuntimeError('五格の名前が不正です．')
+
+        family = normalize_name(family)
+        self.family = family
+        self.chars = list(dict.fromkeys(char for char in normalize_name(''.join(chars))
+                                        if not char.isspace()))
+        self.min_len = min_len
+        self.max_len = max_len
+        self.gokaku_cond = {key: set(val) for key, val in gokaku_cond.items()}
+        self.unsei_residues = gogyo_table.residues(*unsei_cond) \
+            if unsei_cond is not None else None
+        self.kakusuu_path = kakusuu_path
+        self.kakusuu = kakusuu if kakusuu is not None else Kakusuu(kakusuu_path)
+
+        if not self.chars:
+            raise RuntimeError('名に使う文字がありません．')
+
+        # 未取得の文字の画数はまとめて並列に取得しておく
+        mji.prefetch(self.kakusuu, family + ''.join(self.chars))
+
+        self.kakusuu_family = [self.get_kakusuu(char) for char in family]
+
+        self.char_groups = {}
+        for char in self.chars:
+            self.char_groups.setdefault(self.get_kakusuu(char), []).append(char)
+
+    def get_kakusuu(self, char):
+        """文字の画数を返す．
+
+        Args:
+            char: 文字 (複数文字不可)
+
+        Returns:
+            文字の画数
+        """
+        return mji.lookup(self.kakusuu, char)
+
+    def search(self, max_workers=None):
+        """条件を満たす名前情報を見つかった順に返す．
+
+        Args:
+            max_workers: 探索に使うプロセス数．
+                1の場合は同じプロセスで探索し，Noneの場合はCPU数となる．
+
+        Yields:
+            条件を満たす名前情報
+        """
+        kakusuu_values = sorted(self.char_groups)
+        args = [(self.kakusuu_family, kakusuu_values, first, self.min_len, self.max_len,
+                 self.gokaku_cond, self.unsei_residues) for first in kakusuu_values]
+
+        if max_workers == 1:
+            for arg in args:
+                for kakusuu_given in search_kakusuu(*arg):
+                    yield from self.expand(kakusuu_given)
+
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(search_kakusuu, *arg) for arg in args]
+            for future in as_completed(futures):
+                for kakusuu_given in future.result():
+                    yield from self.expand(kakusuu_given)
+
+    def expand(self, kakusuu_given):
+        """名の画数の並びを，その画数をもつ文字の組合せに展開する．
+
+        Args:
+            kakusuu_given: 名に含まれる文字の画数のタプル
+
+        Yields:
+            名前情報
+        """
+        gokaku_values = gokaku(self.kakusuu_family, kakusuu_given)
+        gokaku_dict = dict(zip(GOKAKU_KEYS, gokaku_values))
+
+        tenkaku_value, jinkaku_value, tikaku_value = gokaku_values[:3]
+        gogyo_dict = {'天格': Seimei.genso_str(tenkaku_value),
+                      '人格': Seimei.genso_str(jinkaku_value),
+                      '地格': Seimei.genso_str(tikaku_value),
+                      '運勢': Seimei.gogyo(tenkaku_value, jinkaku_value, tikaku_value)}
+
+        groups = [self.char_groups[kakusuu] for kakusuu in kakusuu_given]
+        for given_chars in itertools.product(*groups):
+            given = ''.join(given_chars)
+            char_kakusuu_dict = {char: kakusuu for char, kakusuu
+                                 in zip(self.family + given,
+                                        self.kakusuu_family + list(kakusuu_given))}
+            yield SeimeiItem(self.family, given, char_kakusuu_dict,
+                             dict(gokaku_dict), dict(gogyo_dict))
+
+    def save(self, kakusuu_path=None):
+        """探索中に取得した画数をファイルに保存する．
+
+        Args:
+            kakusuu_path: 画数を保存するファイルのパス
+                省略時は初期化時に指定されたファイルパスとなる．
+        """
+        kakusuu_path = kakusuu_path if kakusuu_path is not None else self.kakusuu_path
+        self.kakusuu.save(kakusuu_path)
@@ -0,0 +1,422 @@
+"""姓名の計算と履歴の参照をJSONで返すHTTPサーバを含むモジュール．
+
+画数の辞書と履歴は起動時に一度だけ読み込み，すべてのリクエストで使い回す．
+履歴の追加などの変更は，応答を返した後にバックグラウンドのスレッドでまとめて保存する．
+
+エンドポイントは以下のとおり．GETではクエリ文字列，POSTではJSONの本文で引数を指定する．
+* /score: 姓名 (family, given) の名前情報を返す．register=falseの場合は履歴に追加しない．
+* /score/batch (POSTのみ): 姓名のリスト (names) の名前情報をまとめて返す．
+* /history: 履歴の項目 (start番目からstop番目の手前まで) を返す．
+* /history/query: 条件 (cond, chars, sort) を満たす履歴の項目を返す．
+* /stats (GETのみ): 処理の回数と時間 (metrics.snapshotを参照) を返す．
+"""
+# pylint: disable=R0902, R0913, R0914, C0103
+
+import json
+import sys
+import threading
+import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from seimei import metrics
+from seimei import mji
+from seimei.history_columns import GOKAKU_KEYS, QUERY_FIELDS
+from seimei.kakusuu import Kakusuu, normalize_name
+from seimei.seimei_core import Seimei
+from seimei.seimei_session import SeimeiSession
+
+# 変更があってから保存するまでの待ち時間 (秒)．この間の変更はまとめて保存する．
+SAVE_DELAY = 1.0
+
+# 値を整数として扱う検索用の項目
+_INT_FIELDS = GOKAKU_KEYS + ('姓の文字数', '名の文字数')
+
+def _parse_bool(value):
+    """クエリ文字列やJSONの真偽値を返す．
+
+    Args:
+        value: 真偽値または文字列
+
+    Returns:
+        真偽値
+    """
+    if isinstance(value, str):
+        return value.strip().lower() not in ('0', 'false', 'no', '')
+
+    return bool(value)
+
+def _parse_list(value):
+    """クエリ文字列のカンマ区切りの値，またはJSONの配列をリストにして返す．
+
+    Args:
+        value: 文字列またはリスト
+
+    Returns:
+        リスト
+    """
+    if isinstance(value, str):
+        return [val for val in value.split(',') if val]
+
+    if isinstance(value, list):
+        return value
+
+    return [value]
+
+
+class SeimeiService:
+    """サーバの各リクエストの処理と，変更の非同期の保存を行うクラス．
+
+    履歴・画数の辞書はスレッドセーフではないため，ロックを取得して操作する．
+    ただし，画数の取得 (通信) はロックの外で行う．
+
+    Attributes:
+        session: 読み込み済みの履歴・画数の辞書
+        lock: 履歴・画数の辞書を操作するためのロック
+        save_delay: 変更があってから保存するまでの待ち時間 (秒)
+        dirty: 保存していない変更があるときにセットされるイベント
+    """
+    def __init__(self, history_path=None, kakusuu_path=None, kakusuu_table_path=None,
+                 save_delay=SAVE_DELAY):
+        """初期化．
+
+        Args:
+            history_path: 履歴が保存されているファイルのパス
+            kakusuu_path: 画数が保存されているファイルのパス
+            kakusuu_table_path: 画数表のファイルのパス
+            save_delay: 変更があってから保存するまでの待ち時間 (秒)
+        """
+        self.session = SeimeiSession(history_path, kakusuu_path, kakusuu_table_path)
+        self.lock = threading.RLock()
+        self.save_delay = save_delay
+        self.dirty = threading.Event()
+        self._closed = threading.Event()
+        self._saver = threading.Thread(target=self._save_loop, daemon=True)
+        self._saver.start()
+
+    def fetch(self, chars):
+        """画数が未取得の文字の画数を，ロックを取得せずに取得して辞書に登録する．
+
+        Args:
+            chars: 文字の列
+        """
+        kakusuu = self.session.kakusuu
+        with self.lock:
+            missing = [char for char in dict.fromkeys(chars)
+                       if char not in kakusuu and not kakusuu.is_unresolved(char)]
+
+        if not missing:
+            return
+
+        fetched = Kakusuu()
+        try:
+            mji.prefetch(fetched, missing)
+
+        finally:
+            with self.lock:
+                kakusuu.update(fetched.dict)
+                for char, timestamp in fetched.unresolved.items():
+                    kakusuu.add_unresolved(char, timestamp)
+
+                self.dirty.set()
+
+    def _score(self, family, given, register):
+        """姓名の名前情報を計算し，必要に応じて履歴に追加する (ロックを取得して呼び出す)．
+
+        Args:
+            family: 姓
+            given: 名
+            register: 履歴に追加する場合はTrue
+
+        Returns:
+            名前情報の辞書 (SeimeiItem.to_dictを参照)
+        """
+        history = self.session.history
+        item = Seimei(family, given, history=history, kakusuu=self.session.kakusuu).data()
+        if register and item not in history:
+            self.session.add(item)
+            self.dirty.set()
+
+        return item.to_dict()
+
+    def score(self, family, given=None, register=True):
+        """姓名の名前情報を返す．
+
+        Args:
+            family: 姓または「姓 名」の形式の文字列
+            given: 名．ただし，familyを「姓 名」で指定した場合は省略可
+            register: 履歴に追加する場合はTrue
+
+        Returns:
+            名前情報の辞書 (SeimeiItem.to_dictを参照)
+        """
+        # Seimeiと同じく「姓 名」を分けてから，画数を引く形にそろえた文字を取得する
+        if given is None and family is not None and ' ' in family:
+            family, given = family.split(' ')
+
+        self.fetch(normalize_name(family or '') + normalize_name(given or ''))
+        with self.lock:
+            return self._score(family, given, register)
+
+    def score_batch(self, names, register=True):
+        """複数の姓名の名前情報を返す．
+
+        計算できなかった姓名は，姓名とエラーメッセージ (error) の辞書を返す．
+
+        Args:
+            names: 「(姓, 名)」の形式の姓名のリスト
+            register: 履歴に追加する場合はTrue
+
+        Returns:
+            名前情報の辞書のリスト
+        """
+        self.fetch(''.join(normalize_name(family + given) for family, given in names))
+
+        results = []
+        with self.lock:
+            for family, given in names:
+                try:
+                    results.append(self._score(family, given, register))
+
+                except RuntimeError as e:
+                    results.append({'family': family, 'given': given, 'error': str(e)})
+
+        return results
+
+    def history(self, start=0, stop=None):
+        """履歴の項目を返す．
+
+        Args:
+            start: 返す範囲の先頭のインデックス
+            stop: 返す範囲の末尾の次のインデックス．省略時は履歴の末尾まで．
+
+        Returns:
+            履歴の項目数 (total) と，インデックス (index) を加えた名前情報の辞書のリスト (items)
+        """
+        with self.lock:
+            history = self.session.history
+            indices = range(len(history))[start:stop]
+            return {'total': len(history),
+                    'items': [dict(history[idx].to_dict(), index=idx) for idx in indices]}
+
+    def query(self, cond=None, chars='', sort_keys=None):
+        """条件を満たす履歴の項目を返す．
+
+        Args:
+            cond: 項目の名前と許容する値のリストの辞書 (SeimeiHistory.queryを参照)
+            chars: 姓名に含む文字
+            sort_keys: 並べ替えに使う項目の名前のリスト
+
+        Returns:
+            条件を満たす項目数 (total) と，
+            インデックス (index) を加えた名前情報の辞書のリスト (items)
+        """
+        with self.lock:
+            history = self.session.history
+            indices = history.query(cond, chars, sort_keys)
+            return {'total': len(indices),
+                    'items': [dict(history[idx].to_dict(), index=idx) for idx in indices]}
+
+    def save(self):
+        """履歴と画数の辞書を保存する．
+        """
+        with self.lock:
+            self.dirty.clear()
+            self.session.save()
+
+    def _save_loop(self):
+        """変更があるたびに，待ち時間の間の変更をまとめて保存する．
+        """
+        while True:
+            self.dirty.wait()
+            if self._closed.wait(self.save_delay):
+                return
+
+            try:
+                self.save()
+
+            except Exception as e:  # pylint: disable=W0703
+                # 保存に失敗した場合は，待ち時間の後に再び保存する
+                print('ERROR: {}'.format(e), file=sys.stderr)
+                self.dirty.set()
+
+    def close(self):
+        """バックグラウンドの保存を止め，保存していない変更を保存する．
+        """
+        self._closed.set()
+        self.dirty.set()
+        self._saver.join()
+        self.save()
+
+
+class SeimeiRequestHandler(BaseHTTPRequestHandler):
+    """サーバのリクエストを処理するクラス．
+
+    接続を使い回せるようにHTTP/1.1で応答する．
+    """
+    protocol_version = 'HTTP/1.1'
+    server_version = 'seimei'
+
+    # ヘッダと本文を別々に送るため，Nagleアルゴリズムによる遅延 (数十ミリ秒) を避ける
+    disable_nagle_algorithm = True
+
+    # 使い回している接続が何も送ってこない場合に切断するまでの時間 (秒)
+    timeout = 30
+
+    def do_GET(self):  # pylint: disable=C0103
+        """GETリクエストを処理する．
+        """
+        # http.serverはリクエスト行をLatin-1で復号するため，UTF-8のままの文字を復号し直す
+        try:
+            path = self.path.encode('latin-1').decode('utf-8')
+
+        except UnicodeError:
+            path = self.path
+
+        url = urllib.parse.urlsplit(path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        if 'cond' not in params and url.path == '/history/query':
+            params['cond'] = {field: params.pop(field) for field in QUERY_FIELDS
+                              if field in params and field != '文字'}
+
+        if url.path == '/stats':
+            self.send_json(200, metrics.snapshot())
+            return
+
+        self.dispatch(url.path, params, ('/score', '/history', '/history/query'))
+
+    def do_POST(self):  # pylint: disable=C0103
+        """POSTリクエストを処理する．
+        """
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length > 0 else b'{}'
+        try:
+            params = json.loads(body.decode('utf-8'))
+
+        except ValueError:
+            self.send_json(400, {'error': 'JSONの形式が不正です．'})
+            return
+
+        if not isinstance(params, dict):
+            self.send_json(400, {'error': 'JSONのオブジェクトを送って下さい．'})
+            return
+
+        self.dispatch(urllib.parse.urlsplit(self.path).path, params,
+                      ('/score', '/score/batch', '/history/query'))
+
+    def dispatch(self, path, params, paths):
+        """パスに対応する処理を行い，結果をJSONで返す．
+
+        Args:
+            path: リクエストのパス
+            params: 引数の辞書
+            paths: このメソッドで受け付けるパス
+        """
+        if path not in paths:
+            self.send_json(404, {'error': '{}は存在しません．'.format(path)})
+            return
+
+        service = self.server.service
+        try:
+            if path == '/score':
+                result = service.score(params.get('family'), params.get('given'),
+                                       _parse_bool(params.get('register', True)))
+
+            elif path == '/score/batch':
+                names = [name.split() if isinstance(name, str) else name
+                         for name in _parse_list(params.get('names', []))]
+                if not all(len(name) == 2 for name in names):
+                    raise RuntimeError('姓名は「姓 名」または[姓, 名]の形式で指定して下さい．')
+
+                result = service.score_batch(names, _parse_bool(params.get('register', True)))
+
+            elif path == '/history':
+                result = service.history(int(params.get('start', 0)),
+                                         int(params['stop']) if 'stop' in params else None)
+
+            else:
+                cond = {field: [int(val) if field in _INT_FIELDS else val
+                                for val in _parse_list(values)]
+                        for field, values in params.get('cond', {}).items()}
+                sort_keys = _parse_list(params['sort']) if 'sort' in params else None
+                result = service.query(cond, params.get('chars', ''), sort_keys)
+
+        except NotImplementedError as e:
+            # RuntimeErrorのサブクラスのため，先に捕捉する
+            self.send_json(422, {'error': str(e)})
+            return
+
+        except (RuntimeError, ValueError, TypeError, AttributeError) as e:
+            self.send_json(400, {'error': str(e)})
+            return
+
+        except urllib.error.URLError as e:
+            self.send_json(502, {'error': str(e.reason)})
+            return
+
+        self.send_json(200, result)
+
+    def send_json(self, status, obj):
+        """JSONを返す．
+
+        Args:
+            status: ステータスコード
+            obj: JSONに変換するオブジェクト
+        """
+        body = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        """リクエストごとのログは出力しない．
+        """
+
+
+class SeimeiServer(HTTPServer):
+    """リクエストをスレッドプールで処理するHTTPサーバ．
+
+    接続ごとにプールのスレッドを1つ使うため，
+    スレッド数を超える接続は，使用中の接続が切断されるまで待たされる．
+
+    Attributes:
+        service: リクエストを処理するサービス
+        executor: リクエストを処理するスレッドプール
+    """
+    def __init__(self, server_address, service, max_workers=8):
+        """初期化．
+
+        Args:
+            server_address: 待ち受けるアドレスとポート番号の組
+            service: リクエストを処理するサービス
+            max_workers: リクエストを処理するスレッド数
+        """
+        super().__init__(server_address, SeimeiRequestHandler)
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        """プールのスレッドでリクエストを処理する．
+
+        Args:
+            request: リクエストのソケット
+            client_address: クライアントのアドレス
+        """
+        try:
+            self.finish_request(request, client_address)
+
+        except Exception:  # pylint: disable=W0703
+            self.handle_error(request, client_address)
+
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
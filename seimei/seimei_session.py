@@ -0,0 +1,180 @@
+"""履歴と画数の辞書を保持したまま姓名を計算するクラスを含むモジュール．
+"""
+# pylint: disable=R0902, R0913, R0914, C0103, C0415
+
+import collections
+import itertools
+import os
+
+from seimei import mji
+from seimei.kakusuu import Kakusuu, normalize_name
+from seimei.seimei_core import Seimei
+from seimei.seimei_history import SeimeiHistory
+
+# 一括登録で1つのプロセスにまとめて計算させる姓名の数
+IMPORT_CHUNK_SIZE = 2000
+
+class SeimeiSession:
+    """履歴と画数の辞書を一度だけ読み込み，複数の姓名の計算に使い回すクラス．
+
+    Seimeiは初期化のたびに履歴ファイルと画数ファイルを読み込むが，
+    このクラスを通して生成した場合は読み込み済みのものを共有する．
+
+    Attributes:
+        history_path: 履歴を格納するファイルのパス
+        kakusuu_path: 画数を格納するファイルのパス
+        kakusuu_table_path: 画数表のファイルのパス
+        history: 履歴
+        kakusuu: キャッシュされている画数の辞書
+    """
+    def __init__(self, history_path=None, kakusuu_path=None, kakusuu_table_path=None):
+        """初期化．
+
+        Args:
+            history_path: 履歴が保存されているファイルのパス
+            kakusuu_path: 画数が保存されているファイルのパス
+            kakusuu_table_path: 画数表のファイルのパス
+        """
+        self.history_path = history_path
+        self.kakusuu_path = kakusuu_path
+        self.kakusuu_table_path = kakusuu_table_path
+        self.history = SeimeiHistory(history_path)
+        self.kakusuu = Kakusuu(kakusuu_path, kakusuu_table_path)
+
+    def seimei(self, family, given=None):
+        """読み込み済みの履歴と画数の辞書を使う姓名を返す．
+
+        Args:
+            family: 姓または「姓 名」の形式の文字列
+            given: 名．ただし，familyを「姓 名」で指定した場合は省略可
+
+        Returns:
+            姓名
+        """
+        return Seimei(family, given, self.history_path, self.kakusuu_path,
+                      history=self.history, kakusuu=self.kakusuu)
+
+    def data(self, family, given=None):
+        """名前情報を計算して返す．
+
+        Args:
+            family: 姓または「姓 名」の形式の文字列
+            given: 名．ただし，familyを「姓 名」で指定した場合は省略可
+
+        Returns:
+            名前情報
+        """
+        return self.seimei(family, given).data()
+
+    def batch(self, names):
+        """読み込み済みの履歴と画数の辞書を使う，複数の姓名を返す．
+
+        Args:
+            names: 「(姓, 名)」または「姓 名」の形式の姓名のリスト
+
+        Returns:
+            複数の姓名
+        """
+        # 一括計算はNumPyを使うため，必要になるまで読み込まない
+        from seimei.seimei_batch import SeimeiBatch
+
+        return SeimeiBatch(names, self.history_path, self.kakusuu_path,
+                           history=self.history, kakusuu=self.kakusuu)
+
+    def import_names(self, names, chunk_size=IMPORT_CHUNK_SIZE, max_workers=None):
+        """姓名をまとめて計算し，履歴に追加する．
+
+        姓名は一定数ずつ読み込み，未取得の文字の画数を取得したうえで，
+        五格の計算をプロセスプールで並列に行う．
+        計算結果は読み込んだ順に履歴に追加し，履歴にある姓名と重複する姓名は追加しない．
+        姓名はnormalize_nameで表記をそろえてから計算する．
+        画数が求まらなかった文字を含む姓名は追加せずに読み飛ばす．
+        ファイルには保存しないため，必要に応じてsave()を呼び出すこと．
+
+        Args:
+            names: 「(姓, 名)」の形式の姓名の列 (ジェネレータでもよい)
+            chunk_size: 1つのプロセスにまとめて計算させる姓名の数
+            max_workers: 計算に使うプロセス数．
+                1の場合は同じプロセスで計算し，Noneの場合はCPU数となる．
+
+        Returns:
+            読み込んだ姓名の数
+            履歴に追加した姓名の数
+            画数が求まらずに読み飛ばした姓名の数
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from seimei.seimei_batch import score_names
+
+        num_read = 0
+        num_added = 0
+        num_skipped = 0
+
+        executor = ProcessPoolExecutor(max_workers) if max_workers != 1 else None
+        max_pending = 2*(max_workers if max_workers is not None else os.cpu_count() or 1)
+        pending = collections.deque()
+
+        names = iter(names)
+        try:
+            while True:
+                chunk = list(itertools.islice(names, chunk_size))
+                if not chunk:
+                    break
+
+                num_read += len(chunk)
+
+                # 画数表で引ける形にそろえてから，画数の有無を調べる (Seimeiと同じ)
+                chunk = [(normalize_name(family), normalize_name(given))
+                         for family, given in chunk]
+
+                # 未取得の文字の画数はチャンクごとにまとめて並列に取得しておく
+                mji.prefetch(self.kakusuu, ''.join(family + given for family, given in chunk))
+                known = [(family, given) for family, given in chunk
+                         if all(char in self.kakusuu for char in family + given)]
+                num_skipped += len(chunk) - len(known)
+                if not known:
+                    continue
+
+                kakusuu_dict = {char: self.kakusuu[char]
+                                for family, given in known for char in family + given}
+                if executor is None:
+                    num_added += self.history.extend(score_names(known, kakusuu_dict))
+                    continue
+
+                pending.append(executor.submit(score_names, known, kakusuu_dict))
+                while len(pending) >= max_pending:
+                    num_added += self.history.extend(pending.popleft().result())
+
+            while pending:
+                num_added += self.history.extend(pending.popleft().result())
+
+        finally:
+            if executor is not None:
+                for future in pending:
+                    future.cancel()
+
+                executor.shutdown()
+
+        return num_read, num_added, num_skipped
+
+    def add(self, item):
+        """履歴に姓名を追加する．
+
+        Args:
+            item: 姓名データ
+        """
+        self.history.add(item)
+
+    def save(self, history_path=None, kakusuu_path=None):
+        """履歴と画数の辞書をファイルに保存する．
+
+        Args:
+            history_path: 履歴を保存するファイルのパス.
+                省略時は初期化時に指定されたファイルパスとなる．
+
+            kakusuu_path: 画数を保存するファイルのパス
+                省略時は初期化時に指定されたファイルパスとなる．
+        """
+        history_path = history_path if history_path is not None else self.history_path
+        kakusuu_path = kakusuu_path if kakusuu_path is not None else self.kakusuu_path
+        self.history.save(history_path)
+        self.kakusuu.save(kakusuu_path)